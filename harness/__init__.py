@@ -0,0 +1,5 @@
+"""
+Performance and load tooling for the API test suite.
+
+Each module is runnable on its own, e.g. ``python -m harness.loadgen --help``.
+"""
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Emergency-alert delivery latency: polling vs LISTEN/NOTIFY push.
+
+A fall alert is only as useful as the time it takes to reach a caregiver.
+On a local Postgres with the migrations applied, this tool seeds
+``--orgs`` organizations and ``--devices`` monitored people (plus
+``--history`` resolved alerts), then for every subscriber count in
+``--subscribers`` and each delivery mode inserts alerts at ``--rate``/s
+for people whose organization has caregivers subscribed:
+
+- ``poll``: every subscriber asks ``emergency_alerts`` for rows newer than
+  its cursor every ``--poll-interval`` seconds through a pool of
+  ``--pool`` connections - database load grows with subscribers
+- ``notify``: an AFTER INSERT trigger calls ``pg_notify``; ``--listeners``
+  connections LISTEN and fan each alert out to their share of the
+  subscribers in process, the way a realtime gateway does - load grows
+  with alerts and listeners, not subscribers (each listening backend
+  commits a transaction to read every notification)
+
+Delivery latency runs from just before the INSERT to the subscriber
+seeing the row. The report gives p50/p99/max per mode, p99 for
+``fall_detected`` alerts, missed deliveries, and database load from
+``pg_stat_database`` (transactions and tuples read per second) next to
+the client's own query rate.
+
+Usage:
+    python -m harness.alert_bench --subscribers 10,100,1000 --rate 20 --duration 15
+    python -m harness.alert_bench --mode notify --listeners 8 --subscribers 5000
+"""
+import argparse
+import heapq
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from harness.histogram import LatencyHistogram, format_ms
+from harness.pg import apply_schema, connect, truncate
+from harness.telemetry_bench import seed_devices
+
+CHANNEL = "emergency_alerts"
+POLL_INDEX = ("idx_emergency_alerts_org_created", "(organization_id, created_at)")
+
+NOTIFY_TRIGGER = f"""
+CREATE OR REPLACE FUNCTION alert_bench_notify() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM pg_notify('{CHANNEL}', json_build_object(
+    'id', NEW.id, 'organization_id', NEW.organization_id, 'severity', NEW.severity)::text);
+  RETURN NEW;
+END
+$$;
+DROP TRIGGER IF EXISTS alert_bench_notify ON emergency_alerts;
+CREATE TRIGGER alert_bench_notify AFTER INSERT ON emergency_alerts
+  FOR EACH ROW EXECUTE FUNCTION alert_bench_notify();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS alert_bench_notify ON emergency_alerts;
+DROP FUNCTION IF EXISTS alert_bench_notify();
+"""
+
+POLL_SQL = ("SELECT id, created_at FROM emergency_alerts "
+            "WHERE organization_id = %s AND created_at > %s ORDER BY created_at")
+
+# (alert_type, severity, weight)
+ALERT_TYPES = [
+    ("fall_detected", "critical", 0.2),
+    ("low_battery", "low", 0.4),
+    ("geofence_exit", "high", 0.3),
+    ("sos_button", "critical", 0.1),
+]
+
+
+def seed_history(conn, count):
+    """``count`` old, resolved alerts spread over every monitored person"""
+    conn.execute("""
+        INSERT INTO emergency_alerts (monitored_person_id, organization_id, alert_type, severity, message,
+                                      acknowledged, resolved, created_at)
+        SELECT p.id, p.organization_id, 'low_battery', 'low', 'Seeded history', true, true,
+               now() - interval '1 hour' - random() * interval '90 days'
+        FROM generate_series(1, %s) AS g
+        CROSS JOIN LATERAL (SELECT id, organization_id FROM monitored_person
+                            OFFSET floor(random() * (SELECT count(*) FROM monitored_person)) LIMIT 1) AS p""",
+                 (count,))
+    conn.execute("VACUUM ANALYZE emergency_alerts")
+
+
+class Deliveries:
+    """Insert times of alerts and every subscriber's delivery of them"""
+
+    def __init__(self):
+        self.sent = {}
+        self.kinds = {}
+        self.expected = 0
+        self.latency = LatencyHistogram()
+        self.falls = LatencyHistogram()
+        self.delivered = 0
+        self.lock = threading.Lock()
+
+    def deliver(self, alert_ids, received=None):
+        received = received or time.perf_counter()
+        with self.lock:
+            for alert_id in alert_ids:
+                sent = self.sent.get(alert_id)
+                if sent is None:
+                    continue
+                self.latency.record(received - sent)
+                if self.kinds[alert_id] == "fall_detected":
+                    self.falls.record(received - sent)
+                self.delivered += 1
+
+
+def produce(dsn, watched, subscribers_by_org, rate, duration, deliveries):
+    """Insert alerts for ``watched`` people at ``rate``/s"""
+    conn = connect(dsn)
+    types, weights = [t[:2] for t in ALERT_TYPES], [t[2] for t in ALERT_TYPES]
+    start = time.perf_counter()
+    sent = 0
+    while True:
+        due = start + sent / rate
+        if due > start + duration:
+            break
+        time.sleep(max(0.0, due - time.perf_counter()))
+        person_id, org_id, device_id = random.choice(watched)
+        alert_type, severity = random.choices(types, weights)[0]
+        alert_id = uuid.uuid4()
+        with deliveries.lock:
+            deliveries.sent[alert_id] = time.perf_counter()
+            deliveries.kinds[alert_id] = alert_type
+            deliveries.expected += len(subscribers_by_org[org_id])
+        conn.execute("INSERT INTO emergency_alerts (id, monitored_person_id, organization_id, alert_type, "
+                     "severity, message) VALUES (%s, %s, %s, %s, %s, %s)",
+                     (alert_id, person_id, org_id, alert_type, severity, f"{alert_type} on {device_id}"))
+        sent += 1
+    conn.close()
+    return sent
+
+
+def run_polling(dsn, subscriptions, interval, pool_size, stop, deliveries, cursor):
+    """Each subscriber polls its organization every ``interval`` seconds; returns polls sent"""
+    cursors = [cursor] * len(subscriptions)
+    busy = [False] * len(subscriptions)
+    local = threading.local()
+    connections, polls, lock = [], [0], threading.Lock()
+
+    def poll(index):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = connect(dsn)
+            with lock:
+                connections.append(conn)
+        rows = conn.execute(POLL_SQL, (subscriptions[index], cursors[index])).fetchall()
+        received = time.perf_counter()
+        if rows:
+            cursors[index] = rows[-1][1]
+            deliveries.deliver([row[0] for row in rows], received)
+        with lock:
+            polls[0] += 1
+        busy[index] = False
+
+    start = time.perf_counter()
+    schedule = [(start + random.uniform(0, interval), i) for i in range(len(subscriptions))]
+    heapq.heapify(schedule)
+    with ThreadPoolExecutor(max_workers=pool_size) as pool:
+        while not stop.is_set():
+            due, index = heapq.heappop(schedule)
+            stop.wait(max(0.0, due - time.perf_counter()))
+            if not busy[index]:
+                # A poll still queued behind a saturated pool is not sent twice
+                busy[index] = True
+                pool.submit(poll, index)
+            heapq.heappush(schedule, (due + interval, index))
+    for conn in connections:
+        conn.close()
+    return polls[0]
+
+
+def run_listeners(dsn, subscriptions, listeners, stop, deliveries):
+    """``listeners`` LISTEN connections fanning alerts out to their subscribers; returns notifications received"""
+    received = [0] * listeners
+    ready = threading.Barrier(listeners + 1)
+
+    def listen(index):
+        by_org = defaultdict(int)
+        for subscriber, org_id in enumerate(subscriptions):
+            if subscriber % listeners == index:
+                by_org[str(org_id)] += 1
+        conn = connect(dsn)
+        conn.execute(f"LISTEN {CHANNEL}")
+        ready.wait()
+        while not stop.is_set():
+            for notify in conn.notifies(timeout=0.2):
+                now = time.perf_counter()
+                payload = json.loads(notify.payload)
+                received[index] += 1
+                fan_out = by_org.get(payload["organization_id"], 0)
+                if fan_out:
+                    deliveries.deliver([uuid.UUID(payload["id"])] * fan_out, now)
+        conn.close()
+
+    threads = [threading.Thread(target=listen, args=(i,)) for i in range(listeners)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    return threads, received
+
+
+def db_load(conn):
+    """Cumulative (transactions, tuples read) for the current database"""
+    conn.execute("SELECT pg_stat_clear_snapshot()")
+    return conn.execute("SELECT xact_commit + xact_rollback, tup_returned + tup_fetched "
+                        "FROM pg_stat_database WHERE datname = current_database()").fetchone()
+
+
+def run(dsn, mode, subscriptions, people, args):
+    """One mode at one subscriber count; returns a result dict"""
+    admin = connect(dsn)
+    subscribers_by_org = defaultdict(list)
+    for subscriber, org_id in enumerate(subscriptions):
+        subscribers_by_org[org_id].append(subscriber)
+    watched = [p for p in people if p[1] in subscribers_by_org]
+    deliveries = Deliveries()
+    stop = threading.Event()
+    cursor = admin.execute("SELECT now()").fetchone()[0]
+    before = db_load(admin)
+    started = time.perf_counter()
+
+    if mode == "poll":
+        result = {}
+        poller = threading.Thread(target=lambda: result.update(polls=run_polling(
+            dsn, subscriptions, args.poll_interval, args.pool, stop, deliveries, cursor)))
+        poller.start()
+        alerts = produce(dsn, watched, subscribers_by_org, args.rate, args.duration, deliveries)
+        time.sleep(args.poll_interval + 1.0)  # let the last alerts be picked up
+        stop.set()
+        poller.join()
+        client_ops = result["polls"]
+    else:
+        threads, received = run_listeners(dsn, subscriptions, args.listeners, stop, deliveries)
+        alerts = produce(dsn, watched, subscribers_by_org, args.rate, args.duration, deliveries)
+        time.sleep(1.0)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        client_ops = sum(received)
+
+    elapsed = time.perf_counter() - started
+    after = db_load(admin)
+    admin.close()
+    return {
+        "alerts": alerts,
+        "deliveries": deliveries,
+        "elapsed": elapsed,
+        "client_ops": client_ops,
+        "xacts": (after[0] - before[0]) / elapsed,
+        "tuples": (after[1] - before[1]) / elapsed,
+    }
+
+
+def print_result(mode, count, result, args):
+    """One mode's delivery percentiles, misses and database load"""
+    deliveries = result["deliveries"]
+    missed = deliveries.expected - deliveries.delivered
+    if mode == "poll":
+        how = f"poll every {args.poll_interval:g}s over {args.pool} connections"
+        ops = f"{result['client_ops'] / result['elapsed']:,.0f} polls/s"
+    else:
+        how = f"LISTEN/NOTIFY via {args.listeners} listeners"
+        ops = f"{result['client_ops'] / result['elapsed']:,.0f} notifications/s received"
+    latency, falls = deliveries.latency, deliveries.falls
+    mark = "✅" if not missed and (latency.percentile(99) or 0) <= args.p99_target_ms / 1000.0 else "❌"
+    print(f"\n{mark} {how}, {count:,} subscribers: {result['alerts']} alerts")
+    print(f"   delivered {deliveries.delivered:,}/{deliveries.expected:,} ({missed:,} missed), "
+          f"p50 {format_ms(latency.percentile(50))}ms p99 {format_ms(latency.percentile(99))}ms "
+          f"max {format_ms(latency.percentile(100))}ms, fall_detected p99 {format_ms(falls.percentile(99))}ms")
+    print(f"   db load {result['xacts']:,.0f} xact/s, {result['tuples']:,.0f} tuples read/s; client {ops}")
+    wanted = count / args.poll_interval
+    if mode == "poll" and result["client_ops"] / result["elapsed"] < wanted * 0.95:
+        print(f"   ⚠️ pollers fell behind {wanted:,.0f} polls/s - {args.pool} connections are saturated")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="emergency_alerts delivery latency: polling vs LISTEN/NOTIFY")
+    parser.add_argument("--dsn", help="scratch Postgres (default HARNESS_PG_DSN)")
+    parser.add_argument("--orgs", type=int, default=200)
+    parser.add_argument("--devices", type=int, default=5000, help="monitored people across the organizations")
+    parser.add_argument("--history", type=int, default=100000, help="resolved alerts already in the table")
+    parser.add_argument("--subscribers", default="10,100,1000", help="comma-separated caregiver counts")
+    parser.add_argument("--mode", action="append", choices=("poll", "notify"), help="default: both")
+    parser.add_argument("--rate", type=float, default=20.0, help="alerts per second")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of alerts per run")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds between a subscriber's polls")
+    parser.add_argument("--pool", type=int, default=20, help="connections shared by the pollers")
+    parser.add_argument("--listeners", type=int, default=4, help="LISTEN connections fanning out to subscribers")
+    parser.add_argument("--no-index", action="store_true", help=f"poll without {POLL_INDEX[0]}")
+    parser.add_argument("--p99-target-ms", type=float, default=1000.0, help="p99 delivery target for the ✅ mark")
+    args = parser.parse_args(argv)
+
+    counts = [int(v) for v in args.subscribers.split(",")]
+    conn = connect(args.dsn)
+    apply_schema(conn)
+    people = seed_devices(conn, args.orgs, args.devices)
+    org_ids = sorted({org_id for _, org_id, _ in people})
+    if args.history:
+        seed_history(conn, args.history)
+    conn.execute(f"DROP INDEX IF EXISTS {POLL_INDEX[0]}")
+    if not args.no_index:
+        conn.execute(f"CREATE INDEX {POLL_INDEX[0]} ON emergency_alerts {POLL_INDEX[1]}")
+    print(f"🌱 {len(org_ids)} organizations, {len(people):,} monitored people, {args.history:,} past alerts")
+
+    try:
+        for count in counts:
+            # Caregivers spread over organizations, several per organization once there are enough
+            subscriptions = [org_ids[i % len(org_ids)] for i in range(count)]
+            for mode in args.mode or ["poll", "notify"]:
+                if mode == "notify":
+                    conn.execute(NOTIFY_TRIGGER)
+                result = run(args.dsn, mode, subscriptions, people, args)
+                conn.execute(DROP_TRIGGER)
+                print_result(mode, count, result, args)
+    finally:
+        conn.execute(DROP_TRIGGER)
+        conn.execute(f"DROP INDEX IF EXISTS {POLL_INDEX[0]}")
+        truncate(conn, "emergency_alerts")
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Synthetic speech-like audio and multipart bodies for /api/transcribe"""
+import io
+import math
+import struct
+import uuid
+import wave
+
+SAMPLE_RATE = 16000
+
+
+def synth_pcm(seconds, sample_rate=SAMPLE_RATE, seed=1):
+    """16-bit mono PCM: a wobbling tone with syllable-like amplitude bursts"""
+    frames = bytearray()
+    total = int(seconds * sample_rate)
+    for n in range(total):
+        t = n / sample_rate
+        envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 3.0 * t + seed)  # ~3 syllables/second
+        pitch = 160 + 40 * math.sin(2 * math.pi * 0.5 * t)
+        sample = 0.4 * envelope * math.sin(2 * math.pi * pitch * t)
+        frames += struct.pack("<h", int(sample * 32767))
+    return bytes(frames)
+
+
+def wav_header(data_size, sample_rate=SAMPLE_RATE):
+    """Canonical 44-byte WAV header for mono 16-bit PCM of ``data_size`` bytes"""
+    return (
+        b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def synth_wav(seconds, sample_rate=SAMPLE_RATE):
+    """Complete WAV file of ``seconds`` of synthetic speech"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(synth_pcm(seconds, sample_rate))
+    return buffer.getvalue()
+
+
+def transcribe_form(language="en", service="whisper", filename="recording.wav",
+                    content_type="audio/wav", boundary=None):
+    """
+    Multipart parts for /api/transcribe as ``(head, tail, content_type)``.
+
+    The audio bytes go between ``head`` and ``tail``, which lets callers
+    stream the audio part instead of building one big body.
+    """
+    boundary = boundary or uuid.uuid4().hex
+    fields = b""
+    for name, value in (("language", language), ("service", service)):
+        fields += (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n").encode()
+    head = fields + (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"audio\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    return head, tail, f"multipart/form-data; boundary={boundary}"
+
+
+def transcribe_body(audio, **kwargs):
+    """Whole multipart body for /api/transcribe as ``(body, content_type)``"""
+    head, tail, content_type = transcribe_form(**kwargs)
+    return head + audio + tail, content_type
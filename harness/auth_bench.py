@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Auth overhead of middleware.ts and the API routes against a local Supabase stand-in.
+
+middleware.ts builds a ``createServerClient`` and calls ``getSession()`` on
+every request its matcher lets through, refreshing the session when it has
+expired; /api/tasks/parse then calls ``getUser()``, which always goes to
+the auth server. This tool runs the production build against
+harness/stubs.py, sweeps the stand-in's auth latency, and for each route
+and session state reports:
+
+- auth calls per request, split into ``getUser`` (GET /user) and session
+  refreshes (POST /token), counted at the stand-in
+- TTFB p50/p99 at each auth latency, and the slope of p50 against it: the
+  number of auth round trips on the critical path, i.e. what caching the
+  verified session per request would save
+
+NEXT_PUBLIC_* variables are inlined at build time, so the build must point
+at the stand-in: pass ``--build`` once (it runs ``npm run build`` with the
+stand-in's environment), and ``npm run build`` again afterwards for a
+normal build. Each request signs in a fresh stand-in user and sends its own
+``X-Forwarded-For``, so the per-user and per-IP parse rate limits never
+trigger.
+
+Usage:
+    python -m harness.auth_bench --build
+    python -m harness.auth_bench --auth-latency-ms 0,20,50,100 --requests 40
+    python -m harness.auth_bench --scenario parse --scenario parse-expired --rest-latency-ms 20
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+from harness.config import next_headers
+from harness.histogram import LatencyHistogram, format_ms
+from harness.nextserver import DEFAULT_PORT, REPO_ROOT, NextServer
+from harness.stubs import DEFAULT_PORT as STUB_PORT
+from harness.stubs import StubServer, session_cookie
+from harness.timing import measure_ttfb
+
+# name: (description, method, path, session expired?)
+SCENARIOS = {
+    "page": ("GET / with a valid session", "GET", "/", False),
+    "page-expired": ("GET / with an expired session", "GET", "/", True),
+    "parse": ("POST /api/tasks/parse with a valid session", "POST", "/api/tasks/parse", False),
+    "parse-expired": ("POST /api/tasks/parse with an expired session", "POST", "/api/tasks/parse", True),
+}
+
+
+def build_points_at(url):
+    """True when the production build has ``url`` inlined as the Supabase URL"""
+    for path in glob.glob(os.path.join(REPO_ROOT, ".next", "server", "**", "*.js"), recursive=True):
+        with open(path, errors="ignore") as f:
+            if url in f.read():
+                return True
+    return False
+
+
+def build(env):
+    print("🏗️ npm run build against the stand-in...")
+    subprocess.run(["npm", "run", "build"], cwd=REPO_ROOT, env=dict(os.environ, **env), check=True)
+
+
+def client_ip(n):
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+def send(stub, base_url, scenario, n):
+    """One request as a freshly signed-in user; returns (sample, stand-in calls it caused)"""
+    _, method, path, expired = SCENARIOS[scenario]
+    session = stub.sign_in(expires_in=-60 if expired else 3600)
+    headers = {"Cookie": session_cookie(stub.url, session), "X-Forwarded-For": client_ip(n)}
+    body = None
+    if method == "POST":
+        headers.update(next_headers())
+        body = json.dumps({"taskText": "call john tomorrow"}).encode()
+    else:
+        headers["Accept"] = "text/html"
+    before = stub.snapshot()
+    sample = measure_ttfb(base_url + path, method, body, headers)
+    return sample, stub.snapshot() - before
+
+
+class ScenarioStats:
+    """Samples for one scenario across the auth latency sweep"""
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.latency = {}
+        self.calls = {}
+        self.statuses = {}
+        self.requests = 0
+
+    def add(self, auth_latency_ms, sample, calls):
+        self.latency.setdefault(auth_latency_ms, LatencyHistogram()).record(sample["ttfb"])
+        self.statuses[sample["status"]] = self.statuses.get(sample["status"], 0) + 1
+        for endpoint, count in calls.items():
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + count
+        self.requests += 1
+
+    def per_request(self, prefix):
+        return sum(count for endpoint, count in self.calls.items() if endpoint.startswith(prefix)) / self.requests
+
+    def slope(self):
+        """Least-squares ms of p50 per ms of auth latency"""
+        points = [(ms, h.percentile(50) * 1000) for ms, h in self.latency.items()]
+        if len(points) < 2:
+            return None
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        spread = sum((x - mean_x) ** 2 for x, _ in points)
+        return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else None
+
+
+def run(stub, base_url, scenarios, latencies_ms, requests, warmup):
+    results = {scenario: ScenarioStats(scenario) for scenario in scenarios}
+    n = 0
+    for latency_ms in latencies_ms:
+        stub.latency["auth"] = latency_ms / 1000.0
+        for scenario in scenarios:
+            for i in range(warmup + requests):
+                n += 1
+                sample, calls = send(stub, base_url, scenario, n)
+                if i >= warmup:
+                    results[scenario].add(latency_ms, sample, calls)
+    return results
+
+
+def print_report(results):
+    for stats in results.values():
+        description = SCENARIOS[stats.scenario][0]
+        statuses = ", ".join(f"{status} x{count}" for status, count in sorted(stats.statuses.items()))
+        print(f"\n🔐 {description} ({statuses})")
+        print(f"   auth calls/request {stats.per_request('auth '):.2f} "
+              f"(getUser {stats.per_request('auth GET user'):.2f}, refresh {stats.per_request('auth POST token'):.2f}), "
+              f"rest calls/request {stats.per_request('rest '):.2f}")
+        for latency_ms, histogram in sorted(stats.latency.items()):
+            print(f"   auth +{latency_ms:>5g}ms: TTFB p50 {format_ms(histogram.percentile(50)):>8}ms "
+                  f"p99 {format_ms(histogram.percentile(99)):>8}ms")
+        slope = stats.slope()
+        if slope is not None:
+            print(f"   ➜ {slope:.2f}ms of TTFB per 1ms of auth latency "
+                  f"(≈{slope:.1f} sequential auth round trips per request)")
+            if slope > 1.2:
+                print(f"   💡 verifying the session once per request would save ≈{slope - 1:.1f} auth round trips")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auth round trips and latency added by middleware and API routes")
+    parser.add_argument("--auth-latency-ms", default="0,25,50,100",
+                        help="comma-separated latencies for the auth stand-in")
+    parser.add_argument("--rest-latency-ms", type=float, default=0.0, help="latency for /rest/v1 calls")
+    parser.add_argument("--openai-latency-ms", type=float, default=0.0, help="latency for the OpenAI stand-in")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="default: all")
+    parser.add_argument("--requests", type=int, default=30, help="measured requests per scenario and latency")
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured requests per scenario and latency")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port for next start")
+    parser.add_argument("--stub-port", type=int, default=STUB_PORT, help="port for the Supabase/OpenAI stand-in")
+    parser.add_argument("--build", action="store_true", help="run npm run build against the stand-in first")
+    parser.add_argument("--log", help="append next start output to this file")
+    args = parser.parse_args(argv)
+
+    latencies_ms = [float(v) for v in args.auth_latency_ms.split(",")]
+    stub = StubServer(port=args.stub_port, rest_latency=args.rest_latency_ms / 1000.0,
+                      openai_latency=args.openai_latency_ms / 1000.0)
+    if args.build:
+        build(stub.app_env())
+    elif not build_points_at(stub.url):
+        raise SystemExit(f"❌ The production build does not point at {stub.url} - rerun with --build "
+                         f"(NEXT_PUBLIC_* is inlined at build time)")
+
+    with stub, NextServer(port=args.port, env=stub.app_env(), log_path=args.log) as server:
+        print(f"🧪 {server.url} against the stand-in at {stub.url}, auth latency {args.auth_latency_ms}ms, "
+              f"{args.requests} requests per point")
+        results = run(stub, server.url, args.scenario or list(SCENARIOS), latencies_ms, args.requests, args.warmup)
+    print_report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
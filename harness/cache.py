@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+HTTP caching for the shared client, plus a cacheability audit.
+
+``HttpCache`` is a small LRU cache that follows the server's headers:
+fresh entries (``Cache-Control: max-age``) are served locally, stale ones
+with an ``ETag`` / ``Last-Modified`` are revalidated with a conditional
+request, and ``no-store`` responses are never kept. The cache is shared by
+every client in the process, so entries are keyed by the caller's identity
+headers as well as the URL, ``private`` responses are never kept, and
+neither are responses to ``Authorization`` requests unless the server
+marks them ``public``. Nothing is cached heuristically, so endpoints
+without caching headers behave exactly as before. Enable it on the test
+client with ``HARNESS_HTTP_CACHE=1``.
+
+The audit fetches every public GET from the OpenAPI spec twice - plain and
+conditional - and reports the caching headers, whether a 304 really comes
+back, and the bytes and latency a revalidation saves.
+
+Usage:
+    python -m harness.cache --audit
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+from harness.config import BASE_URL, PROVIDER_ID, api_headers
+
+DEFAULT_MAX_ENTRIES = 256
+# Request headers that say who is asking; a response for one caller is never served to another
+IDENTITY_HEADERS = ("authorization", "cookie", "x-provider-id")
+
+
+def parse_cache_control(header):
+    """``"public, max-age=60"`` -> ``{"public": True, "max-age": "60"}``"""
+    directives = {}
+    for part in (header or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else True
+    return directives
+
+
+def _max_age(directives):
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(0, int(directives[name]))
+            except ValueError:
+                return 0
+    return 0
+
+
+class CacheEntry:
+    def __init__(self, response, vary):
+        self.response = response
+        self.vary = vary
+        self.update(response)
+
+    def update(self, response):
+        directives = parse_cache_control(response.headers.get("Cache-Control"))
+        self.stored_at = time.monotonic()
+        self.max_age = 0 if "no-cache" in directives else _max_age(directives)
+        self.etag = response.headers.get("ETag") or self.response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified") or self.response.headers.get("Last-Modified")
+
+    def is_fresh(self):
+        return time.monotonic() - self.stored_at < self.max_age
+
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Thread-safe LRU of GET responses that honours Cache-Control and validators"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0}
+
+    @staticmethod
+    def _lowered(request_headers):
+        return {k.lower(): v for k, v in (request_headers or {}).items()}
+
+    def _vary_values(self, vary_header, request_headers):
+        names = [n.strip().lower() for n in (vary_header or "").split(",") if n.strip()]
+        lowered = self._lowered(request_headers)
+        return {name: lowered.get(name) for name in names}
+
+    def _key(self, url, request_headers):
+        lowered = self._lowered(request_headers)
+        return (url,) + tuple(lowered.get(name) for name in IDENTITY_HEADERS)
+
+    def lookup(self, url, request_headers):
+        """The matching entry for ``url`` as this caller, or None"""
+        key = self._key(url, request_headers)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry.vary != self._vary_values(entry.response.headers.get("Vary"), request_headers):
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def store(self, url, request_headers, response):
+        directives = parse_cache_control(response.headers.get("Cache-Control"))
+        authorized = "authorization" in self._lowered(request_headers)
+        cacheable = (
+            response.status_code == 200
+            and "no-store" not in directives
+            and "private" not in directives
+            and (not authorized or "public" in directives)
+            and "*" not in response.headers.get("Vary", "")
+            and (_max_age(directives) > 0 or response.headers.get("ETag") or response.headers.get("Last-Modified"))
+        )
+        if not cacheable:
+            return
+        response.content  # keep the body around after the connection is released
+        vary = self._vary_values(response.headers.get("Vary"), request_headers)
+        key = self._key(url, request_headers)
+        with self.lock:
+            self.entries[key] = CacheEntry(response, vary)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, url):
+        """Drop ``url`` for every caller after a successful unsafe request to it (RFC 9111 4.4)"""
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == url]:
+                del self.entries[key]
+
+    def record(self, outcome, entry=None):
+        with self.lock:
+            self.stats[outcome] += 1
+            if entry is not None:
+                self.stats["bytes_saved"] += len(entry.response.content)
+
+    def send(self, session_request, method, url, **kwargs):
+        """Wrap one GET through the cache; ``session_request`` does the real I/O"""
+        request_headers = kwargs.get("headers") or {}
+        full_url = requests.Request(method, url, params=kwargs.get("params")).prepare().url
+        entry = self.lookup(full_url, request_headers)
+
+        if entry is not None and entry.is_fresh():
+            self.record("hits", entry)
+            entry.response.from_cache = True
+            return entry.response
+
+        if entry is not None and entry.validators():
+            kwargs["headers"] = dict(request_headers, **entry.validators())
+            response = session_request(method, url, **kwargs)
+            if response.status_code == 304:
+                with self.lock:
+                    entry.update(response)
+                self.record("revalidated", entry)
+                entry.response.from_cache = True
+                return entry.response
+        else:
+            response = session_request(method, url, **kwargs)
+
+        self.record("misses")
+        self.store(full_url, request_headers, response)
+        return response
+
+
+def public_get_paths(spec):
+    """All GET paths under /api/public from the OpenAPI spec"""
+    return sorted(path for path, methods in spec.get("paths", {}).items()
+                  if path.startswith("/api/public") and "get" in methods)
+
+
+def _fill_path(path, session):
+    """Substitute path parameters with real IDs (or None if there is no data)"""
+    if "{provider_id}" in path:
+        path = path.replace("{provider_id}", PROVIDER_ID)
+    if "{activity_id}" in path:
+        response = session.get(f"{BASE_URL}/api/public/activities", headers=api_headers(), timeout=30)
+        items = response.json() if response.status_code == 200 else []
+        if isinstance(items, dict):
+            items = items.get("data") or []
+        if not items:
+            return None
+        path = path.replace("{activity_id}", str(items[0]["id"]))
+    return None if "{" in path else path
+
+
+def audit_endpoint(session, url):
+    headers = api_headers()
+    started = time.perf_counter()
+    full = session.get(url, headers=headers, timeout=30)
+    full_time = time.perf_counter() - started
+    directives = parse_cache_control(full.headers.get("Cache-Control"))
+    validators = {}
+    if full.headers.get("ETag"):
+        validators["If-None-Match"] = full.headers["ETag"]
+    if full.headers.get("Last-Modified"):
+        validators["If-Modified-Since"] = full.headers["Last-Modified"]
+
+    row = {
+        "url": url,
+        "status": full.status_code,
+        "cache_control": full.headers.get("Cache-Control", "-"),
+        "etag": "ETag" in full.headers,
+        "last_modified": "Last-Modified" in full.headers,
+        "vary": full.headers.get("Vary", "-"),
+        "bytes": len(full.content),
+        "full_ms": full_time * 1000,
+        "conditional_status": None,
+        "saved_bytes": 0,
+        "saved_ms": 0.0,
+        "findings": [],
+    }
+    if full.status_code != 200:
+        row["findings"].append(f"status {full.status_code}")
+        return row
+    if "no-store" in directives or not (directives or validators):
+        row["findings"].append("not cacheable: no Cache-Control max-age and no validators")
+    if "private" in directives:
+        row["findings"].append("marked private although the response is the same for every caller")
+
+    if validators:
+        started = time.perf_counter()
+        conditional = session.get(url, headers=dict(headers, **validators), timeout=30)
+        conditional_time = time.perf_counter() - started
+        row["conditional_status"] = conditional.status_code
+        if conditional.status_code == 304:
+            row["saved_bytes"] = row["bytes"] - len(conditional.content)
+            row["saved_ms"] = (full_time - conditional_time) * 1000
+        else:
+            row["findings"].append(f"conditional request returned {conditional.status_code}, expected 304")
+            repeat = session.get(url, headers=headers, timeout=30)
+            if full.headers.get("ETag") and repeat.headers.get("ETag") != full.headers.get("ETag"):
+                row["findings"].append("ETag changes between identical requests")
+    return row
+
+
+def run_audit():
+    session = requests.Session()
+    spec = session.get(f"{BASE_URL}/openapi.json", timeout=30).json()
+    rows = []
+    for path in public_get_paths(spec):
+        filled = _fill_path(path, session)
+        if filled is None:
+            print(f"   ⏭️ {path}: no data to fill path parameters")
+            continue
+        rows.append(audit_endpoint(session, f"{BASE_URL}{filled}"))
+
+    print(f"\n📊 Cacheability of public GET endpoints")
+    for row in rows:
+        mark = "✅" if not row["findings"] else "⚠️"
+        print(f"\n{mark} {row['url']}  [{row['status']}, {row['bytes']} bytes, {row['full_ms']:.1f}ms]")
+        print(f"   Cache-Control: {row['cache_control']}  ETag: {row['etag']}  "
+              f"Last-Modified: {row['last_modified']}  Vary: {row['vary']}")
+        if row["conditional_status"] == 304:
+            print(f"   304 on revalidation: saves {row['saved_bytes']} bytes and {row['saved_ms']:.1f}ms per read")
+        for finding in row["findings"]:
+            print(f"   - {finding}")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP caching audit for the public endpoints")
+    parser.add_argument("--audit", action="store_true", help="audit every public GET in the OpenAPI spec")
+    args = parser.parse_args(argv)
+    if not args.audit:
+        parser.print_help()
+        return 0
+    rows = run_audit()
+    broken = [r for r in rows if any("expected 304" in f or "ETag changes" in f for f in r["findings"])]
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Capacity model per endpoint from a closed-loop concurrency sweep.
+
+For each ``--target`` this tool runs ``--concurrency`` levels of N
+clients sending back-to-back requests (no think time), measures
+throughput X(N) and latency, and fits the Universal Scalability Law:
+
+    X(N) = lambda * N / (1 + sigma * (N - 1) + kappa * N * (N - 1))
+
+- lambda: throughput of a single client, the ideal per-client rate
+- sigma (contention): the serialized fraction - locks, a single DB
+  connection, one event loop - that flattens the curve
+- kappa (coherency): crosstalk between clients - cache invalidation,
+  lock handoffs - that makes throughput *fall* past the peak
+
+From the fit it reports the peak concurrency N* = sqrt((1 - sigma) /
+kappa), the peak throughput X(N*), and the concurrency at which latency
+passes ``--slo-ms``. By Little's law a closed loop's mean latency is
+N / X(N); the ``--slo-percentile`` is taken as that mean times the
+percentile/mean ratio measured in the sweep. The suggested limit is the
+lower of N* and the SLO concurrency: past it, more concurrency (more
+Vercel function instances, more uvicorn workers) only adds queueing.
+
+Sweeps are saved with ``--json`` and can be re-fitted with ``--fit``
+without sending traffic.
+
+Usage:
+    python -m harness.capacity --target activities --target tasks-parse --concurrency 1,2,4,8,16,32
+    python -m harness.capacity --target transcribe --concurrency 1,2,4,8 --duration 20 --slo-ms 3000
+    python -m harness.capacity --fit capacity.json --slo-ms 500 --target-rps 200
+"""
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from harness.histogram import LatencyHistogram, format_ms
+from harness.loadgen import DEFAULT_TIMEOUT, OPERATIONS, get_operation, send
+
+
+def usl(n, lam, sigma, kappa):
+    """Throughput the USL predicts at concurrency ``n``"""
+    return lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+def _least_squares(rows):
+    """Non-negative (sigma, kappa) minimising sum((sigma * a + kappa * b - y)^2) over (a, b, y) rows"""
+    saa = sum(a * a for a, _, _ in rows)
+    sbb = sum(b * b for _, b, _ in rows)
+    sab = sum(a * b for a, b, _ in rows)
+    say = sum(a * y for a, _, y in rows)
+    sby = sum(b * y for _, b, y in rows)
+    det = saa * sbb - sab * sab
+    if det > 0:
+        sigma, kappa = (say * sbb - sby * sab) / det, (sby * saa - say * sab) / det
+        if sigma >= 0 and kappa >= 0:
+            return sigma, kappa
+    # One coefficient would be negative: fit each alone and keep the better one
+    candidates = [(0.0, 0.0)]
+    if saa:
+        candidates.append((max(0.0, say / saa), 0.0))
+    if sbb:
+        candidates.append((0.0, max(0.0, sby / sbb)))
+    return min(candidates, key=lambda c: sum((c[0] * a + c[1] * b - y) ** 2 for a, b, y in rows))
+
+
+def fit_usl(points, iterations=50):
+    """
+    (lambda, sigma, kappa, r2) for ``[(concurrency, throughput)]``.
+
+    Linearised as N * lambda / X(N) - 1 = sigma * (N - 1) + kappa * N * (N - 1),
+    alternating with the least-squares lambda for the current sigma and kappa.
+    """
+    points = [(n, x) for n, x in points if x > 0]
+    if not points:
+        raise ValueError("no points with positive throughput to fit")
+    lowest = min(points)
+    lam = lowest[1] / lowest[0]
+    sigma = kappa = 0.0
+    for _ in range(iterations):
+        sigma, kappa = _least_squares([(n - 1, n * (n - 1), n * lam / x - 1) for n, x in points])
+        shape = [n / (1 + sigma * (n - 1) + kappa * n * (n - 1)) for n, _ in points]
+        new_lam = sum(x * f for (_, x), f in zip(points, shape)) / sum(f * f for f in shape)
+        if abs(new_lam - lam) <= 1e-9 * lam:
+            break
+        lam = new_lam
+    mean = sum(x for _, x in points) / len(points)
+    total = sum((x - mean) ** 2 for _, x in points)
+    residual = sum((x - usl(n, lam, sigma, kappa)) ** 2 for n, x in points)
+    return lam, sigma, kappa, (1 - residual / total) if total else 1.0
+
+
+def peak_concurrency(sigma, kappa):
+    """N* where the USL curve peaks (infinite without coherency cost)"""
+    if kappa <= 0:
+        return math.inf
+    return max(1.0, math.sqrt((1 - sigma) / kappa))
+
+
+def slo_concurrency(lam, sigma, kappa, slo, tail_ratio=1.0):
+    """
+    Largest N whose modelled latency stays within ``slo`` seconds.
+
+    Closed loop, no think time: mean latency is N / X(N) = D(N) / lambda
+    with D(N) = 1 + sigma(N - 1) + kappa N(N - 1); the percentile is the
+    mean times ``tail_ratio``. Solves D(N) = slo * lambda / tail_ratio.
+    """
+    budget = slo * lam / tail_ratio
+    if budget < 1:
+        return 0.0
+    a, b, c = kappa, sigma - kappa, 1 - sigma - budget
+    if a <= 0:
+        return math.inf if b <= 0 else -c / b
+    return (-b + math.sqrt(b * b - 4 * a * c)) / (2 * a)
+
+
+class SweepPoint:
+    """Throughput and latency at one concurrency level"""
+
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.latency = LatencyHistogram()
+        self.statuses = Counter()
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def throughput(self):
+        """Successful responses per second"""
+        return (self.latency.count - self.errors) / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self, percentile):
+        return {"concurrency": self.concurrency, "throughput": self.throughput(),
+                "mean": self.latency.mean(), "p50": self.latency.percentile(50),
+                "tail": self.latency.percentile(percentile), "errors": self.errors,
+                "statuses": dict(self.statuses)}
+
+
+def run_point(operation, concurrency, duration, warmup, timeout=DEFAULT_TIMEOUT):
+    """``concurrency`` clients sending back to back; responses completing inside the window count"""
+    point = SweepPoint(concurrency)
+    lock = threading.Lock()
+    start = time.perf_counter() + warmup
+    end = start + duration
+
+    def client():
+        session = requests.Session()
+        while True:
+            sent = time.perf_counter()
+            if sent >= end:
+                return
+            status = send(session, operation, timeout)
+            done = time.perf_counter()
+            # Throughput is completions per second of window, so count by completion time;
+            # requests sent during warmup but finishing inside the window are part of it
+            if start <= done <= end:
+                with lock:
+                    point.latency.record(done - sent)
+                    point.statuses[str(status)] += 1
+                    if not isinstance(status, int) or status >= 400:
+                        point.errors += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(client) for _ in range(concurrency)]
+    for future in futures:
+        future.result()  # re-raise a client that crashed instead of reporting a quieter point
+    point.elapsed = duration
+    return point
+
+
+def model(points, slo, percentile):
+    """Capacity row for one endpoint from its sweep ``points`` (dicts as saved by ``--json``)"""
+    lam, sigma, kappa, r2 = fit_usl([(p["concurrency"], p["throughput"]) for p in points])
+    ratios = sorted(p["tail"] / p["mean"] for p in points if p.get("mean") and p.get("tail"))
+    tail_ratio = ratios[len(ratios) // 2] if ratios else 1.0
+    n_peak = peak_concurrency(sigma, kappa)
+    n_slo = slo_concurrency(lam, sigma, kappa, slo, tail_ratio)
+    limit = max(1, math.floor(min(n_peak, n_slo))) if min(n_peak, n_slo) >= 1 else 0
+    return {"lambda": lam, "sigma": sigma, "kappa": kappa, "r2": r2, "tail_ratio": tail_ratio,
+            "peak_concurrency": n_peak,
+            "peak_throughput": usl(n_peak, lam, sigma, kappa) if math.isfinite(n_peak) else lam / sigma if sigma else math.inf,
+            "slo_concurrency": n_slo, "limit": limit,
+            "slo_breached_at": next((p["concurrency"] for p in sorted(points, key=lambda p: p["concurrency"])
+                                     if p.get("tail") and p["tail"] > slo), None),
+            "limit_throughput": usl(limit, lam, sigma, kappa) if limit else 0.0}
+
+
+def _n(value):
+    return "∞" if not math.isfinite(value) else f"{value:.1f}"
+
+
+def print_sweep(name, points, percentile):
+    print(f"\n📈 {name}")
+    print(f"   {'N':>5}{'req/s':>10}{'model':>10}{'mean ms':>10}{f'p{percentile:g} ms':>10}{'errors':>8}")
+    for p in points:
+        print(f"   {p['concurrency']:>5}{p['throughput']:>10.1f}{p.get('model', 0):>10.1f}"
+              f"{format_ms(p['mean']):>10}{format_ms(p['tail']):>10}{p['errors']:>8}")
+
+
+def print_table(rows, slo, percentile, target_rps):
+    print(f"\n📋 Capacity (SLO p{percentile:g} <= {slo * 1000:g} ms)")
+    header = (f"   {'endpoint':<20}{'lambda/s':>9}{'sigma':>8}{'kappa':>9}{'R²':>6}{'N*':>7}{'X max':>9}"
+              f"{'N@SLO':>8}{'seen':>6}{'limit':>7}{'X@limit':>9}")
+    if target_rps:
+        header += f"{f'units@{target_rps:g}/s':>14}"
+    print(header)
+    for name, fit in rows.items():
+        line = (f"   {name:<20}{fit['lambda']:>9.1f}{fit['sigma']:>8.4f}{fit['kappa']:>9.5f}{fit['r2']:>6.2f}"
+                f"{_n(fit['peak_concurrency']):>7}{_n(fit['peak_throughput']):>9}{_n(fit['slo_concurrency']):>8}"
+                f"{fit['slo_breached_at'] or '-':>6}{fit['limit']:>7}{fit['limit_throughput']:>9.1f}")
+        if target_rps:
+            units = math.ceil(target_rps / fit["limit_throughput"]) if fit["limit_throughput"] else "-"
+            line += f"{units:>14}"
+        print(line)
+    print("   seen: lowest measured N over the SLO; limit: concurrency per instance to configure")
+    if target_rps:
+        print("   units: instances at that limit needed for --target-rps")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="USL capacity model from a closed-loop concurrency sweep")
+    parser.add_argument("--target", action="append", help=f"one of: {', '.join(sorted(OPERATIONS))} (repeatable)")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before each level")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--slo-ms", type=float, default=500.0)
+    parser.add_argument("--slo-percentile", type=float, default=95.0)
+    parser.add_argument("--target-rps", type=float, default=0.0, help="also size instances for this load")
+    parser.add_argument("--fit", help="re-fit a sweep saved with --json instead of sending traffic")
+    parser.add_argument("--json", dest="json_path", help="save sweep points and fits to this file")
+    args = parser.parse_args(argv)
+
+    slo = args.slo_ms / 1000
+    if args.fit:
+        with open(args.fit) as f:
+            saved = json.load(f)
+        sweeps = {name: entry["points"] for name, entry in saved.items()}
+    else:
+        levels = sorted(int(n) for n in args.concurrency.split(","))
+        sweeps = {}
+        for name in args.target or ["activities"]:
+            operation = get_operation(name)
+            print(f"🚀 {operation['method']} {operation['url']}: {len(levels)} levels x "
+                  f"{args.warmup:g}+{args.duration:g}s")
+            sweeps[name] = []
+            for level in levels:
+                point = run_point(operation, level, args.duration, args.warmup, args.timeout)
+                sweeps[name].append(point.to_dict(args.slo_percentile))
+                print(f"   N={level:<4} {point.throughput():8.1f} req/s  "
+                      f"p{args.slo_percentile:g} {format_ms(point.latency.percentile(args.slo_percentile))} ms  "
+                      f"errors {point.errors}")
+
+    rows, report = {}, {}
+    for name, points in sweeps.items():
+        if sum(p["throughput"] > 0 for p in points) < 3:
+            print(f"⚠️ {name}: fewer than 3 levels with successful responses, cannot fit")
+            continue
+        rows[name] = model(points, slo, args.slo_percentile)
+        for p in points:
+            p["model"] = usl(p["concurrency"], rows[name]["lambda"], rows[name]["sigma"], rows[name]["kappa"])
+        print_sweep(name, points, args.slo_percentile)
+        report[name] = {"points": points, "fit": rows[name]}
+    if rows:
+        print_table(rows, slo, args.slo_percentile, args.target_rps)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2, default=lambda v: None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Shared HTTP client for the test suite and the harness tools.
+
+``ApiClient`` is a ``requests.Session`` so existing tests keep working
+unchanged; optional behaviour is layered on in ``request()``.
+"""
+import functools
+import os
+import time
+
+import requests
+
+from harness.cache import HttpCache
+from harness.resilience import Resilience
+from harness.tracing import TIMINGS, new_traceparent
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ApiClient(requests.Session):
+    """requests.Session with trace context, Server-Timing capture, an opt-in HTTP cache and retries"""
+
+    def __init__(self, cache=None, timings=TIMINGS, resilience=None):
+        super().__init__()
+        self.cache = cache
+        self.timings = timings
+        self.resilience = resilience
+
+    def request(self, method, url, **kwargs):
+        method = method.upper()
+        headers = dict(kwargs.get("headers") or {})
+        headers.setdefault("traceparent", new_traceparent())
+        kwargs["headers"] = headers
+
+        if self.cache is not None and method == "GET" and not kwargs.get("stream"):
+            return self.cache.send(self._dispatch, method, url, **kwargs)
+
+        response = self._dispatch(method, url, **kwargs)
+        if self.cache is not None and method not in SAFE_METHODS and response.status_code < 400:
+            self.cache.invalidate(response.url)
+        return response
+
+    def _dispatch(self, method, url, **kwargs):
+        if self.resilience is not None:
+            return self.resilience.send(self._send, method, url, **kwargs)
+        return self._send(method, url, **kwargs)
+
+    def _send(self, method, url, **kwargs):
+        started = time.perf_counter()
+        response = super().request(method, url, **kwargs)
+        if self.timings is not None:
+            self.timings.record(method, response.url, time.perf_counter() - started,
+                                response.headers.get("Server-Timing"))
+        return response
+
+
+@functools.lru_cache(maxsize=None)
+def resilience_from_env():
+    """Process-wide Resilience from HARNESS_RETRIES / HARNESS_HEDGE, or None when both are unset"""
+    retries = os.environ.get("HARNESS_RETRIES")
+    hedge = os.environ.get("HARNESS_HEDGE") == "1"
+    if not retries and not hedge:
+        return None
+    return Resilience(retries=int(retries or 0), hedge=hedge)
+
+
+@functools.lru_cache(maxsize=None)
+def http_cache_from_env():
+    """Process-wide HttpCache when HARNESS_HTTP_CACHE=1, else None"""
+    return HttpCache() if os.environ.get("HARNESS_HTTP_CACHE") == "1" else None
+
+
+def client_from_env():
+    """ApiClient configured from HARNESS_* environment variables"""
+    # Shared so cached responses, breaker state, budgets and hedge delays carry across clients
+    return ApiClient(cache=http_cache_from_env(), resilience=resilience_from_env())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Cold-start vs warm time-to-first-byte for the Next.js routes.
+
+/api/transcribe and /api/tasks/parse run as serverless functions, so the
+first request after a deploy or an idle period pays for process start and
+module loading. Two ways to get a cold request:
+
+- restart (default): start a fresh local ``next start`` for every cycle and
+  target, time the first request, then a handful of warm ones
+- idle: against an already running URL (e.g. a Vercel preview), wait out
+  the platform's idle timeout between cycles
+
+Any ``Server-Timing`` phases the server reports (for instance a
+``module-load`` entry) are broken out cold vs warm.
+
+Usage:
+    npm run build
+    python -m harness.coldstart --target tasks-parse --target transcribe --cycles 10
+    python -m harness.coldstart --url https://my-preview.vercel.app --idle 900 --cycles 6
+"""
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+
+from harness.audio import synth_wav, transcribe_body
+from harness.config import next_headers
+from harness.histogram import LatencyHistogram, format_ms
+from harness.nextserver import DEFAULT_PORT, NextServer
+from harness.timing import measure_ttfb
+
+
+def build_request(target):
+    """(method, path, body, headers) for a named cold-start target"""
+    if target == "page":
+        return "GET", "/", None, {"Accept": "text/html"}
+    if target == "tasks-parse":
+        body = json.dumps({"taskText": "call john tomorrow"}).encode()
+        return "POST", "/api/tasks/parse", body, next_headers()
+    if target == "transcribe":
+        body, content_type = transcribe_body(synth_wav(1.0))
+        headers = {"Content-Type": content_type, "Origin": next_headers()["Origin"]}
+        return "POST", "/api/transcribe", body, headers
+    raise SystemExit(f"❌ Unknown target '{target}'. Choose from: page, tasks-parse, transcribe")
+
+
+class ColdStartStats:
+    """Cold and warm samples for one target"""
+
+    def __init__(self, target):
+        self.target = target
+        self.boot = LatencyHistogram()
+        self.cold = LatencyHistogram()
+        self.warm = LatencyHistogram()
+        self.phases = {"cold": defaultdict(list), "warm": defaultdict(list)}
+        self.statuses = defaultdict(int)
+
+    def add(self, kind, sample):
+        getattr(self, kind).record(sample["ttfb"])
+        self.statuses[sample["status"]] += 1
+        for name, duration in sample["server_timing"].items():
+            self.phases[kind][name].append(duration)
+
+
+def measure_cycle(stats, base_url, request, warm_requests):
+    method, path, body, headers = request
+    stats.add("cold", measure_ttfb(base_url + path, method, body, headers))
+    for _ in range(warm_requests):
+        stats.add("warm", measure_ttfb(base_url + path, method, body, headers))
+
+
+def run_restart_mode(targets, cycles, warm_requests, port, log_path):
+    results = {target: ColdStartStats(target) for target in targets}
+    for cycle in range(cycles):
+        for target in targets:
+            with NextServer(port=port, log_path=log_path) as server:
+                results[target].boot.record(server.boot_time)
+                measure_cycle(results[target], server.url, build_request(target), warm_requests)
+            print(f"   cycle {cycle + 1}/{cycles} {target}: cold {format_ms(results[target].cold.max)}ms max so far")
+    return results
+
+
+def run_idle_mode(url, targets, cycles, warm_requests, idle):
+    results = {target: ColdStartStats(target) for target in targets}
+    for cycle in range(cycles):
+        print(f"   💤 cycle {cycle + 1}/{cycles}: idling {idle:g}s")
+        time.sleep(idle)
+        for target in targets:
+            measure_cycle(results[target], url.rstrip("/"), build_request(target), warm_requests)
+    return results
+
+
+def print_report(results):
+    print(f"\n📊 Time to first byte (ms)")
+    print(f"   {'target':<14}{'boot p50':>10}{'cold p50':>10}{'cold p90':>10}{'cold max':>10}"
+          f"{'warm p50':>10}{'warm p90':>10}{'penalty':>10}")
+    for stats in results.values():
+        cold_p50, warm_p50 = stats.cold.percentile(50), stats.warm.percentile(50)
+        penalty = cold_p50 - warm_p50 if cold_p50 is not None and warm_p50 is not None else None
+        print(f"   {stats.target:<14}{format_ms(stats.boot.percentile(50)):>10}{format_ms(cold_p50):>10}"
+              f"{format_ms(stats.cold.percentile(90)):>10}{format_ms(stats.cold.max):>10}"
+              f"{format_ms(warm_p50):>10}{format_ms(stats.warm.percentile(90)):>10}{format_ms(penalty):>10}")
+        print(f"   {'':<14}statuses {dict(stats.statuses)}")
+
+        phases = sorted(set(stats.phases["cold"]) | set(stats.phases["warm"]))
+        for name in phases:
+            cold = stats.phases["cold"].get(name, [])
+            warm = stats.phases["warm"].get(name, [])
+            cold_mean = f"{sum(cold) / len(cold):.1f}" if cold else "-"
+            warm_mean = f"{sum(warm) / len(warm):.1f}" if warm else "-"
+            print(f"   {'':<14}Server-Timing {name}: cold {cold_mean}ms, warm {warm_mean}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start TTFB for the Next.js routes")
+    parser.add_argument("--target", action="append", help="page, tasks-parse or transcribe (repeatable)")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--warm", type=int, default=5, help="warm requests after each cold one")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port for the local next start")
+    parser.add_argument("--server-log", help="append next start output to this file")
+    parser.add_argument("--url", help="measure an existing deployment instead of restarting locally")
+    parser.add_argument("--idle", type=float, default=900.0, help="seconds to idle between cycles with --url")
+    args = parser.parse_args(argv)
+
+    targets = args.target or ["tasks-parse", "transcribe"]
+    for target in targets:
+        build_request(target)  # fail fast on typos
+
+    if args.url:
+        print(f"🧊 Idle-mode cold starts against {args.url}")
+        results = run_idle_mode(args.url, targets, args.cycles, args.warm, args.idle)
+    else:
+        print(f"🧊 Restart-mode cold starts on port {args.port}")
+        results = run_restart_mode(targets, args.cycles, args.warm, args.port, args.server_log)
+    print_report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
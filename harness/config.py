@@ -0,0 +1,46 @@
+"""Shared endpoint configuration for the harness tools"""
+import os
+
+# :8082 backend API (same defaults as tests/conftest.py)
+BASE_URL = os.environ.get("HARNESS_BASE_URL", "http://localhost:8082")
+API_BASE = f"{BASE_URL}/api"
+
+# Next.js app serving /api/transcribe and /api/tasks/parse
+NEXT_BASE_URL = os.environ.get("HARNESS_NEXT_URL", "http://localhost:3000")
+
+# Scratch Postgres for the database benchmarks (see harness/pg.py)
+PG_DSN = os.environ.get("HARNESS_PG_DSN", "postgresql://postgres@localhost:5432/postgres")
+
+# Shared login/refresh cache for authenticated runs (see harness/tokens.py)
+TOKEN_CACHE = os.environ.get("HARNESS_TOKEN_CACHE",
+                             os.path.join(os.path.expanduser("~"), ".cache", "harness", "tokens.json"))
+
+# Per-test durations and outcomes across runs (see harness/history.py)
+TEST_HISTORY = os.environ.get("HARNESS_TEST_HISTORY", ".test_history.sqlite")
+
+# Envelope map of every spec operation (see harness/shapes.py)
+SHAPES_FILE = os.environ.get("HARNESS_SHAPES", "response_shapes.json")
+
+# Shared secret every distributed-load job must carry (see harness/distributed.py)
+AGENT_TOKEN = os.environ.get("HARNESS_AGENT_TOKEN", "")
+
+# Default Provider ID for testing
+PROVIDER_ID = os.environ.get("HARNESS_PROVIDER_ID", "ffa6c96f-e4a2-4df2-8298-415daa45d23c")
+
+
+def api_headers(provider_id=PROVIDER_ID):
+    """Standard headers for :8082 API requests"""
+    return {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "X-Provider-ID": provider_id,
+    }
+
+
+def next_headers():
+    """Headers for Next.js API routes (middleware rejects unknown origins on POST)"""
+    return {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "Origin": "http://localhost:3000",
+    }
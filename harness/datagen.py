@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic datasets for million-row seeding.
+
+Scale tests used to seed one POST per record with the bodies from
+test_participants.py and test_leads.py; that takes hours for a few million
+rows. This tool samples whole columns at once with NumPy and streams them
+in ``--chunk``-row chunks to JSONL (the API request shapes plus ``id`` and
+foreign keys) and Postgres COPY text files, so memory stays bounded by one
+chunk per worker whatever ``--rows`` is.
+
+``--rows`` is split across the leaf entities by ``MIX``; the parents are
+sized from them:
+
+- backend: providers, then activities, participants and leads per provider
+  (Zipf-sized by ``--skew``, so provider 0 is the biggest whale, each one
+  contiguous like a tenant import) and enrollments linking a participant
+  to an activity of the same provider, popular activities first
+- app: auth.users and their tasks, log-normal per user (a few dozen each
+  with a long tail), interleaved in creation order
+- guardian: organizations, monitored_person (Zipf per organization) and
+  monitoring_data, one reading per device every ``--interval`` seconds
+
+IDs are UUIDs derived from ``--seed``, the entity and the row number, so
+children reference their parents without a lookup, and the same
+``--seed`` and ``--chunk`` give byte-identical files. COPY output comes
+with a load.sql of ``\\copy`` commands; ``--load`` copies the app and
+guardian tables straight into the scratch Postgres.
+
+Usage:
+    python -m harness.datagen --rows 10000000 --out fixtures/10m --workers 8
+    python -m harness.datagen --rows 200000 --format jsonl --entity participants --entity leads
+    python -m harness.datagen --rows 5000000 --format copy --load
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from harness.config import PG_DSN
+
+# Share of --rows for each leaf entity
+MIX = {
+    "activities": 0.01,
+    "participants": 0.10,
+    "leads": 0.05,
+    "enrollments": 0.20,
+    "tasks": 0.30,
+    "monitoring_data": 0.34,
+}
+
+# Parents before children: the order files are written and loaded in
+ENTITIES = ("providers", "activities", "participants", "leads", "enrollments", "users", "tasks",
+            "organizations", "monitored_person", "monitoring_data")
+
+# entity: (table in load.sql, created by harness.pg so --load can fill it)
+TABLES = {
+    "providers": ("providers", False),
+    "activities": ("activities", False),
+    "participants": ("participants", False),
+    "leads": ("leads", False),
+    "enrollments": ("enrollments", False),
+    "users": ("auth.users", True),
+    "tasks": ("tasks", True),
+    "organizations": ("organizations", True),
+    "monitored_person": ("monitored_person", True),
+    "monitoring_data": ("monitoring_data", True),
+}
+
+TASKS_PER_USER = 55
+READINGS_PER_DEVICE = 288  # a day of 5-minute readings
+ANCHOR = datetime(2025, 9, 1, tzinfo=timezone.utc)
+
+FIRST_NAMES = ["Noa", "Liam", "Maya", "Omer", "Emma", "Ariel", "Olivia", "Daniel", "Yael", "Lucas", "Tamar",
+               "Ethan", "Shira", "Mateo", "Avery", "Itai", "Sofia", "Jonah", "Lea", "Adam", "Chloe", "Eitan",
+               "Grace", "Yosef", "Mia", "Amir", "Hannah", "Leo", "Roni", "Nina", "Ben", "Talia"]
+LAST_NAMES = ["Cohen", "Levi", "Smith", "Garcia", "Mizrahi", "Johnson", "Peretz", "Brown", "Biton", "Miller",
+              "Friedman", "Davis", "Shapiro", "Wilson", "Katz", "Moore", "Avraham", "Taylor", "Dahan", "Clark",
+              "Azulay", "Lewis", "Ohana", "Walker", "Golan", "Hall", "Segal", "Young"]
+SUBJECTS = ["Python", "Pottery", "Robotics", "Guitar", "Chess", "Photography", "Yoga", "Spanish", "Drawing",
+            "Swimming", "Coding", "Theater", "Cooking", "Math", "Piano", "Climbing", "Writing", "Science"]
+LEVELS = ["Intro to", "Beginner", "Intermediate", "Advanced", "Weekend", "Summer", "Evening", "Family"]
+CITIES = ["Tel Aviv", "Haifa", "Jerusalem", "Online", "Beer Sheva", "Netanya", "Herzliya", "Eilat"]
+TASK_TITLES = ["Call the dentist", "Review quarterly report", "Buy groceries", "Schedule team meeting",
+               "Book flight tickets", "Pay the invoice", "Call mom", "Update project plan", "Book car service",
+               "Buy birthday gift", "Prepare slides", "Email the landlord", "Fix the login bug", "Send weekly update",
+               "Renew passport", "Pick up dry cleaning", "Plan sprint retro", "Water the plants"]
+TAG_SETS = [(), ("work",), ("personal",), ("work", "urgent"), ("shopping",), ("health",), ("family",),
+            ("work", "meeting"), ("finance",), ("personal", "urgent")]
+
+# (values, weights) for categorical columns
+ACTIVITY_TYPES = (["course", "workshop", "camp", "event"], [0.55, 0.25, 0.1, 0.1])
+ACTIVITY_STATUSES = (["published", "draft", "archived"], [0.7, 0.2, 0.1])
+LEAD_SOURCES = (["website", "social_media", "referral", "email", "event"], [0.4, 0.25, 0.15, 0.12, 0.08])
+LEAD_STATUSES = (["new", "contacted", "qualified", "converted", "lost"], [0.45, 0.25, 0.12, 0.1, 0.08])
+ENROLLMENT_STATUSES = (["enrolled", "completed", "cancelled"], [0.6, 0.3, 0.1])
+PRIORITIES = (["low", "medium", "high"], [0.3, 0.5, 0.2])
+TASK_STATUSES = (["pending", "completed"], [0.6, 0.4])
+PERSON_STATUSES = (["active", "inactive", "offline"], [0.85, 0.05, 0.1])
+
+HEX = np.array([f"{b:02x}".encode() for b in range(256)], dtype="S2")
+SMALL_INTS = np.array([str(n).encode() for n in range(100001)])
+
+
+def _bytes(values):
+    return np.array([str(v).encode() for v in values])
+
+
+def _cat(*parts):
+    """Element-wise concatenation of byte arrays and scalars"""
+    result = parts[0]
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    return result
+
+
+def uuids(seed, entity, index):
+    """Deterministic UUIDv4-shaped ids: 8 bytes from (seed, entity), 8 from the row number"""
+    index = np.asarray(index, dtype=np.int64)
+    packed = np.empty((len(index), 16), dtype=np.uint8)
+    packed[:, :8] = np.frombuffer(hashlib.sha256(f"{seed}:{entity}".encode()).digest()[:8], dtype=np.uint8)
+    packed[:, 8:] = index.astype(">u8").view(np.uint8).reshape(-1, 8)
+    packed[:, 6] = (packed[:, 6] & 0x0F) | 0x40
+    packed[:, 8] |= 0x80  # row numbers stay below 2**56, so this only sets the variant bits
+    digits = HEX[packed].view(np.uint8).reshape(-1, 32)
+    chars = np.full((len(index), 36), ord("-"), dtype=np.uint8)
+    for start, stop, offset in ((0, 8, 0), (8, 12, 1), (12, 16, 2), (16, 20, 3), (20, 32, 4)):
+        chars[:, start + offset:stop + offset] = digits[:, start:stop]
+    return chars.view("S36").ravel()
+
+
+def integers(values):
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) and 0 <= values.min() and values.max() < len(SMALL_INTS):
+        return SMALL_INTS[values]
+    return values.astype("S")
+
+
+def zero_padded(values, width):
+    """Non-negative integers as exactly ``width`` digits"""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    digits = (np.asarray(values, dtype=np.int64)[:, None] // powers % 10 + ord("0")).astype(np.uint8)
+    return digits.view(f"S{width}").ravel()
+
+
+def fixed(values, places=6):
+    """Decimal text for non-negative floats without the cost of float formatting"""
+    scaled = np.rint(np.asarray(values) * 10 ** places).astype(np.int64)
+    return _cat(integers(scaled // 10 ** places), b".", zero_padded(scaled, places))
+
+
+def timestamps(epoch_seconds):
+    return np.char.add(np.asarray(epoch_seconds, dtype="int64").astype("datetime64[s]").astype("S"), b"Z")
+
+
+def dates(epoch_days):
+    return np.asarray(epoch_days, dtype="int64").astype("datetime64[D]").astype("S")
+
+
+def choice(rng, options, size):
+    """Indices into ``options`` (values, weights)"""
+    values, weights = options
+    return rng.choice(len(values), size=size, p=np.asarray(weights) / sum(weights))
+
+
+def zipf_weights(count, skew):
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    return weights / weights.sum()
+
+
+# Column kinds: text (quoted in JSON), raw (numbers and JSON objects), bool, tags (TAG_SETS indices)
+def text(values, nulls=None):
+    return ("text", values, nulls)
+
+
+def raw(values, nulls=None):
+    return ("raw", values, nulls)
+
+
+def flag(values):
+    return ("bool", np.asarray(values, dtype=bool), None)
+
+
+def tags(indices):
+    return ("tags", indices, None)
+
+
+TAG_JSON = np.array([("[" + ",".join(f'"{t}"' for t in tag_set) + "]").encode() for tag_set in TAG_SETS])
+TAG_COPY = np.array([("{" + ",".join(tag_set) + "}").encode() for tag_set in TAG_SETS])
+
+
+def render(column, fmt):
+    kind, values, nulls = column
+    if kind == "text":
+        cells = _cat(b'"', values, b'"') if fmt == "jsonl" else values
+    elif kind == "bool":
+        cells = np.where(values, b"true" if fmt == "jsonl" else b"t", b"false" if fmt == "jsonl" else b"f")
+    elif kind == "tags":
+        cells = (TAG_JSON if fmt == "jsonl" else TAG_COPY)[values]
+    else:
+        cells = values
+    if nulls is not None:
+        cells = np.where(nulls, b"null" if fmt == "jsonl" else b"\\N", cells)
+    return cells
+
+
+def pack(parts, size):
+    """``size`` rows of concatenated parts as bytes; the NUL padding of fixed-width cells is dropped"""
+    blocks = []
+    for part in parts:
+        if isinstance(part, bytes):
+            blocks.append(np.broadcast_to(np.frombuffer(part, dtype=np.uint8), (size, len(part))))
+        else:
+            part = np.ascontiguousarray(part)
+            blocks.append(part.view(np.uint8).reshape(size, part.itemsize))
+    matrix = np.concatenate(blocks, axis=1)
+    return matrix[matrix != 0].tobytes()
+
+
+def encode(columns, fmt):
+    """One chunk of rows as JSONL or COPY text bytes"""
+    parts = []
+    for n, (name, column) in enumerate(columns.items()):
+        kind, values, nulls = column
+        if fmt == "jsonl":
+            parts.append(f'{"{" if n == 0 else ","}"{name}":'.encode())
+        elif n:
+            parts.append(b"\t")
+        if fmt == "jsonl" and kind == "text" and nulls is None:
+            # Quoting in the separators saves a pass over the column
+            parts[-1] += b'"'
+            parts.extend([values, b'"'])
+        else:
+            parts.append(render(column, fmt))
+    parts.append(b"}\n" if fmt == "jsonl" else b"\n")
+    return pack(parts, len(values))
+
+
+class Plan:
+    """Row counts and parent layouts for every entity, fixed by ``--rows`` and ``--seed``"""
+
+    def __init__(self, rows, seed=0, providers=100, orgs=200, skew=1.1, interval=300):
+        rng = np.random.default_rng([seed])
+        self.seed = seed
+        self.interval = interval
+        leaf = {entity: max(1, int(rows * share)) for entity, share in MIX.items()}
+        self.counts = {"providers": providers, "organizations": orgs, **leaf}
+        self.counts["users"] = max(1, leaf["tasks"] // TASKS_PER_USER)
+        self.counts["monitored_person"] = max(orgs, leaf["monitoring_data"] // READINGS_PER_DEVICE)
+
+        # Tenants own contiguous id ranges: row i of an entity belongs to provider searchsorted(starts, i)
+        self.starts = {}
+        for entity, count in (("activities", providers), ("participants", providers), ("leads", providers),
+                              ("monitored_person", orgs)):
+            self.counts[entity] = total = max(self.counts[entity], count)
+            sizes = 1 + rng.multinomial(total - count, zipf_weights(count, skew))
+            self.starts[entity] = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        # A few dozen tasks per user with a long tail; tasks are drawn per row so users interleave on disk
+        self.user_weights = np.cumsum(rng.lognormal(0.0, 1.0, self.counts["users"]))
+        self.user_weights /= self.user_weights[-1]
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def owner(self, entity, index):
+        """Parent row number of each row in ``index``"""
+        return np.searchsorted(self.starts[entity], index, side="right") - 1
+
+    def ids(self, entity, index):
+        return uuids(self.seed, entity, index)
+
+    def activity_names(self, index):
+        index = np.asarray(index)
+        return _cat(_bytes(LEVELS)[index // len(SUBJECTS) % len(LEVELS)], b" ",
+                    _bytes(SUBJECTS)[index % len(SUBJECTS)], b" ", integers(index // (len(SUBJECTS) * len(LEVELS))))
+
+    def device_ids(self, index):
+        return np.char.add(b"bench-device-", integers(index))
+
+    def chunk(self, entity, start, stop):
+        """{column: column} for rows ``start:stop`` of ``entity``"""
+        rng = np.random.default_rng([self.seed, ENTITIES.index(entity), start])
+        index = np.arange(start, stop)
+        return getattr(self, f"_{entity}")(rng, index, stop - start)
+
+    def _people(self, rng, index, size, domain):
+        first, last = rng.integers(0, len(FIRST_NAMES), size), rng.integers(0, len(LAST_NAMES), size)
+        firsts, lasts = _bytes(FIRST_NAMES)[first], _bytes(LAST_NAMES)[last]
+        email = _cat(np.char.lower(firsts), b".", np.char.lower(lasts), b".", integers(index), f"@{domain}".encode())
+        phone = np.char.add(b"+1555", zero_padded(index, 7))
+        return {"first_name": text(firsts), "last_name": text(lasts), "email": text(email), "phone": text(phone)}
+
+    def _providers(self, rng, index, size):
+        return {"id": text(self.ids("providers", index)),
+                "name": text(_cat(b"Bench Provider ", integers(index))),
+                "email": text(_cat(b"provider", integers(index), b"@example.com")),
+                "description": text(np.full(size, b"Synthetic provider for scale tests"))}
+
+    def _activities(self, rng, index, size):
+        start = (ANCHOR.timestamp() // 86400 + rng.integers(-90, 180, size)).astype(np.int64)
+        length = np.maximum(1, rng.lognormal(3.0, 0.8, size)).astype(np.int64)
+        amount = integers(rng.choice([0, 50, 80, 120, 200, 350, 500], size, p=[0.1, 0.15, 0.2, 0.25, 0.15, 0.1, 0.05]))
+        return {"id": text(self.ids("activities", index)),
+                "provider_id": text(self.ids("providers", self.owner("activities", index))),
+                "name": text(self.activity_names(index)),
+                "description": text(np.full(size, b"Synthetic activity for scale tests")),
+                "activity_type": text(_bytes(ACTIVITY_TYPES[0])[choice(rng, ACTIVITY_TYPES, size)]),
+                "status": text(_bytes(ACTIVITY_STATUSES[0])[choice(rng, ACTIVITY_STATUSES, size)]),
+                "start_date": text(dates(start)),
+                "end_date": text(dates(start + length)),
+                "capacity": raw(integers(rng.choice([10, 15, 20, 25, 30, 50, 100], size))),
+                "location": text(_bytes(CITIES)[rng.integers(0, len(CITIES), size)]),
+                "pricing": raw(_cat(b'{"amount":', amount, b',"currency":"USD"}'))}
+
+    def _participants(self, rng, index, size):
+        return {"id": text(self.ids("participants", index)),
+                "provider_id": text(self.ids("providers", self.owner("participants", index))),
+                **self._people(rng, index, size, "participants.example.com"),
+                "is_active": flag(rng.random(size) < 0.9)}
+
+    def _leads(self, rng, index, size):
+        provider = self.owner("leads", index)
+        return {"id": text(self.ids("leads", index)),
+                "provider_id": text(self.ids("providers", provider)),
+                **self._people(rng, index, size, "leads.example.com"),
+                "source": text(_bytes(LEAD_SOURCES[0])[choice(rng, LEAD_SOURCES, size)]),
+                "status": text(_bytes(LEAD_STATUSES[0])[choice(rng, LEAD_STATUSES, size)]),
+                "activity_of_interest": text(self.activity_names(self._popular_activity(rng, provider)))}
+
+    def _popular_activity(self, rng, provider):
+        """An activity of each ``provider``; the first ones of a tenant draw most of the interest"""
+        starts = self.starts["activities"]
+        ends = np.append(starts[1:], self.counts["activities"])
+        return starts[provider] + ((ends - starts)[provider] * rng.random(len(provider)) ** 3).astype(np.int64)
+
+    def _enrollments(self, rng, index, size):
+        participant = rng.integers(0, self.counts["participants"], size)
+        activity = self._popular_activity(rng, self.owner("participants", participant))
+        status = choice(rng, ENROLLMENT_STATUSES, size)
+        progress = np.select([status == 1, status == 2], [100, 0], rng.integers(0, 100, size))
+        day = ANCHOR.timestamp() // 86400 - rng.integers(0, 365, size)
+        return {"id": text(self.ids("enrollments", index)),
+                "participant_id": text(self.ids("participants", participant)),
+                "activity_id": text(self.ids("activities", activity)),
+                "enrollment_date": text(dates(day)),
+                "status": text(_bytes(ENROLLMENT_STATUSES[0])[status]),
+                "completion_percentage": raw(integers(progress))}
+
+    def _users(self, rng, index, size):
+        return {"id": text(self.ids("users", index)),
+                "email": text(_cat(b"bench-", integers(index), b"@example.com"))}
+
+    def _tasks(self, rng, index, size):
+        user = np.minimum(np.searchsorted(self.user_weights, rng.random(size)), self.counts["users"] - 1)
+        # Creation time follows insertion order over the past year
+        span = 365 * 86400
+        created = (ANCHOR.timestamp() - span + index * span / self.counts["tasks"]
+                   + rng.integers(0, 60, size)).astype(np.int64)
+        updated = created + (rng.exponential(3 * 86400, size)).astype(np.int64)
+        due = created + rng.integers(3600, 30 * 86400, size)
+        return {"id": text(self.ids("tasks", index)),
+                "user_id": text(self.ids("users", user)),
+                "title": text(_bytes(TASK_TITLES)[rng.integers(0, len(TASK_TITLES), size)]),
+                "description": text(np.full(size, b"Captured by voice"), nulls=rng.random(size) < 0.5),
+                "due_date": text(timestamps(due), nulls=rng.random(size) < 0.3),
+                "assigned_to": text(_bytes(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), size)],
+                                    nulls=rng.random(size) < 0.6),
+                "tags": tags(rng.integers(0, len(TAG_SETS), size)),
+                "priority": text(_bytes(PRIORITIES[0])[choice(rng, PRIORITIES, size)]),
+                "status": text(_bytes(TASK_STATUSES[0])[choice(rng, TASK_STATUSES, size)]),
+                "created_at": text(timestamps(created)),
+                "updated_at": text(timestamps(updated))}
+
+    def _organizations(self, rng, index, size):
+        return {"id": text(self.ids("organizations", index)),
+                "name": text(_cat(b"Bench Org ", integers(index))),
+                "organization_type": text(np.where(index % 4 == 0, b"care_company", b"private_family")),
+                "contact_email": text(_cat(b"org", integers(index), b"@example.com"))}
+
+    def _monitored_person(self, rng, index, size):
+        return {"id": text(self.ids("monitored_person", index)),
+                "organization_id": text(self.ids("organizations", self.owner("monitored_person", index))),
+                "name": text(_cat(_bytes(FIRST_NAMES)[index % len(FIRST_NAMES)], b" ",
+                                  _bytes(LAST_NAMES)[index // len(FIRST_NAMES) % len(LAST_NAMES)])),
+                "device_id": text(self.device_ids(index)),
+                "status": text(_bytes(PERSON_STATUSES[0])[choice(rng, PERSON_STATUSES, size)])}
+
+    def _monitoring_data(self, rng, index, size):
+        # Every device reports once per interval, so rows arrive in time order as they would be ingested
+        devices = self.counts["monitored_person"]
+        person, tick = index % devices, index // devices
+        last_tick = (self.counts["monitoring_data"] - 1) // devices
+        at = (ANCHOR.timestamp() - (last_tick - tick) * self.interval + rng.integers(0, self.interval, size))
+        # Batteries drain about 1% per tick from a per-device phase; steps accumulate through the day
+        battery = 100 - (tick + person * 37) % 96
+        per_day = 86400 // self.interval
+        steps = (tick % per_day) * (5 + person % 40) + rng.integers(0, 30, size)
+        home_lat = 31.0 + (person * 2654435761 % 1_000_000) / 1e6 * 2
+        home_lon = 34.5 + (person * 40503 % 1_000_000) / 1e6
+        return {"monitored_person_id": text(self.ids("monitored_person", person)),
+                "organization_id": text(self.ids("organizations", self.owner("monitored_person", person))),
+                "device_id": text(self.device_ids(person)),
+                "timestamp": text(timestamps(at)),
+                "battery_level": raw(integers(battery)),
+                "battery_is_charging": flag((battery < 25) & (rng.random(size) < 0.7)),
+                "location_latitude": raw(fixed(home_lat + rng.normal(0, 0.002, size).clip(-0.01, 0.01))),
+                "location_longitude": raw(fixed(home_lon + rng.normal(0, 0.002, size).clip(-0.01, 0.01))),
+                "movement_step_count": raw(integers(steps)),
+                "fall_event_detected": flag(rng.random(size) < 0.0005)}
+
+
+def _encode_chunk(plan, entity, start, stop, fmt):
+    return encode(plan.chunk(entity, start, stop), fmt)
+
+
+def write_entity(plan, entity, fmt, path, chunk, pool=None, in_flight=8):
+    """Stream ``entity`` to ``path`` chunk by chunk; returns bytes written"""
+    bounds = [(start, min(start + chunk, plan.counts[entity])) for start in range(0, plan.counts[entity], chunk)]
+    written = 0
+    with open(path, "wb") as f:
+        if pool is None:
+            for start, stop in bounds:
+                written += f.write(_encode_chunk(plan, entity, start, stop, fmt))
+            return written
+        # Capping the chunks in flight keeps memory bounded when the disk is the bottleneck
+        pending = []
+        for start, stop in bounds:
+            pending.append(pool.submit(_encode_chunk, plan, entity, start, stop, fmt))
+            if len(pending) >= in_flight:
+                written += f.write(pending.pop(0).result())
+        for future in pending:
+            written += f.write(future.result())
+    return written
+
+
+def columns_of(plan, entity):
+    return list(plan.chunk(entity, 0, 1))
+
+
+def write_load_sql(plan, out, entities):
+    """psql script loading the COPY files, parents first"""
+    path = os.path.join(out, "load.sql")
+    with open(path, "w") as f:
+        f.write("-- Generated by harness.datagen; run with psql from this directory\n")
+        for entity in entities:
+            table, in_app = TABLES[entity]
+            if not in_app:
+                f.write(f"-- {entity}: backend table, shaped after the API request bodies\n")
+            f.write(f"\\copy {table} ({', '.join(columns_of(plan, entity))}) FROM '{entity}.copy'\n")
+    return path
+
+
+def load(plan, out, entities, dsn):
+    """COPY the generated app and guardian tables into the scratch Postgres"""
+    # Only --load needs psycopg; writing the JSONL/COPY files does not
+    from harness.pg import apply_schema, connect, truncate
+
+    conn = connect(dsn)
+    apply_schema(conn)
+    truncate(conn, "auth.users", "organizations")
+    with conn.cursor() as cur:
+        for entity in entities:
+            table, in_app = TABLES[entity]
+            if not in_app:
+                continue
+            started = time.perf_counter()
+            with open(os.path.join(out, f"{entity}.copy"), "rb") as f:
+                with cur.copy(f"COPY {table} ({', '.join(columns_of(plan, entity))}) FROM STDIN") as copy:
+                    while block := f.read(1 << 20):
+                        copy.write(block)
+            elapsed = time.perf_counter() - started
+            print(f"   📥 {table:<18} {plan.counts[entity]:>12,} rows in {elapsed:6.1f}s "
+                  f"({plan.counts[entity] / elapsed:,.0f} rows/s)")
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def with_parents(entities):
+    """``entities`` plus everything they reference, in ENTITIES order"""
+    parents = {"activities": {"providers"}, "participants": {"providers"}, "leads": {"providers"},
+               "enrollments": {"participants", "activities", "providers"}, "tasks": {"users"},
+               "monitored_person": {"organizations"}, "monitoring_data": {"monitored_person", "organizations"}}
+    wanted = set(entities)
+    for entity in entities:
+        wanted |= parents.get(entity, set())
+    return [entity for entity in ENTITIES if entity in wanted]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deterministic million-row fixtures as JSONL and COPY files")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="leaf rows, split across entities by MIX")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="fixtures", help="output directory")
+    parser.add_argument("--format", choices=["copy", "jsonl", "both"], default="both")
+    parser.add_argument("--entity", action="append", choices=ENTITIES,
+                        help="write only these (and their parents); default: all")
+    parser.add_argument("--chunk", type=int, default=100_000, help="rows per chunk; bounds memory per worker")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="encoding processes")
+    parser.add_argument("--providers", type=int, default=100)
+    parser.add_argument("--orgs", type=int, default=200)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for tenant sizes")
+    parser.add_argument("--interval", type=int, default=300, help="seconds between readings of one device")
+    parser.add_argument("--load", action="store_true", help="COPY the app and guardian tables into --dsn")
+    parser.add_argument("--dsn", default=PG_DSN, help="scratch Postgres for --load (default HARNESS_PG_DSN)")
+    args = parser.parse_args(argv)
+
+    if args.load and args.format == "jsonl":
+        raise SystemExit("❌ --load needs the COPY files: use --format copy or both")
+    plan = Plan(args.rows, args.seed, args.providers, args.orgs, args.skew, args.interval)
+    entities = with_parents(args.entity or ENTITIES)
+    formats = ["copy", "jsonl"] if args.format == "both" else [args.format]
+    os.makedirs(args.out, exist_ok=True)
+    print(f"🧬 {sum(plan.counts[e] for e in entities):,} rows (seed {args.seed}) -> {args.out}, "
+          f"{args.workers} worker(s), {args.chunk:,}-row chunks")
+
+    started = time.perf_counter()
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    try:
+        for entity in entities:
+            for fmt in formats:
+                entity_started = time.perf_counter()
+                size = write_entity(plan, entity, fmt, os.path.join(args.out, f"{entity}.{fmt}"), args.chunk, pool,
+                                    in_flight=2 * args.workers)
+                print(f"   📝 {entity + '.' + fmt:<24} {plan.counts[entity]:>12,} rows {size / 2**20:>9.1f} MiB "
+                      f"in {time.perf_counter() - entity_started:5.1f}s")
+    finally:
+        if pool:
+            pool.shutdown()
+    elapsed = time.perf_counter() - started
+    rows = sum(plan.counts[e] for e in entities) * len(formats)
+    print(f"✅ {rows:,} rows written in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+    if "copy" in formats:
+        print(f"📜 {write_load_sql(plan, args.out, entities)}")
+    if args.load:
+        print(f"🐘 Loading into {args.dsn}...")
+        load(plan, args.out, entities, args.dsn)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
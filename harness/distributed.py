@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Multi-process, multi-host load generation on a shared schedule.
+
+A single Python client tops out at one core. The coordinator splits one
+global open-loop schedule (see harness.loadgen) into worker slots: local
+slots run in separate processes, remote slots run on hosts that started
+an agent. Every slot sends the arrivals ``i % worker_count == slot``, all
+from the same start time, and the per-slot histograms are merged into one
+report with a per-worker breakdown and skew warnings.
+
+Agents speak newline-delimited JSON over a plain TCP socket. A job makes
+the agent send traffic wherever it says, so every message must carry the
+shared secret from ``HARNESS_AGENT_TOKEN`` and agents listen on loopback
+unless ``--listen`` says otherwise.
+
+Usage:
+    # on each load host
+    HARNESS_AGENT_TOKEN=... python -m harness.distributed agent --listen 0.0.0.0:7070
+
+    # on the coordinator (4 local processes + 4 per remote host)
+    HARNESS_AGENT_TOKEN=... python -m harness.distributed run --target activities --rate 2000 \\
+        --duration 60 --processes 4 --hosts loadbox1:7070,loadbox2:7070
+
+Operations are resolved on the coordinator and shipped to the agents as
+is, so with ``--hosts`` the target must be reachable from the load hosts:
+set ``HARNESS_BASE_URL`` / ``HARNESS_NEXT_URL`` to a non-loopback address
+(loopback targets are refused, since each agent would load itself).
+
+With ``--identities`` every worker sends bearer tokens from
+harness.tokens; processes on one host share the token file, so each
+identity logs in once per host rather than once per worker.
+"""
+import argparse
+import hmac
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from harness.config import AGENT_TOKEN
+from harness.histogram import format_ms
+from harness.loadgen import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_TIMEOUT,
+    OPERATIONS,
+    LoadResult,
+    get_operation,
+    print_report,
+    run_open_loop,
+)
+from harness.tokens import TokenManager, load_identities
+
+DEFAULT_PORT = 7070
+START_LEAD = 3.0  # seconds between dispatch and the shared start time
+
+# Skew thresholds
+START_SKEW_LIMIT = 0.05  # a slot starting 50ms late shifts its share of the schedule
+THROUGHPUT_SKEW_LIMIT = 0.9  # slot completed less than 90% of its share
+LATENCY_SKEW_FACTOR = 2.0  # slot p99 more than 2x the median slot p99
+
+
+def _run_slot(job, slot):
+    """Process entry point: run one slot of the shared schedule"""
+    tokens = TokenManager() if job.get("identities") else None
+    result = run_open_loop(
+        job["operation"],
+        job["rate"],
+        job["duration"],
+        concurrency=job["concurrency"],
+        start_at=job["start_at"],
+        worker_index=slot,
+        worker_count=job["worker_count"],
+        timeout=job["timeout"],
+        tokens=tokens,
+        identities=job.get("identities"),
+    )
+    if tokens is not None:
+        tokens.close()
+    return {
+        "host": socket.gethostname(),
+        "pid": os.getpid(),
+        "slot": slot,
+        "result": result.to_dict(),
+        "tokens": dict(tokens.stats) if tokens is not None else {},
+    }
+
+
+def run_slots(job, slots):
+    """Run several slots of ``job`` in parallel local processes"""
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(slots), mp_context=ctx) as pool:
+        futures = [pool.submit(_run_slot, job, slot) for slot in slots]
+        return [future.result() for future in futures]
+
+
+def _send_line(sock_file, message):
+    sock_file.write((json.dumps(message) + "\n").encode())
+    sock_file.flush()
+
+
+def _read_line(sock_file):
+    line = sock_file.readline()
+    if not line:
+        raise ConnectionError("agent closed the connection")
+    return json.loads(line)
+
+
+class AgentHandler(socketserver.StreamRequestHandler):
+    """Handle ``clock`` and ``run`` commands from a coordinator that knows the agent's token"""
+
+    def handle(self):
+        while True:
+            try:
+                message = _read_line(self.rfile)
+            except (ConnectionError, ValueError):
+                return
+            if not hmac.compare_digest(str(message.get("token", "")).encode(), self.server.token.encode()):
+                print(f"🚫 rejected a message with a wrong token from {self.client_address[0]}")
+                _send_line(self.wfile, {"error": "wrong or missing HARNESS_AGENT_TOKEN"})
+                return
+            command = message.get("cmd")
+            if command == "clock":
+                _send_line(self.wfile, {"time": time.time()})
+            elif command == "run":
+                job = message["job"]
+                print(f"📡 running slots {message['slots']} of {job['worker_count']} for {self.client_address[0]}")
+                _send_line(self.wfile, {"workers": run_slots(job, message["slots"])})
+            else:
+                _send_line(self.wfile, {"error": f"unknown command {command!r}"})
+
+
+class AgentServer(socketserver.ThreadingTCPServer):
+    """TCP server for AgentHandler; ``token`` is the secret every message must carry"""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, token):
+        super().__init__(address, AgentHandler)
+        self.token = token
+
+
+def serve_agent(listen, token=AGENT_TOKEN):
+    if not token:
+        raise SystemExit("❌ Set HARNESS_AGENT_TOKEN: agents only run jobs that carry the shared secret")
+    host, _, port = listen.rpartition(":")
+    with AgentServer((host or "127.0.0.1", int(port)), token) as server:
+        print(f"🛰️ Load agent listening on {host or '127.0.0.1'}:{port} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Agent stopped")
+
+
+class RemoteAgent:
+    """Coordinator-side connection to one agent"""
+
+    def __init__(self, address, token=AGENT_TOKEN):
+        host, _, port = address.rpartition(":")
+        self.address = address
+        self.token = token
+        self.sock = socket.create_connection((host, int(port or DEFAULT_PORT)), timeout=10)
+        self.file = self.sock.makefile("rwb")
+        self.clock_offset = self._estimate_clock_offset()
+
+    def _estimate_clock_offset(self, samples=5):
+        """NTP-style offset (agent clock minus ours) from the fastest round-trip"""
+        best = None
+        for _ in range(samples):
+            t0 = time.time()
+            remote = self._call({"cmd": "clock"})["time"]
+            t1 = time.time()
+            rtt = t1 - t0
+            if best is None or rtt < best[0]:
+                best = (rtt, remote - (t0 + t1) / 2)
+        return best[1]
+
+    def run(self, job, slots):
+        # The job's start time is in coordinator time; shift it onto the agent's clock
+        remote_job = dict(job, start_at=job["start_at"] + self.clock_offset)
+        self.sock.settimeout(job["duration"] + START_LEAD + 120)
+        workers = self._call({"cmd": "run", "job": remote_job, "slots": slots})["workers"]
+        for worker in workers:
+            worker["agent"] = self.address
+            worker["clock_offset"] = self.clock_offset
+        return workers
+
+    def _call(self, message):
+        _send_line(self.file, dict(message, token=self.token))
+        reply = _read_line(self.file)
+        if "error" in reply:
+            raise ConnectionError(f"agent {self.address}: {reply['error']}")
+        return reply
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def find_skew(job, workers):
+    """Return human-readable warnings for slots that diverged from the rest"""
+    warnings = []
+    share = job["rate"] * job["duration"] / job["worker_count"]
+    p99s = [w["loaded"].corrected.percentile(99) or 0.0 for w in workers]
+    median_p99 = statistics.median(p99s) if p99s else 0.0
+
+    for worker, p99 in zip(workers, p99s):
+        result = worker["loaded"]
+        name = f"slot {worker['slot']} ({worker['host']}:{worker['pid']})"
+        if result.start_delay > START_SKEW_LIMIT:
+            warnings.append(f"{name} started {result.start_delay * 1000:.0f}ms late - check clock sync / host load")
+        if share and result.completed < share * THROUGHPUT_SKEW_LIMIT:
+            warnings.append(f"{name} completed {result.completed} of ~{share:.0f} scheduled requests")
+        if median_p99 and p99 > median_p99 * LATENCY_SKEW_FACTOR:
+            warnings.append(f"{name} p99 {format_ms(p99)}ms vs median {format_ms(median_p99)}ms - "
+                            f"worker may be CPU-bound or on a slow network path")
+        lag = result.send_lag.percentile(99) or 0.0
+        if lag > 1.0:
+            warnings.append(f"{name} p99 send lag {format_ms(lag)}ms - raise --concurrency or add workers")
+    return warnings
+
+
+def coordinate(operation, rate, duration, processes, hosts, concurrency, timeout, identities=None,
+               token=AGENT_TOKEN):
+    """Run the shared schedule across local processes and remote agents"""
+    agents = [RemoteAgent(address, token) for address in hosts]
+    for agent in agents:
+        print(f"🔗 {agent.address}: clock offset {agent.clock_offset * 1000:+.1f}ms")
+
+    worker_count = processes * (1 + len(agents))
+    job = {
+        "operation": operation,
+        "rate": rate,
+        "duration": duration,
+        "concurrency": concurrency,
+        "timeout": timeout,
+        "worker_count": worker_count,
+        "start_at": time.time() + START_LEAD,
+        "identities": identities,
+    }
+    slot_groups = [list(range(i * processes, (i + 1) * processes)) for i in range(1 + len(agents))]
+
+    try:
+        with ThreadPoolExecutor(max_workers=1 + len(agents)) as pool:
+            futures = [pool.submit(run_slots, job, slot_groups[0])]
+            futures += [pool.submit(agent.run, job, slots) for agent, slots in zip(agents, slot_groups[1:])]
+            workers = [worker for future in futures for worker in future.result()]
+    finally:
+        for agent in agents:
+            agent.close()
+
+    merged = LoadResult(operation["name"], rate, duration)
+    for worker in workers:
+        worker["loaded"] = LoadResult.from_dict(worker["result"])
+        merged.merge(worker["loaded"])
+    return job, merged, workers
+
+
+def print_breakdown(workers):
+    print(f"\n   {'slot':<6}{'host':<24}{'done':>8}{'req/s':>9}{'p50 ms':>10}{'p99 ms':>10}{'lag p99':>10}{'errors':>8}")
+    for worker in sorted(workers, key=lambda w: w["slot"]):
+        result = worker["loaded"]
+        host = worker.get("agent") or f"{worker['host']} (local)"
+        print(f"   {worker['slot']:<6}{host[:23]:<24}{result.completed:>8}{result.throughput():>9.1f}"
+              f"{format_ms(result.corrected.percentile(50)):>10}{format_ms(result.corrected.percentile(99)):>10}"
+              f"{format_ms(result.send_lag.percentile(99)):>10}{result.errors:>8}")
+
+
+def is_loopback(url):
+    """True when ``url`` points at the machine it is resolved on"""
+    host = urlsplit(url).hostname or ""
+    return host in ("localhost", "0.0.0.0", "::1") or host.startswith("127.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed open-loop load generation")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    agent = sub.add_parser("agent", help="run a load agent that accepts coordinator jobs")
+    agent.add_argument("--listen", default=f"127.0.0.1:{DEFAULT_PORT}",
+                       help="host:port to accept coordinators on (use 0.0.0.0:PORT for remote coordinators)")
+
+    run = sub.add_parser("run", help="coordinate a load run")
+    run.add_argument("--target", default="activities", help=f"one of: {', '.join(sorted(OPERATIONS))}")
+    run.add_argument("--rate", type=float, default=100.0, help="total arrivals per second across all workers")
+    run.add_argument("--duration", type=float, default=30.0)
+    run.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="worker processes per host")
+    run.add_argument("--hosts", default="", help="comma-separated agent addresses (host:port)")
+    run.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="max in-flight requests per process")
+    run.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    run.add_argument("--json", help="write merged and per-worker results to this file")
+    run.add_argument("--identities", help="JSON list of login bodies; requests carry their tokens")
+    args = parser.parse_args(argv)
+
+    if args.command == "agent":
+        serve_agent(args.listen)
+        return 0
+
+    operation = get_operation(args.target)
+    hosts = [h.strip() for h in args.hosts.split(",") if h.strip()]
+    if hosts and not AGENT_TOKEN:
+        raise SystemExit("❌ Set HARNESS_AGENT_TOKEN to the secret the agents were started with")
+    if hosts and is_loopback(operation["url"]):
+        raise SystemExit(f"❌ {operation['url']} is a loopback address, so every agent would load its own "
+                         f"machine. Set HARNESS_BASE_URL / HARNESS_NEXT_URL to an address the load hosts can reach.")
+    print(f"🚀 {operation['method']} {operation['url']} at {args.rate:g} req/s "
+          f"across {args.processes * (1 + len(hosts))} workers")
+    identities = load_identities(args.identities) if args.identities else None
+    job, merged, workers = coordinate(operation, args.rate, args.duration, args.processes,
+                                      hosts, args.concurrency, args.timeout, identities)
+
+    print_report(merged, title=f"{merged.operation} (merged)")
+    print_breakdown(workers)
+    if identities:
+        tokens = Counter()
+        for worker in workers:
+            tokens.update(worker.get("tokens", {}))
+        print(f"   🔑 {tokens['handouts']:,} tokens for {len(identities)} identities across {len(workers)} workers: "
+              f"{tokens['logins']} logins, {tokens['refreshes']} refreshes, "
+              f"{tokens['shared_logins'] + tokens['shared_refreshes']} reused from other workers' token file")
+    warnings = find_skew(job, workers)
+    for warning in warnings:
+        print(f"   ⚠️ {warning}")
+    if not warnings:
+        print("   ✅ No worker skew detected")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "merged": merged.to_dict(),
+                "workers": [{k: v for k, v in w.items() if k != "loaded"} for w in workers],
+                "skew": warnings,
+            }, f)
+        print(f"💾 Saved result to {args.json}")
+    return 0 if merged.errors == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
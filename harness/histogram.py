@@ -0,0 +1,113 @@
+"""
+Mergeable latency histogram.
+
+Values are bucketed on a logarithmic scale so every recorded latency is
+kept within ``precision`` relative error no matter how long the run is.
+Histograms from different threads, processes or hosts can be merged by
+adding their bucket counts.
+"""
+import math
+
+DEFAULT_PRECISION = 0.01
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (seconds in, seconds out)"""
+
+    def __init__(self, precision=DEFAULT_PRECISION, lowest=1e-6):
+        self.precision = precision
+        self.lowest = lowest
+        self._log_base = math.log1p(precision)
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value <= self.lowest:
+            return 0
+        return int(math.log(value / self.lowest) / self._log_base) + 1
+
+    def _value_at(self, index):
+        """Midpoint of a bucket, which bounds the error to half a bucket"""
+        if index == 0:
+            return self.lowest
+        low = self.lowest * math.exp((index - 1) * self._log_base)
+        return low * (1 + self.precision / 2)
+
+    def record(self, value, count=1):
+        """Record ``count`` observations of ``value`` seconds"""
+        if value < 0:
+            value = 0.0
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Add another histogram's observations into this one"""
+        if (other.precision, other.lowest) != (self.precision, self.lowest):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, q):
+        """Latency at percentile ``q`` (0-100); None when empty"""
+        if not self.count:
+            return None
+        if q >= 100:
+            return self.max
+        target = max(1, math.ceil(self.count * q / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(max(self._value_at(index), self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def summary(self, percentiles=PERCENTILES):
+        """Dict of count/mean/max and the requested percentiles"""
+        result = {"count": self.count, "mean": self.mean(), "max": self.max}
+        for q in percentiles:
+            result[f"p{q:g}"] = self.percentile(q)
+        return result
+
+    def to_dict(self):
+        """JSON-serialisable form, used to ship histograms between workers"""
+        return {
+            "precision": self.precision,
+            "lowest": self.lowest,
+            "counts": {str(k): v for k, v in self.counts.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(precision=data["precision"], lowest=data["lowest"])
+        histogram.counts = {int(k): v for k, v in data["counts"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+def format_ms(value):
+    """Render a latency in seconds as milliseconds for report tables"""
+    return "-" if value is None else f"{value * 1000:.1f}"
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Per-test duration and outcome history across runs, and the scheduling it drives.
+
+Enable the pytest plugin with ``-p harness.history --history-db PATH``
+(run_tests.py does this). Every run appends one row per test (setup, call
+and teardown folded together, like harness.results) to a local SQLite
+file, and the history is used to:
+
+- ``--history-shard K/N``: split the collected tests across N processes
+  longest-processing-time first - tests sorted by their recent median
+  duration, each handed to the least-loaded worker - so a parallel run
+  finishes close to total/N instead of waiting on one badly placed slow
+  test. Every worker computes the same schedule from the history as of
+  ``--history-as-of``, so they agree without talking to each other.
+- ``--history-order failed-first``: run tests that failed last time first,
+  quickest first, so a still-broken change fails within seconds.
+- flag tests whose recent median duration drifted above their longer-term
+  median in the terminal summary.
+
+Tests without history are estimated at the median of the known ones.
+
+Usage:
+    python -m harness.history --workers 4
+    python -m harness.history --drift 0.5 --slowest 20
+"""
+import argparse
+import heapq
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+from harness.config import TEST_HISTORY
+
+RECENT_RUNS = 5       # durations behind the estimate and the "recent" side of drift
+BASELINE_RUNS = 20    # older durations the recent median is compared with
+KEEP_RUNS = 500
+DRIFT_RATIO = 0.25
+DRIFT_MIN_SECONDS = 0.05
+DEFAULT_ESTIMATE = 0.1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+  id INTEGER PRIMARY KEY,
+  started REAL NOT NULL,
+  finished REAL NOT NULL,
+  shard TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+  run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+  nodeid TEXT NOT NULL,
+  outcome TEXT NOT NULL,
+  duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_nodeid_run ON results (nodeid, run_id DESC);
+"""
+
+
+def lpt_schedule(estimates, workers):
+    """Longest-first assignment of ``{test: seconds}``; returns ``[(load, [tests])]`` per worker"""
+    heap = [(0.0, worker) for worker in range(workers)]
+    bins = [[0.0, []] for _ in range(workers)]
+    for test in sorted(estimates, key=lambda t: (-estimates[t], t)):
+        load, worker = heapq.heappop(heap)
+        bins[worker][0] = load + estimates[test]
+        bins[worker][1].append(test)
+        heapq.heappush(heap, (bins[worker][0], worker))
+    return [tuple(b) for b in bins]
+
+
+def parse_shard(value):
+    """``"K/N"`` -> (K, N) with 1 <= K <= N"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like K/N, got {value!r}")
+    if not 1 <= index <= count:
+        raise ValueError(f"shard {value!r} out of range")
+    return index, count
+
+
+class TestHistory:
+    """SQLite store of per-test outcomes and durations"""
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, path, as_of=None):
+        self.path = path
+        self.as_of = time.time() if as_of is None else as_of
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Concurrent shards finish at about the same time; let their writes queue
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, rows, started, shard=None):
+        """Store one run's ``[(nodeid, outcome, duration)]``"""
+        with self.conn:
+            run_id = self.conn.execute("INSERT INTO runs (started, finished, shard) VALUES (?, ?, ?)",
+                                       (started, time.time(), shard)).lastrowid
+            self.conn.executemany("INSERT INTO results (run_id, nodeid, outcome, duration) VALUES (?, ?, ?, ?)",
+                                  [(run_id, nodeid, outcome, duration) for nodeid, outcome, duration in rows])
+            self.conn.execute("DELETE FROM runs WHERE id <= (SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                              (KEEP_RUNS,))
+        return run_id
+
+    def _latest(self, outcome_filter, limit):
+        """{nodeid: [rows newest first]} from runs finished before ``as_of``"""
+        rows = self.conn.execute(f"""
+            SELECT nodeid, outcome, duration FROM (
+              SELECT nodeid, outcome, duration,
+                     row_number() OVER (PARTITION BY nodeid ORDER BY run_id DESC) AS n
+              FROM results JOIN runs ON runs.id = results.run_id
+              WHERE runs.finished < ? AND {outcome_filter}
+            ) WHERE n <= ? ORDER BY nodeid""", (self.as_of, limit)).fetchall()
+        latest = {}
+        for nodeid, outcome, duration in rows:
+            latest.setdefault(nodeid, []).append((outcome, duration))
+        return latest
+
+    def durations(self, limit=RECENT_RUNS + BASELINE_RUNS):
+        """{nodeid: [seconds newest first]} from passing runs"""
+        return {nodeid: [d for _, d in rows] for nodeid, rows in self._latest("outcome = 'passed'", limit).items()}
+
+    def estimates(self, nodeids):
+        """{nodeid: expected seconds}: recent median, or the median of known tests for new ones"""
+        history = self.durations(RECENT_RUNS)
+        known = {n: statistics.median(d) for n, d in history.items()}
+        fallback = statistics.median(known.values()) if known else DEFAULT_ESTIMATE
+        return {nodeid: known.get(nodeid, fallback) for nodeid in nodeids}
+
+    def last_failed(self):
+        """{nodeid: duration} for tests whose latest non-skipped outcome was a failure or error"""
+        latest = self._latest("outcome != 'skipped'", 1)
+        return {nodeid: rows[0][1] for nodeid, rows in latest.items() if rows[0][0] in ("failed", "error")}
+
+    def drifting(self, ratio=DRIFT_RATIO, min_seconds=DRIFT_MIN_SECONDS):
+        """[(nodeid, baseline median, recent median)] for tests getting slower, worst first"""
+        flagged = []
+        for nodeid, durations in self.durations().items():
+            if len(durations) < 2 * RECENT_RUNS:
+                continue
+            recent, baseline = statistics.median(durations[:RECENT_RUNS]), statistics.median(durations[RECENT_RUNS:])
+            if recent > baseline * (1 + ratio) and recent - baseline > min_seconds:
+                flagged.append((nodeid, baseline, recent))
+        return sorted(flagged, key=lambda row: row[1] - row[2])
+
+
+def failed_first(items, failures):
+    """``items`` with last run's failures moved to the front, quickest first; stable otherwise"""
+    first = sorted((item for item in items if item.nodeid in failures), key=lambda item: failures[item.nodeid])
+    return first + [item for item in items if item.nodeid not in failures]
+
+
+class HistoryPlugin:
+    """Pytest plugin object: reorders/shards at collection, records outcomes at the end"""
+
+    def __init__(self, history, shard=None, order="none"):
+        self.history = history
+        self.shard = shard
+        self.order = order
+        self.started = time.time()
+        self.rows = {}
+        self.plan = None
+        self.moved = 0
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        if self.shard:
+            index, count = parse_shard(self.shard)
+            estimates = self.history.estimates([item.nodeid for item in items])
+            bins = lpt_schedule(estimates, count)
+            mine = set(bins[index - 1][1])
+            deselected = [item for item in items if item.nodeid not in mine]
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if item.nodeid in mine]
+            self.plan = (bins[index - 1][0], max(load for load, _ in bins), sum(estimates.values()) / count)
+        if self.order == "failed-first":
+            failures = self.history.last_failed()
+            self.moved = sum(item.nodeid in failures for item in items)
+            items[:] = failed_first(items, failures)
+
+    def pytest_runtest_logreport(self, report):
+        outcome, duration = self.rows.get(report.nodeid, ("passed", 0.0))
+        if report.failed:
+            outcome = "error" if report.when != "call" else "failed"
+        elif report.skipped and outcome == "passed":
+            outcome = "skipped"
+        self.rows[report.nodeid] = (outcome, duration + report.duration)
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        if self.rows:
+            self.history.record([(nodeid, outcome, round(duration, 6))
+                                 for nodeid, (outcome, duration) in self.rows.items()],
+                                self.started, self.shard)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        lines = []
+        if self.plan:
+            mine, makespan, ideal = self.plan
+            lines.append(f"shard {self.shard}: expected {mine:.1f}s; slowest shard {makespan:.1f}s, "
+                         f"ideal {ideal:.1f}s")
+        if self.moved:
+            lines.append(f"{self.moved} test(s) that failed last run went first")
+        for nodeid, baseline, recent in self.history.drifting()[:10]:
+            lines.append(f"slower: {nodeid} {baseline:.3f}s -> {recent:.3f}s")
+        if lines:
+            terminalreporter.section("test history")
+            for line in lines:
+                terminalreporter.write_line(line)
+
+    def pytest_unconfigure(self, config):
+        self.history.close()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("history", "per-test duration history (harness.history)")
+    group.addoption("--history-db", default=None, help="record durations and outcomes in this SQLite file")
+    group.addoption("--history-shard", default=None, help="run only shard K/N of a longest-first split")
+    group.addoption("--history-order", default="none", choices=["none", "failed-first"],
+                    help="failed-first: run last run's failures before everything else")
+    group.addoption("--history-as-of", type=float, default=None,
+                    help="schedule from runs finished before this epoch time (shards of one run must agree)")
+
+
+def pytest_configure(config):
+    path = config.getoption("--history-db")
+    if path:
+        history = TestHistory(path, as_of=config.getoption("--history-as-of"))
+        plugin = HistoryPlugin(history, config.getoption("--history-shard"), config.getoption("--history-order"))
+        config.pluginmanager.register(plugin, "harness-history")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test duration history: slowest, drifting and LPT split")
+    parser.add_argument("--db", default=TEST_HISTORY, help="history file (default HARNESS_TEST_HISTORY)")
+    parser.add_argument("--workers", type=int, default=4, help="show the longest-first split for this many workers")
+    parser.add_argument("--slowest", type=int, default=10)
+    parser.add_argument("--drift", type=float, default=DRIFT_RATIO, help="flag recent/baseline above 1 + this")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"❌ No history at {args.db} - run the tests with run_tests.py first")
+    history = TestHistory(args.db)
+    runs = history.conn.execute("SELECT count(*), max(finished) FROM runs").fetchone()
+    durations = history.durations(RECENT_RUNS)
+    estimates = history.estimates(durations)
+    print(f"🗄️ {args.db}: {runs[0]} run(s), {len(estimates)} tests with passing history")
+
+    print(f"\n🐢 Slowest (median of the last {RECENT_RUNS} passes):")
+    for nodeid in sorted(estimates, key=estimates.get, reverse=True)[:args.slowest]:
+        print(f"   {estimates[nodeid]:8.3f}s  {nodeid}")
+
+    total = sum(estimates.values())
+    bins = lpt_schedule(estimates, args.workers)
+    naive = [0.0] * args.workers
+    for n, nodeid in enumerate(sorted(estimates)):
+        naive[n % args.workers] += estimates[nodeid]
+    print(f"\n⚖️ {args.workers} workers: longest-first {max(load for load, _ in bins):.1f}s, "
+          f"round-robin {max(naive):.1f}s, ideal {total / args.workers:.1f}s (serial {total:.1f}s)")
+
+    failures = history.last_failed()
+    if failures:
+        print(f"\n❌ {len(failures)} test(s) failed on their last run (run first with failed-first ordering)")
+    drifting = history.drifting(ratio=args.drift)
+    print(f"\n📈 {len(drifting)} test(s) slower than their baseline by more than {args.drift:.0%}:")
+    for nodeid, baseline, recent in drifting:
+        print(f"   {baseline:7.3f}s -> {recent:7.3f}s  {nodeid}")
+    history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Incremental parsing of large JSON list responses.
+
+``response.json()`` holds the whole body and the whole decoded list in
+memory before the first assertion runs. ``ArrayParser`` is fed the body a
+chunk at a time and hands back each array item as soon as it is complete,
+so memory stays at roughly one chunk plus one item regardless of how many
+rows a tenant has, and a validator can fail on the first bad item without
+downloading the rest.
+
+Both a top-level array and an envelope such as ``{"success": true,
+"data": [...]}`` (with ``key="data"``) are supported.
+
+Usage:
+    python -m harness.jsonstream --target participants --target leads --require id
+    python -m harness.jsonstream --target activities --compare
+"""
+import argparse
+import codecs
+import json
+import sys
+import time
+import tracemalloc
+
+import requests
+
+from harness.loadgen import OPERATIONS, get_operation, request_kwargs
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_ITEM_CHARS = 8 * 1024 * 1024
+WHITESPACE = " \t\n\r"
+DELIMITERS = WHITESPACE + ",:]}"
+
+
+class ArrayParser:
+    """Push parser: ``feed()`` text, get back the array items completed so far"""
+
+    def __init__(self, key=None, max_item_chars=DEFAULT_MAX_ITEM_CHARS):
+        self.key = key
+        self.max_item_chars = max_item_chars
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.state = "start"
+        self.in_envelope = False
+        self.found_array = False
+        self.current_key = None
+        self.peak_buffer = 0
+        self.count = 0
+
+    def _skip_whitespace(self):
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+            self.pos += 1
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else None
+
+    def _decode(self, final):
+        """Next complete value at ``pos``, or None if more input is needed"""
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        # A number is only complete once a delimiter follows it ("3" -> "3.5")
+        if not final and (end == len(self.buffer) or self.buffer[end] not in DELIMITERS):
+            return None
+        self.pos = end
+        return (value,)
+
+    def _fail(self, expected):
+        found = self.buffer[self.pos:self.pos + 20]
+        raise ValueError(f"expected {expected} at item {self.count}, found {found!r}")
+
+    def _step(self, items, final):
+        """Advance one token; False when more input is needed"""
+        char = self._skip_whitespace()
+        if char is None and self.state != "item":
+            return False
+
+        if self.state == "start":
+            if char == "[" and self.key is None:
+                self.state = "item_or_end"
+            elif char == "{" and self.key is not None:
+                self.in_envelope = True
+                self.state = "key_or_end"
+            else:
+                self._fail("'['" if self.key is None else "'{'")
+            self.pos += 1
+        elif self.state == "item_or_end" and char == "]":
+            self.pos += 1
+            self._end_array()
+        elif self.state in ("item_or_end", "item"):
+            decoded = self._decode(final)
+            if decoded is None:
+                return False
+            items.append(decoded[0])
+            self.count += 1
+            self.state = "comma_or_end"
+        elif self.state == "comma_or_end":
+            if char == ",":
+                self.state = "item"
+            elif char == "]":
+                self._end_array()
+            else:
+                self._fail("',' or ']'")
+            self.pos += 1
+        elif self.state == "key_or_end":
+            if char == "}":
+                self.pos += 1
+                self.state = "done"
+            elif char == '"':
+                decoded = self._decode(final)
+                if decoded is None:
+                    return False
+                self.current_key = decoded[0]
+                self.state = "colon"
+            else:
+                self._fail("a key or '}'")
+        elif self.state == "colon":
+            if char != ":":
+                self._fail("':'")
+            self.pos += 1
+            self.state = "value"
+        elif self.state == "value":
+            if self.current_key == self.key and not self.found_array:
+                if char != "[":
+                    self._fail(f"an array under {self.key!r}")
+                self.pos += 1
+                self.found_array = True
+                self.state = "item_or_end"
+            else:
+                if self._decode(final) is None:
+                    return False
+                self.state = "member_end"
+        elif self.state == "member_end":
+            if char == ",":
+                self.state = "key_or_end"
+            elif char == "}":
+                self.state = "done"
+            else:
+                self._fail("',' or '}'")
+            self.pos += 1
+        elif self.state == "done":
+            self._fail("end of document")
+        return True
+
+    def _end_array(self):
+        self.found_array = True
+        self.state = "member_end" if self.in_envelope else "done"
+
+    def feed(self, text, final=False):
+        """Parse ``text``; returns the items it completed"""
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        self.peak_buffer = max(self.peak_buffer, len(self.buffer))
+        items = []
+        while self._step(items, final):
+            pass
+        if len(self.buffer) - self.pos > self.max_item_chars:
+            raise ValueError(f"item {self.count} exceeds {self.max_item_chars} characters")
+        return items
+
+    def close(self):
+        """Flush the tail and check the document ended where it should"""
+        items = self.feed("", final=True)
+        if self.state != "done":
+            raise ValueError("truncated JSON document")
+        if self.key is not None and not self.found_array:
+            raise ValueError(f"no {self.key!r} array in the response")
+        return items
+
+
+def iter_items(response, key=None, chunk_size=DEFAULT_CHUNK_SIZE, max_item_chars=DEFAULT_MAX_ITEM_CHARS):
+    """Yield array items from a ``stream=True`` response as they arrive"""
+    parser = ArrayParser(key, max_item_chars)
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")()
+    try:
+        for chunk in response.iter_content(chunk_size):
+            yield from parser.feed(decoder.decode(chunk))
+        yield from parser.feed(decoder.decode(b"", final=True))
+        yield from parser.close()
+    finally:
+        response.close()
+
+
+class StreamResult:
+    def __init__(self, url):
+        self.url = url
+        self.status = None
+        self.items = 0
+        self.ttfb = None
+        self.first_item = None
+        self.total = None
+        self.bytes = 0
+        self.peak_memory = 0
+        self.error = None
+
+
+def measure_list(session, operation, key=None, validate=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream one list endpoint: time to first byte/item, total time and peak memory"""
+    result = StreamResult(operation["url"])
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        response = session.request(stream=True, timeout=60, **request_kwargs(operation))
+        result.ttfb = time.perf_counter() - started
+        result.status = response.status_code
+        if response.status_code != 200:
+            response.close()
+            result.error = f"status {response.status_code}"
+            return result
+        raw = response.raw
+
+        for item in iter_items(response, key, chunk_size):
+            if result.first_item is None:
+                result.first_item = time.perf_counter() - started
+            if validate is not None:
+                validate(item)
+            result.items += 1
+        result.bytes = raw.tell()
+    except (AssertionError, ValueError, requests.RequestException) as e:
+        result.error = f"item {result.items}: {e}" if result.status == 200 else str(e)
+    finally:
+        result.total = time.perf_counter() - started
+        result.peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def measure_full(session, operation):
+    """Peak memory and time for the ``response.json()`` baseline"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        items = session.request(timeout=60, **request_kwargs(operation)).json()
+        return len(items), time.perf_counter() - started, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def require_fields(fields):
+    """Validator asserting every item is an object with ``fields``"""
+    def validate(item):
+        assert isinstance(item, dict), f"expected an object, got {type(item).__name__}"
+        missing = [f for f in fields if f not in item]
+        assert not missing, f"missing {', '.join(missing)} in item {item.get('id', '?')}"
+    return validate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream and validate large list responses")
+    parser.add_argument("--target", action="append", help=f"one of: {', '.join(sorted(OPERATIONS))} (repeatable)")
+    parser.add_argument("--key", help="envelope key holding the array (e.g. data); default is a top-level array")
+    parser.add_argument("--require", default="id", help="comma-separated fields every item must have")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--compare", action="store_true", help="also measure the response.json() baseline")
+    args = parser.parse_args(argv)
+
+    session = requests.Session()
+    validate = require_fields([f for f in args.require.split(",") if f])
+    failed = 0
+    for name in args.target or ["participants", "activities", "enrollments", "leads"]:
+        operation = get_operation(name)
+        result = measure_list(session, operation, args.key, validate, args.chunk_size)
+        mark = "❌" if result.error else "✅"
+        print(f"\n{mark} {name}: {result.items} items, {result.bytes / 1024:.1f} KB")
+        if result.ttfb is not None:
+            first = f"{result.first_item * 1000:.1f}ms" if result.first_item is not None else "-"
+            print(f"   first byte {result.ttfb * 1000:.1f}ms  first item {first}  total {result.total * 1000:.1f}ms")
+        print(f"   peak client memory {result.peak_memory / 1024:.1f} KB (streamed)")
+        if args.compare and not result.error:
+            count, elapsed, peak = measure_full(session, operation)
+            print(f"   response.json(): {count} items in {elapsed * 1000:.1f}ms, peak {peak / 1024:.1f} KB")
+        if result.error:
+            failed += 1
+            print(f"   {result.error}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Open-loop load generator with coordinated-omission correction.
+
+Requests are scheduled on a fixed arrival-rate timeline instead of being
+sent one after another. Latency is measured twice:
+
+- naive: from the moment the request actually left the client
+- corrected: from the moment the request was *supposed* to be sent
+
+When the server stalls, requests queue up behind busy workers and the
+corrected numbers show the delay users would really have seen.
+
+Usage:
+    python -m harness.loadgen --target activities --rate 50 --duration 30
+    python -m harness.loadgen --target tasks-parse --rate 2 --duration 60
+    python -m harness.loadgen --target participants --rate 200 --identities identities.json
+"""
+import argparse
+import functools
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from harness.audio import synth_wav, transcribe_body
+from harness.config import API_BASE, BASE_URL, NEXT_BASE_URL, api_headers, next_headers
+from harness.histogram import LatencyHistogram, format_ms
+from harness.tokens import TokenManager, load_identities
+from harness.tracing import TIMINGS, new_traceparent
+
+DEFAULT_CONCURRENCY = 64
+DEFAULT_TIMEOUT = 30
+
+
+def _get(name, url):
+    return {"name": name, "method": "GET", "url": url, "headers": api_headers()}
+
+
+# Named operations that can be used as load targets
+OPERATIONS = {
+    "health": _get("health", f"{BASE_URL}/api/health"),
+    "activities": _get("activities", f"{API_BASE}/activities"),
+    "participants": _get("participants", f"{API_BASE}/participants"),
+    "enrollments": _get("enrollments", f"{API_BASE}/enrollments"),
+    "leads": _get("leads", f"{API_BASE}/marketing/leads"),
+    "public-activities": _get("public-activities", f"{API_BASE}/public/activities"),
+    "public-providers": _get("public-providers", f"{API_BASE}/public/providers"),
+    "tasks-parse": {
+        "name": "tasks-parse",
+        "method": "POST",
+        "url": f"{NEXT_BASE_URL}/api/tasks/parse",
+        "headers": next_headers(),
+        "json": {"taskText": "call john tomorrow and email sarah about the report"},
+    },
+    # Multipart body built by send() so the operation stays JSON for harness.distributed agents
+    "transcribe": {
+        "name": "transcribe",
+        "method": "POST",
+        "url": f"{NEXT_BASE_URL}/api/transcribe",
+        "headers": {"Origin": next_headers()["Origin"]},
+        "audio_seconds": 1.0,
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def audio_upload(seconds):
+    """(multipart body, content type) carrying ``seconds`` of synthetic speech"""
+    return transcribe_body(synth_wav(seconds))
+
+
+def request_kwargs(operation, headers=None):
+    """``session.request`` arguments for ``operation``, building its body (e.g. an audio upload)"""
+    headers = dict(operation.get("headers") or {}, **(headers or {}))
+    data = None
+    if operation.get("audio_seconds"):
+        data, headers["Content-Type"] = audio_upload(operation["audio_seconds"])
+    return {"method": operation["method"], "url": operation["url"], "headers": headers,
+            "json": operation.get("json"), "data": data}
+
+
+def get_operation(name):
+    """Look up a named operation, raising a readable error for typos"""
+    try:
+        return OPERATIONS[name]
+    except KeyError:
+        raise SystemExit(f"❌ Unknown target '{name}'. Choose from: {', '.join(sorted(OPERATIONS))}")
+
+
+class LoadResult:
+    """Latency histograms and status counts for one load run"""
+
+    def __init__(self, operation, rate, duration):
+        self.operation = operation
+        self.rate = rate
+        self.duration = duration
+        self.naive = LatencyHistogram()
+        self.corrected = LatencyHistogram()
+        self.send_lag = LatencyHistogram()
+        self.statuses = Counter()
+        self.errors = 0
+        self.elapsed = 0.0
+        self.start_delay = 0.0
+
+    def record(self, intended, sent, done, status):
+        self.naive.record(done - sent)
+        self.corrected.record(done - intended)
+        self.send_lag.record(sent - intended)
+        self.statuses[str(status)] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors += 1
+
+    @property
+    def completed(self):
+        return self.naive.count
+
+    def throughput(self):
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    def merge(self, other):
+        self.naive.merge(other.naive)
+        self.corrected.merge(other.corrected)
+        self.send_lag.merge(other.send_lag)
+        self.statuses.update(other.statuses)
+        self.errors += other.errors
+        self.elapsed = max(self.elapsed, other.elapsed)
+        self.start_delay = max(self.start_delay, other.start_delay)
+        return self
+
+    def to_dict(self):
+        return {
+            "operation": self.operation,
+            "rate": self.rate,
+            "duration": self.duration,
+            "naive": self.naive.to_dict(),
+            "corrected": self.corrected.to_dict(),
+            "send_lag": self.send_lag.to_dict(),
+            "statuses": dict(self.statuses),
+            "errors": self.errors,
+            "elapsed": self.elapsed,
+            "start_delay": self.start_delay,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        result = cls(data["operation"], data["rate"], data["duration"])
+        result.naive = LatencyHistogram.from_dict(data["naive"])
+        result.corrected = LatencyHistogram.from_dict(data["corrected"])
+        result.send_lag = LatencyHistogram.from_dict(data["send_lag"])
+        result.statuses = Counter(data["statuses"])
+        result.errors = data["errors"]
+        result.elapsed = data["elapsed"]
+        result.start_delay = data.get("start_delay", 0.0)
+        return result
+
+
+def send(session, operation, timeout=DEFAULT_TIMEOUT, tokens=None, identity=None):
+    """Send one request for ``operation`` and return its status (or exception name)"""
+    request = request_kwargs(operation, {"traceparent": new_traceparent()})
+    token = None
+    started = time.perf_counter()  # a token fetch is part of this request's latency
+    try:
+        if tokens is not None:
+            token = tokens.token(identity)
+            request["headers"]["Authorization"] = f"Bearer {token}"
+        response = session.request(timeout=timeout, **request)
+        response.content  # make sure the whole body has been read
+        if token and response.status_code == 401:
+            tokens.invalidate(identity, token)
+        TIMINGS.record(operation["method"], operation["url"], time.perf_counter() - started,
+                       response.headers.get("Server-Timing"))
+        return response.status_code
+    except requests.RequestException as e:
+        return type(e).__name__
+
+
+def run_open_loop(operation, rate, duration, concurrency=DEFAULT_CONCURRENCY,
+                  start_at=None, worker_index=0, worker_count=1, timeout=DEFAULT_TIMEOUT,
+                  tokens=None, identities=None):
+    """
+    Fire ``operation`` at ``rate`` requests/second for ``duration`` seconds.
+
+    The schedule is global: arrival ``i`` is due at ``start + i / rate``.
+    With ``worker_count`` > 1 this process only sends the arrivals where
+    ``i % worker_count == worker_index``, so several workers sharing the
+    same ``start_at`` (wall-clock seconds) together produce ``rate``.
+    With ``tokens`` (a harness.tokens.TokenManager) arrival ``i`` is sent
+    as ``identities[i % len(identities)]``.
+    """
+    result = LoadResult(operation["name"], rate, duration)
+    local = threading.local()
+    lock = threading.Lock()
+
+    def fire(intended, i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        identity = identities[i % len(identities)] if tokens is not None else None
+        sent = time.perf_counter()
+        try:
+            status = send(session, operation, timeout, tokens, identity)
+        except Exception as e:
+            # e.g. a failed login in the token manager; a lost arrival would shrink the error rate
+            status = type(e).__name__
+        done = time.perf_counter()
+        with lock:
+            result.record(intended, sent, done, status)
+
+    if start_at is not None:
+        time.sleep(max(0.0, start_at - time.time()))
+        result.start_delay = time.time() - start_at
+    origin = time.perf_counter()
+    total = int(rate * duration)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(worker_index, total, worker_count):
+            intended = origin + i / rate
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, intended, i)
+
+    result.elapsed = time.perf_counter() - origin
+    return result
+
+
+def print_report(result, title=None, tokens=None):
+    """Print naive vs corrected percentiles side by side"""
+    print(f"\n📊 {title or result.operation}: target {result.rate:g} req/s for {result.duration:g}s")
+    print(f"   completed {result.completed} in {result.elapsed:.1f}s "
+          f"({result.throughput():.1f} req/s), errors {result.errors}")
+    print(f"   statuses: {dict(result.statuses)}")
+    print(f"   {'':<10}{'naive ms':>12}{'corrected ms':>14}")
+    naive = result.naive.summary()
+    corrected = result.corrected.summary()
+    for key in ("p50", "p90", "p99", "p99.9", "max"):
+        print(f"   {key:<10}{format_ms(naive[key]):>12}{format_ms(corrected[key]):>14}")
+    lag = result.send_lag.percentile(99)
+    if lag is not None and lag > 1.0 / max(result.rate, 1e-9):
+        print(f"   ⚠️ p99 send lag {format_ms(lag)} ms - client or server could not keep up with the schedule")
+    for line in TIMINGS.report_lines():
+        print(f"   ⏱️ {line}")
+    if tokens is not None:
+        for line in tokens.report_lines():
+            print(f"   🔑 {line}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop constant-arrival-rate load generator")
+    parser.add_argument("--target", default="activities", help=f"one of: {', '.join(sorted(OPERATIONS))}")
+    parser.add_argument("--rate", type=float, default=10.0, help="arrivals per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="max requests in flight")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--json", help="write the full result (with histograms) to this file")
+    parser.add_argument("--identities", help="JSON list of login bodies; requests carry their tokens "
+                                             "(see harness/tokens.py)")
+    args = parser.parse_args(argv)
+
+    operation = get_operation(args.target)
+    tokens = TokenManager() if args.identities else None
+    identities = load_identities(args.identities) if args.identities else None
+    print(f"🚀 {operation['method']} {operation['url']} at {args.rate:g} req/s")
+    result = run_open_loop(operation, args.rate, args.duration, args.concurrency, timeout=args.timeout,
+                           tokens=tokens, identities=identities)
+    print_report(result, tokens=tokens)
+    if tokens is not None:
+        tokens.close()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result.to_dict(), f)
+        print(f"💾 Saved result to {args.json}")
+    return 0 if result.errors == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Synthetic-monitoring daemon with a Prometheus metrics endpoint.
+
+Probes /api/health and a set of key read endpoints on a schedule, keeps
+the latest results per endpoint in fixed-size ring buffers, and serves
+rolling percentiles and error rates as Prometheus text on a local port so
+the existing dashboards can scrape API latency between test runs.
+
+Usage:
+    python -m harness.monitor --interval 15 --metrics-port 9464
+    python -m harness.monitor --endpoint health --endpoint public-activities
+    curl localhost:9464/metrics
+"""
+import argparse
+import http.server
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+import requests
+
+from harness.loadgen import OPERATIONS, get_operation, send
+
+DEFAULT_ENDPOINTS = ["health", "activities", "participants", "public-activities", "public-providers"]
+DEFAULT_WINDOW = 240  # samples kept per endpoint (1 hour at a 15s interval)
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class RingBuffer:
+    """Fixed-size window of (timestamp, latency, ok) probe samples"""
+
+    def __init__(self, size=DEFAULT_WINDOW):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.total_count = 0
+        self.total_latency = 0.0
+        self.total_errors = 0
+        self.last = None
+
+    def add(self, latency, ok, status):
+        sample = (time.time(), latency, ok, status)
+        with self.lock:
+            self.samples.append(sample)
+            self.total_count += 1
+            self.total_latency += latency
+            self.total_errors += 0 if ok else 1
+            self.last = sample
+
+    def snapshot(self):
+        """Rolling quantiles and error ratio over the window, plus lifetime totals"""
+        with self.lock:
+            samples = list(self.samples)
+            totals = (self.total_count, self.total_latency, self.total_errors, self.last)
+        latencies = sorted(s[1] for s in samples)
+        quantiles = {}
+        for q in QUANTILES:
+            quantiles[q] = latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else None
+        errors = sum(1 for s in samples if not s[2])
+        return {
+            "quantiles": quantiles,
+            "window": len(samples),
+            "error_ratio": errors / len(samples) if samples else 0.0,
+            "count": totals[0],
+            "sum": totals[1],
+            "errors": totals[2],
+            "last": totals[3],
+        }
+
+
+class Prober:
+    """Probe one endpoint forever on its own thread"""
+
+    def __init__(self, operation, interval, window, timeout):
+        self.operation = operation
+        self.interval = interval
+        self.timeout = timeout
+        self.buffer = RingBuffer(window)
+        self.session = requests.Session()
+        self.stopped = threading.Event()
+
+    def probe_once(self):
+        started = time.perf_counter()
+        status = send(self.session, self.operation, self.timeout)
+        latency = time.perf_counter() - started
+        self.buffer.add(latency, isinstance(status, int) and status < 400, status)
+
+    def run(self):
+        # Spread the first probes so endpoints are not hit in lockstep
+        self.stopped.wait(random.uniform(0, self.interval))
+        while not self.stopped.is_set():
+            started = time.monotonic()
+            self.probe_once()
+            self.stopped.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+def render_metrics(probers):
+    """Prometheus text exposition for all endpoints"""
+    lines = [
+        "# HELP harness_probe_latency_seconds Probe latency over the rolling window",
+        "# TYPE harness_probe_latency_seconds summary",
+    ]
+    snapshots = {name: p.buffer.snapshot() for name, p in probers.items()}
+    for name, snap in snapshots.items():
+        for q, value in snap["quantiles"].items():
+            if value is not None:
+                lines.append(f'harness_probe_latency_seconds{{endpoint="{name}",quantile="{q}"}} {value:.6f}')
+        lines.append(f'harness_probe_latency_seconds_sum{{endpoint="{name}"}} {snap["sum"]:.6f}')
+        lines.append(f'harness_probe_latency_seconds_count{{endpoint="{name}"}} {snap["count"]}')
+
+    lines += ["# HELP harness_probe_errors_total Failed probes since start",
+              "# TYPE harness_probe_errors_total counter"]
+    lines += [f'harness_probe_errors_total{{endpoint="{n}"}} {s["errors"]}' for n, s in snapshots.items()]
+
+    lines += ["# HELP harness_probe_error_ratio Share of failed probes in the rolling window",
+              "# TYPE harness_probe_error_ratio gauge"]
+    lines += [f'harness_probe_error_ratio{{endpoint="{n}"}} {s["error_ratio"]:.4f}' for n, s in snapshots.items()]
+
+    lines += ["# HELP harness_probe_up Whether the most recent probe succeeded",
+              "# TYPE harness_probe_up gauge"]
+    for name, snap in snapshots.items():
+        if snap["last"] is not None:
+            lines.append(f'harness_probe_up{{endpoint="{name}"}} {1 if snap["last"][2] else 0}')
+
+    lines += ["# HELP harness_probe_last_timestamp_seconds Unix time of the most recent probe",
+              "# TYPE harness_probe_last_timestamp_seconds gauge"]
+    for name, snap in snapshots.items():
+        if snap["last"] is not None:
+            lines.append(f'harness_probe_last_timestamp_seconds{{endpoint="{name}"}} {snap["last"][0]:.3f}')
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(probers, host, port):
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics(probers).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes every few seconds would drown the probe log
+
+    server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic API monitoring with a Prometheus endpoint")
+    parser.add_argument("--endpoint", action="append", help=f"one of: {', '.join(sorted(OPERATIONS))} (repeatable)")
+    parser.add_argument("--interval", type=float, default=15.0, help="seconds between probes per endpoint")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="samples kept per endpoint")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--metrics-host", default="127.0.0.1")
+    parser.add_argument("--metrics-port", type=int, default=9464)
+    args = parser.parse_args(argv)
+
+    names = args.endpoint or DEFAULT_ENDPOINTS
+    probers = {name: Prober(get_operation(name), args.interval, args.window, args.timeout) for name in names}
+    serve_metrics(probers, args.metrics_host, args.metrics_port)
+    print(f"📡 Probing {', '.join(names)} every {args.interval:g}s")
+    print(f"📈 Metrics at http://{args.metrics_host}:{args.metrics_port}/metrics (Ctrl+C to stop)")
+
+    threads = [threading.Thread(target=p.run, daemon=True) for p in probers.values()]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n🛑 Monitor stopped")
+        for prober in probers.values():
+            prober.stopped.set()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Start and stop a local ``next start`` instance for benchmarks"""
+import os
+import signal
+import socket
+import subprocess
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PORT = 3100
+
+
+class NextServer:
+    """A production ``next start`` process on its own port"""
+
+    def __init__(self, port=DEFAULT_PORT, env=None, log_path=None):
+        self.port = port
+        self.env = env or {}
+        self.log_path = log_path
+        self.process = None
+        self.boot_time = None
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.port}"
+
+    def start(self, timeout=60):
+        """Spawn the server and block until it accepts connections"""
+        if not os.path.exists(os.path.join(REPO_ROOT, ".next", "BUILD_ID")):
+            raise RuntimeError("No production build found - run `npm run build` first")
+
+        env = dict(os.environ, PORT=str(self.port), **self.env)
+        log = open(self.log_path, "ab") if self.log_path else subprocess.DEVNULL
+        started = time.perf_counter()
+        try:
+            self.process = subprocess.Popen(
+                ["npx", "next", "start", "-p", str(self.port)],
+                cwd=REPO_ROOT,
+                env=env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,  # so stop() can kill npx and node together
+            )
+        finally:
+            # The child has its own descriptor; coldstart starts a server per sample
+            if self.log_path:
+                log.close()
+        self._wait_for_port(timeout)
+        self.boot_time = time.perf_counter() - started
+        return self
+
+    def _wait_for_port(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"next start exited with code {self.process.returncode}")
+            try:
+                with socket.create_connection(("localhost", self.port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.05)
+        self.stop()
+        raise RuntimeError(f"next start did not open port {self.port} within {timeout}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            os.killpg(self.process.pid, signal.SIGTERM)
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(self.process.pid, signal.SIGKILL)
+                self.process.wait()
+        self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Note-save write amplification for user_notes: full upserts vs deltas.
+
+src/hooks/useNotes.ts saves a tab 2.5s after the last keystroke (and on
+blur), and ``saveUserNote`` upserts the tab's whole ``content`` every time.
+This tool replays typing sessions - synthetic ones per ``--sizes`` initial
+note length, or recorded ones from ``--sessions`` - through four save
+schemes against a local Postgres:
+
+- ``full``: the app today, the whole note upserted per debounced save
+- ``coalesced``: the whole note, but only after ``--idle`` seconds without
+  typing or ``--max-wait`` seconds after the first unsaved change
+- ``delta``: the 2.5s debounce, sending only the changed span as one
+  ``overlay()`` splice of ``content``
+- ``delta-log``: the changed span appended to an edit log, folded into
+  ``content`` every ``--compact-every`` edits and on blur
+
+and reports per user-minute the saves, bytes sent (the JSON body
+supabase-js would send) and WAL generated (``pg_current_wal_lsn()``
+before and after each scheme, after a CHECKPOINT), plus WAL per save,
+table growth and save latency. ``content`` is a single TOASTed value, so
+a splice still writes a new copy of the whole note: expect ``delta`` to
+cut bytes sent but not WAL, and only the edit log to cut both. Every
+scheme's final content is checked against the session's final text.
+
+Sessions are JSON lines ``{"initial": text, "events": [[t, pos, deleted,
+inserted], ...]}`` with ``t`` in seconds; ``--write-sessions`` saves the
+synthetic ones in that format.
+
+Usage:
+    python -m harness.notes_replay --sizes 1000,20000,100000 --users 20 --minutes 5
+    python -m harness.notes_replay --sessions typing.jsonl --scheme full --scheme delta
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+from harness.config import PG_DSN
+from harness.histogram import LatencyHistogram, format_ms
+from harness.pg import apply_schema, connect, create_users, table_size, truncate
+
+DEBOUNCE = 2.5  # useNotes.ts debouncedSaveNotes
+SCHEMES = ("full", "coalesced", "delta", "delta-log")
+
+WORDS = ("call email meeting report tomorrow buy milk remind sarah about the invoice and send notes "
+         "להתקשר לאמא מחר пожалуйста купить молоко project deadline review draft").split()
+
+EDIT_LOG = """
+CREATE TABLE IF NOT EXISTS notes_replay_edits (
+  id BIGSERIAL PRIMARY KEY,
+  user_id UUID NOT NULL,
+  title TEXT NOT NULL,
+  pos INTEGER NOT NULL,
+  deleted INTEGER NOT NULL,
+  inserted TEXT NOT NULL
+)"""
+
+UPSERT_SQL = ("INSERT INTO user_notes (user_id, title, content, updated_at) VALUES (%s, %s, %s, %s) "
+              "ON CONFLICT (user_id, title) DO UPDATE SET content = EXCLUDED.content, updated_at = EXCLUDED.updated_at")
+SPLICE_SQL = ("UPDATE user_notes SET content = overlay(content placing %s from %s for %s), updated_at = %s "
+              "WHERE user_id = %s AND title = %s")
+
+
+def sentence(rng, chars):
+    words, length = [], 0
+    while length < chars:
+        words.append(rng.choice(WORDS))
+        length += len(words[-1]) + 1
+    return " ".join(words) + ". "
+
+
+def synthetic_session(rng, initial_chars, minutes):
+    """Typing with pauses, backspaces, mid-note edits and dictated bursts"""
+    text = sentence(rng, initial_chars) if initial_chars else ""
+    initial, events = text, []
+    length, cursor, t = len(text), len(text), 0.0
+    while True:
+        r = rng.random()
+        if r < 0.05:
+            t += rng.uniform(3, 20)  # thinking - the debounce fires
+            continue
+        if r < 0.08 and length:
+            cursor = rng.randint(0, length)  # click somewhere else in the note
+            continue
+        if r < 0.12:
+            inserted, t = sentence(rng, rng.randint(100, 400)), t + rng.uniform(2, 5)  # voice dictation
+            cursor = length
+        elif r < 0.2 and cursor:
+            deleted = min(cursor, rng.randint(1, 8))
+            t += deleted * 0.12
+            if t > minutes * 60:
+                break
+            events.append((round(t, 3), cursor - deleted, deleted, ""))
+            cursor, length = cursor - deleted, length - deleted
+            continue
+        else:
+            inserted = rng.choice(WORDS) + " "
+            t += len(inserted) * rng.lognormvariate(math.log(0.18), 0.3)
+        if t > minutes * 60:
+            break
+        events.append((round(t, 3), cursor, 0, inserted))
+        cursor, length = cursor + len(inserted), length + len(inserted)
+    return {"initial": initial, "events": events}
+
+
+def load_sessions(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def apply_edit(text, pos, deleted, inserted):
+    return text[:pos] + inserted + text[pos + deleted:]
+
+
+def splice(old, new):
+    """(pos, deleted, inserted) turning ``old`` into ``new`` via common prefix and suffix"""
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return prefix, len(old) - prefix - suffix, new[prefix:len(new) - suffix]
+
+
+def save_points(session, scheme, idle, max_wait):
+    """[(t, content)] the scheme saves during ``session``, ending with the blur save"""
+    events = session["events"]
+    text, saved, points = session["initial"], session["initial"], []
+    first_unsaved = None
+    for i, (t, pos, deleted, inserted) in enumerate(events):
+        text = apply_edit(text, pos, deleted, inserted)
+        first_unsaved = t if first_unsaved is None else first_unsaved
+        next_t = events[i + 1][0] if i + 1 < len(events) else math.inf
+        if scheme == "coalesced":
+            due = min(t + idle, first_unsaved + max_wait)
+        else:
+            due = t + DEBOUNCE
+        if next_t > due and text != saved:
+            points.append((due, text))
+            saved, first_unsaved = text, None
+    if text != saved:
+        points.append((events[-1][0] if events else 0.0, text))  # blur
+    return points
+
+
+def payload_bytes(body):
+    """Size of the JSON body supabase-js would send (UTF-8, no ASCII escaping)"""
+    return len(json.dumps(body, ensure_ascii=False).encode())
+
+
+class Replay:
+    """Runs every session's saves for one scheme and tallies bytes, WAL and latency"""
+
+    def __init__(self, conn, scheme, compact_every):
+        self.conn = conn
+        self.scheme = scheme
+        self.compact_every = compact_every
+        self.saves = 0
+        self.bytes = 0
+        self.latency = LatencyHistogram()
+        self.pending = {}
+
+    def save(self, user_id, title, old, new, final=False):
+        now = datetime.now(timezone.utc)
+        if self.scheme in ("full", "coalesced"):
+            self.bytes += payload_bytes({"user_id": str(user_id), "title": title, "content": new,
+                                         "updated_at": now.isoformat()})
+            started = time.perf_counter()
+            self.conn.execute(UPSERT_SQL, (user_id, title, new, now))
+        else:
+            pos, deleted, inserted = splice(old, new)
+            self.bytes += payload_bytes({"user_id": str(user_id), "title": title, "pos": pos,
+                                         "deleted": deleted, "inserted": inserted})
+            started = time.perf_counter()
+            if self.scheme == "delta":
+                self.conn.execute(SPLICE_SQL, (inserted, pos + 1, deleted, now, user_id, title))
+            else:
+                self.conn.execute("INSERT INTO notes_replay_edits (user_id, title, pos, deleted, inserted) "
+                                  "VALUES (%s, %s, %s, %s, %s)", (user_id, title, pos, deleted, inserted))
+                self.pending[user_id] = self.pending.get(user_id, 0) + 1
+                if final or self.pending[user_id] >= self.compact_every:
+                    self.compact(user_id, title, new, now)
+        self.latency.record(time.perf_counter() - started)
+        self.saves += 1
+
+    def compact(self, user_id, title, content, now):
+        """Fold the edit log into content - server-side, so nothing extra crosses the network"""
+        with self.conn.transaction():
+            self.conn.execute("UPDATE user_notes SET content = %s, updated_at = %s WHERE user_id = %s AND title = %s",
+                              (content, now, user_id, title))
+            self.conn.execute("DELETE FROM notes_replay_edits WHERE user_id = %s AND title = %s", (user_id, title))
+        self.pending[user_id] = 0
+
+
+def wal_lsn(conn):
+    return conn.execute("SELECT pg_current_wal_lsn()").fetchone()[0]
+
+
+def run_scheme(conn, scheme, sessions, users, args):
+    """Replay ``sessions`` (one per user) through ``scheme``; returns a result dict"""
+    truncate(conn, "user_notes", "notes_replay_edits")
+    title = "Tab 0"
+    with conn.cursor() as cur:
+        with cur.copy("COPY user_notes (user_id, title, content) FROM STDIN") as copy:
+            for user_id, session in zip(users, sessions):
+                copy.write_row((user_id, title, session["initial"]))
+    conn.execute("VACUUM ANALYZE user_notes")
+    conn.execute("CHECKPOINT")
+    size_before = table_size(conn, "user_notes")
+    start_lsn = wal_lsn(conn)
+
+    # Interleave every user's saves in timeline order, as concurrent users would
+    timeline = []
+    for user_id, session in zip(users, sessions):
+        points = save_points(session, scheme, args.idle, args.max_wait)
+        previous = session["initial"]
+        for n, (t, content) in enumerate(points):
+            timeline.append((t, user_id, previous, content, n == len(points) - 1))
+            previous = content
+    timeline.sort(key=lambda point: point[0])
+
+    replay = Replay(conn, scheme, args.compact_every)
+    for _, user_id, old, new, final in timeline:
+        replay.save(user_id, title, old, new, final)
+    wal = conn.execute("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s)", (start_lsn,)).fetchone()[0]
+
+    stored = dict(conn.execute("SELECT user_id, content FROM user_notes WHERE title = %s", (title,)).fetchall())
+    wrong = sum(1 for user_id, session in zip(users, sessions) if stored.get(user_id) != final_text(session))
+    minutes = sum(max(s["events"][-1][0], 1.0) if s["events"] else 1.0 for s in sessions) / 60.0
+    return {
+        "saves": replay.saves,
+        "bytes": replay.bytes,
+        "wal": float(wal),
+        "user_minutes": minutes,
+        "growth": table_size(conn, "user_notes") + table_size(conn, "notes_replay_edits") - size_before,
+        "latency": replay.latency,
+        "wrong": wrong,
+    }
+
+
+def final_text(session):
+    text = session["initial"]
+    for _, pos, deleted, inserted in session["events"]:
+        text = apply_edit(text, pos, deleted, inserted)
+    return text
+
+
+def print_results(label, results):
+    print(f"\n📝 {label}")
+    print(f"   {'scheme':<11}{'saves/min':>10}{'KB sent/min':>13}{'WAL KB/min':>12}{'WAL KB/save':>13}"
+          f"{'growth MB':>11}{'save p50':>10}{'p99':>9}")
+    for scheme, r in results.items():
+        minutes = r["user_minutes"]
+        mark = "" if not r["wrong"] else f"  ❌ {r['wrong']} notes differ from the typed text"
+        print(f"   {scheme:<11}{r['saves'] / minutes:>10.1f}{r['bytes'] / 1024 / minutes:>13.1f}"
+              f"{r['wal'] / 1024 / minutes:>12.1f}{r['wal'] / 1024 / max(r['saves'], 1):>13.1f}"
+              f"{r['growth'] / 1024 / 1024:>11.1f}{format_ms(r['latency'].percentile(50)):>8}ms"
+              f"{format_ms(r['latency'].percentile(99)):>7}ms{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="user_notes save write amplification: full upserts vs deltas")
+    parser.add_argument("--dsn", default=PG_DSN, help="scratch Postgres (default HARNESS_PG_DSN)")
+    parser.add_argument("--sizes", default="1000,20000,100000", help="initial note lengths (chars) to simulate")
+    parser.add_argument("--users", type=int, default=20, help="concurrent typing sessions per size")
+    parser.add_argument("--minutes", type=float, default=5.0, help="length of each synthetic session")
+    parser.add_argument("--sessions", help="JSON lines of recorded sessions instead of synthetic ones")
+    parser.add_argument("--write-sessions", help="save the synthetic sessions to this file")
+    parser.add_argument("--scheme", action="append", choices=SCHEMES, help="default: all")
+    parser.add_argument("--idle", type=float, default=10.0, help="coalesced: seconds of idle before saving")
+    parser.add_argument("--max-wait", type=float, default=60.0, help="coalesced: longest an edit stays unsaved")
+    parser.add_argument("--compact-every", type=int, default=50, help="delta-log: edits per fold into content")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    if args.sessions:
+        groups = [("recorded sessions", load_sessions(args.sessions))]
+    else:
+        groups = [(f"{int(size):,}-char notes", [synthetic_session(rng, int(size), args.minutes)
+                                                 for _ in range(args.users)])
+                  for size in args.sizes.split(",")]
+        if args.write_sessions:
+            with open(args.write_sessions, "w") as f:
+                for _, sessions in groups:
+                    for session in sessions:
+                        f.write(json.dumps(session, ensure_ascii=False) + "\n")
+
+    conn = connect(args.dsn)
+    apply_schema(conn)
+    conn.execute(EDIT_LOG)
+    try:
+        for label, sessions in groups:
+            truncate(conn, "auth.users")
+            users = create_users(conn, len(sessions))
+            results = {scheme: run_scheme(conn, scheme, sessions, users, args) for scheme in args.scheme or SCHEMES}
+            print_results(f"{label}: {len(sessions)} sessions, "
+                          f"{sum(len(s['events']) for s in sessions) / len(sessions):,.0f} edits each", results)
+    finally:
+        conn.execute("DROP TABLE IF EXISTS notes_replay_edits")
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
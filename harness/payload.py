@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Response payload sizes, compression and byte budgets per endpoint.
+
+Every operation is fetched twice: with ``Accept-Encoding: identity`` and
+with ``Accept-Encoding: gzip, br``. The report shows:
+
+- the uncompressed body and the bytes actually sent on the wire
+- the Content-Encoding the server chose and the ratio it achieved, next to
+  the ratio a local gzip of the same body would get
+- for list endpoints, the item count, bytes per item, fields per item and
+  the heaviest fields - the usual sign of ``select('*')`` over-fetching
+
+Each operation is checked against a byte budget. The defaults below apply
+to every endpoint; ``--budgets`` points at a JSON file overriding them per
+operation name, e.g. ``{"participants": {"max_item_bytes": 600}}``.
+
+Usage:
+    python -m harness.payload
+    python -m harness.payload --spec --budgets payload_budgets.json
+    python -m harness.payload --target leads --target tasks-parse
+"""
+import argparse
+import gzip
+import json
+import sys
+
+import requests
+
+from harness.config import BASE_URL, api_headers
+from harness.loadgen import OPERATIONS, get_operation, request_kwargs
+
+DEFAULT_BUDGET = {
+    "max_wire_bytes": 256 * 1024,    # compressed bytes per response
+    "max_item_bytes": 2048,          # uncompressed bytes per list item
+    "min_compression_ratio": 2.0,    # only checked for bodies over compress_above
+    "compress_above": 1024,
+}
+
+
+def load_budgets(path):
+    """{operation name: budget} from a JSON file, each merged over DEFAULT_BUDGET"""
+    if not path:
+        return {}
+    with open(path) as f:
+        overrides = json.load(f)
+    return {name: dict(DEFAULT_BUDGET, **budget) for name, budget in overrides.items()}
+
+
+def spec_operations(session):
+    """Parameterless GET operations from the OpenAPI spec"""
+    spec = session.get(f"{BASE_URL}/openapi.json", timeout=30).json()
+    operations = []
+    for path, methods in sorted(spec.get("paths", {}).items()):
+        if "get" in methods and "{" not in path:
+            operations.append({"name": path, "method": "GET", "url": f"{BASE_URL}{path}", "headers": api_headers()})
+    return operations
+
+
+def fetch(session, operation, accept_encoding):
+    """(response, raw wire bytes) without letting requests decode the body"""
+    response = session.request(stream=True, timeout=60,
+                               **request_kwargs(operation, {"Accept-Encoding": accept_encoding}))
+    wire = response.raw.read(decode_content=False)
+    response.close()
+    return response, wire
+
+
+def list_items(body):
+    """Items of a list response (plain array or ``data`` envelope), else None"""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    if isinstance(payload, dict) and isinstance(payload.get("data"), list):
+        payload = payload["data"]
+    return payload if isinstance(payload, list) else None
+
+
+def field_weights(items):
+    """Average serialised bytes per top-level field across ``items``"""
+    totals = {}
+    objects = [item for item in items if isinstance(item, dict)]
+    for item in objects:
+        for name, value in item.items():
+            totals[name] = totals.get(name, 0) + len(json.dumps(value, separators=(",", ":")))
+    return {name: total / len(objects) for name, total in totals.items()} if objects else {}
+
+
+def measure(session, operation):
+    plain, body = fetch(session, operation, "identity")
+    encoded, wire = fetch(session, operation, "gzip, br")
+    row = {
+        "name": operation["name"],
+        "status": plain.status_code,
+        "bytes": len(body),
+        "wire_bytes": len(wire),
+        "encoding": encoded.headers.get("Content-Encoding", "identity"),
+        "ratio": len(body) / len(wire) if wire else 1.0,
+        "gzip_ratio": len(body) / len(gzip.compress(body)) if body else 1.0,
+        "items": None,
+        "item_bytes": None,
+        "fields": None,
+        "heaviest": [],
+    }
+    items = list_items(body) if plain.status_code == 200 else None
+    if items:
+        weights = field_weights(items)
+        row["items"] = len(items)
+        row["item_bytes"] = len(body) / len(items)
+        row["fields"] = len(weights)
+        row["heaviest"] = sorted(weights.items(), key=lambda kv: kv[1], reverse=True)[:3]
+    return row
+
+
+def check_budget(row, budget):
+    """Budget violations for one measured operation"""
+    violations = []
+    if row["wire_bytes"] > budget["max_wire_bytes"]:
+        violations.append(f"{row['wire_bytes']} wire bytes > {budget['max_wire_bytes']}")
+    if row["item_bytes"] is not None and row["item_bytes"] > budget["max_item_bytes"]:
+        violations.append(f"{row['item_bytes']:.0f} bytes per item > {budget['max_item_bytes']}")
+    if row["bytes"] > budget["compress_above"]:
+        if row["encoding"] == "identity":
+            violations.append(f"uncompressed {row['bytes']} byte body (gzip would give {row['gzip_ratio']:.1f}x)")
+        elif row["ratio"] < budget["min_compression_ratio"]:
+            violations.append(f"compression ratio {row['ratio']:.1f}x < {budget['min_compression_ratio']}x")
+    return violations
+
+
+def print_row(row, violations):
+    mark = "❌" if violations else "✅"
+    print(f"\n{mark} {row['name']}  [{row['status']}]")
+    print(f"   body {row['bytes']} B, wire {row['wire_bytes']} B ({row['encoding']}, {row['ratio']:.1f}x;"
+          f" local gzip {row['gzip_ratio']:.1f}x)")
+    if row["items"]:
+        heaviest = ", ".join(f"{name} {size:.0f}B" for name, size in row["heaviest"])
+        print(f"   {row['items']} items, {row['item_bytes']:.0f} B/item, {row['fields']} fields/item"
+              f" (heaviest: {heaviest})")
+    for violation in violations:
+        print(f"   - over budget: {violation}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Payload size, compression and byte budgets per endpoint")
+    parser.add_argument("--target", action="append", help=f"one of: {', '.join(sorted(OPERATIONS))} (repeatable)")
+    parser.add_argument("--spec", action="store_true", help="also check every parameterless GET in the OpenAPI spec")
+    parser.add_argument("--budgets", help="JSON file of per-operation budget overrides")
+    parser.add_argument("--json", dest="json_path", help="write the measurements to this file")
+    args = parser.parse_args(argv)
+
+    session = requests.Session()
+    if args.target:
+        operations = [get_operation(name) for name in args.target]
+    else:
+        # POSTs (tasks-parse calls the model) only run when asked for by name
+        operations = [op for op in OPERATIONS.values() if op["method"] == "GET"]
+    if args.spec:
+        known = {op["url"] for op in operations}
+        operations += [op for op in spec_operations(session) if op["url"] not in known]
+
+    budgets = load_budgets(args.budgets)
+    rows, failed = [], 0
+    for operation in operations:
+        try:
+            row = measure(session, operation)
+        except requests.RequestException as e:
+            print(f"\n⚠️ {operation['name']}: {type(e).__name__}")
+            continue
+        violations = check_budget(row, budgets.get(operation["name"], DEFAULT_BUDGET))
+        row["violations"] = violations
+        failed += 1 if violations else 0
+        rows.append(row)
+        print_row(row, violations)
+
+    total, wire = sum(r["bytes"] for r in rows), sum(r["wire_bytes"] for r in rows)
+    print(f"\n📦 {len(rows)} operations: {total} B uncompressed, {wire} B on the wire, {failed} over budget")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Local Postgres helpers shared by the database benchmarks.
+
+``apply_schema()`` loads supabase/migrations into a scratch database with
+just enough Supabase around it to run:
+
+- an ``auth`` schema with ``auth.users`` and ``auth.uid()``, which reads the
+  ``request.jwt.claim.sub`` setting the same way PostgREST sets it
+- the ``anon`` and ``authenticated`` roles the policies are written for
+- the tables the app queries but no migration creates (``tasks`` and
+  ``user_usage``, shaped after src/lib/supabase/client.ts), created before
+  the migrations so later migrations can index them, plus the
+  ``user_notes.title`` column the app upserts on
+
+``CREATE POLICY`` statements are rewritten to drop-and-create, so the
+schema can be applied repeatedly (and the guardian migration's
+``CREATE POLICY IF NOT EXISTS``, which Postgres does not support, loads).
+
+The benchmarks truncate and reseed their tables, so ``connect()`` refuses
+non-local hosts unless HARNESS_PG_ALLOW_REMOTE=1.
+"""
+import glob
+import os
+import re
+import time
+
+import psycopg
+from psycopg.conninfo import conninfo_to_dict
+
+from harness.config import PG_DSN
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(REPO_ROOT, "supabase", "migrations")
+LOCAL_HOSTS = {"", "localhost", "127.0.0.1", "::1"}
+
+SUPABASE_STUBS = """
+CREATE SCHEMA IF NOT EXISTS auth;
+
+CREATE TABLE IF NOT EXISTS auth.users (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  email TEXT,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS UUID LANGUAGE sql STABLE AS $$
+  SELECT coalesce(
+    nullif(current_setting('request.jwt.claim.sub', true), ''),
+    (nullif(current_setting('request.jwt.claims', true), '')::jsonb ->> 'sub')
+  )::uuid
+$$;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT FROM pg_roles WHERE rolname = 'anon') THEN
+    CREATE ROLE anon NOLOGIN;
+  END IF;
+  IF NOT EXISTS (SELECT FROM pg_roles WHERE rolname = 'authenticated') THEN
+    CREATE ROLE authenticated NOLOGIN;
+  END IF;
+END
+$$;
+
+GRANT USAGE ON SCHEMA auth TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION auth.uid() TO anon, authenticated;
+"""
+
+# Reconstructed from how src/lib/supabase/client.ts and /api/tasks/parse use them
+APP_TABLES = """
+CREATE TABLE IF NOT EXISTS tasks (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  title TEXT NOT NULL,
+  description TEXT,
+  due_date TIMESTAMPTZ,
+  assigned_to TEXT,
+  tags TEXT[] DEFAULT '{}',
+  priority TEXT DEFAULT 'medium',
+  status TEXT DEFAULT 'pending',
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS user_usage (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  month TEXT NOT NULL,
+  api_calls INTEGER NOT NULL DEFAULT 0,
+  tokens_used INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+APP_PATCHES = """
+-- saveUserNote() upserts on (user_id, title) and never sends a tab_id
+ALTER TABLE user_notes ADD COLUMN IF NOT EXISTS title TEXT;
+ALTER TABLE user_notes ALTER COLUMN tab_id DROP NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS user_notes_user_id_title_key ON user_notes (user_id, title);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA public TO authenticated;
+"""
+
+POLICY = re.compile(r'CREATE POLICY\s+(?:IF NOT EXISTS\s+)?("[^"]+")\s+ON\s+([\w.]+)', re.IGNORECASE)
+
+
+def _check_local(dsn):
+    host = conninfo_to_dict(dsn).get("host") or ""
+    if host not in LOCAL_HOSTS and not host.startswith("/") and os.environ.get("HARNESS_PG_ALLOW_REMOTE") != "1":
+        raise SystemExit(f"❌ Refusing to run against {host}: the benchmarks truncate tables. "
+                         f"Set HARNESS_PG_ALLOW_REMOTE=1 if this really is a scratch database.")
+
+
+def connect(dsn=None, autocommit=True):
+    """psycopg connection to the scratch database"""
+    dsn = dsn or PG_DSN
+    _check_local(dsn)
+    return psycopg.connect(dsn, autocommit=autocommit)
+
+
+def migration_sql(path):
+    """Migration text with every CREATE POLICY made re-runnable"""
+    with open(path) as f:
+        sql = f.read()
+    return POLICY.sub(r"DROP POLICY IF EXISTS \1 ON \2;\nCREATE POLICY \1 ON \2", sql)
+
+
+def migration_paths():
+    return sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql")))
+
+
+def apply_schema(conn):
+    """Supabase stubs and app tables, every migration in order, then the app's column patches"""
+    conn.execute(SUPABASE_STUBS)
+    conn.execute(APP_TABLES)
+    for path in migration_paths():
+        conn.execute(migration_sql(path))
+    conn.execute(APP_PATCHES)
+
+
+def truncate(conn, *tables):
+    conn.execute(f"TRUNCATE {', '.join(tables)} CASCADE")
+
+
+def create_users(conn, count):
+    """IDs of ``count`` new auth.users rows"""
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO auth.users (email) SELECT 'bench-' || gen_random_uuid() || '@example.com' "
+                    "FROM generate_series(1, %s) RETURNING id", (count,))
+        return [row[0] for row in cur.fetchall()]
+
+
+def timed_query(conn, sql, params=None):
+    """(seconds, rows) for one query, fetching every row"""
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall() if cur.description else []
+    return time.perf_counter() - started, rows
+
+
+def table_size(conn, table):
+    """Total on-disk size (heap + indexes + toast) in bytes"""
+    return conn.execute("SELECT pg_total_relation_size(%s)", (table,)).fetchone()[0]
+
+
+def explain(conn, sql, params=None, analyze=False):
+    """Root plan node of ``EXPLAIN (FORMAT JSON)``, optionally with ANALYZE and BUFFERS"""
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    with conn.cursor() as cur:
+        cur.execute(f"EXPLAIN ({options}) {sql}", params)
+        return cur.fetchone()[0][0]["Plan"]
+
+
+def plan_nodes(plan):
+    """Every node in a plan tree, depth first"""
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
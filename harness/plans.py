@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression checks for the app's per-user access patterns.
+
+Seeds a local Postgres with realistic per-user volumes - one heavy user
+with thousands of tasks, a long tail of light users, rows interleaved in
+insertion order as they would be in production - and records
+``EXPLAIN (ANALYZE, BUFFERS)`` for every tasks, user_notes and user_usage
+query src/lib/supabase/client.ts issues. A plan fails when it
+sequentially scans the queried table, sorts, or touches more shared
+buffers than the pattern's budget of ``max_buffers`` plus
+``buffers_per_row`` per returned row. Writes run inside a rolled-back
+transaction.
+
+Only the schema from supabase/migrations is checked. Patterns whose index
+no migration creates yet name it in ``missing_index``; they are reported
+as known gaps rather than failures until a migration adds it.
+
+tests/test_query_plans.py runs the same checks under pytest.
+
+Usage:
+    python -m harness.plans
+    python -m harness.plans --users 500 --heavy-tasks 10000 --json plans.json
+"""
+import argparse
+import json
+import random
+import sys
+
+from harness.config import PG_DSN
+from harness.pg import apply_schema, connect, create_users, explain, plan_nodes, truncate
+
+HEAVY_TASKS = 5000
+NOTE_TABS = 5
+MONTHS = [f"2025-{m:02d}" for m in range(1, 13)]
+
+# One entry per query the app sends; params come from the seeded user
+PATTERNS = [
+    {"name": "getTasks", "table": "tasks", "max_buffers": 64, "buffers_per_row": 1.0,
+     "missing_index": "tasks (user_id, created_at DESC)",
+     "sql": "SELECT * FROM tasks WHERE user_id = %(user)s ORDER BY created_at DESC"},
+    {"name": "updateTask", "table": "tasks", "max_buffers": 32, "write": True,
+     "sql": "UPDATE tasks SET status = 'completed', updated_at = now() "
+            "WHERE id = %(task)s AND user_id = %(user)s RETURNING *"},
+    {"name": "deleteTask", "table": "tasks", "max_buffers": 32, "write": True,
+     "sql": "DELETE FROM tasks WHERE id = %(task)s AND user_id = %(user)s"},
+    {"name": "getUserNotes", "table": "user_notes", "max_buffers": 32,
+     "sql": "SELECT * FROM user_notes WHERE user_id = %(user)s"},
+    {"name": "saveUserNote", "table": "user_notes", "max_buffers": 32, "write": True,
+     "sql": "INSERT INTO user_notes (user_id, title, content, updated_at) VALUES (%(user)s, 'Tab 0', 'edited', now()) "
+            "ON CONFLICT (user_id, title) DO UPDATE SET content = EXCLUDED.content, updated_at = EXCLUDED.updated_at"},
+    {"name": "getUserUsage", "table": "user_usage", "max_buffers": 16, "missing_index": "user_usage (user_id, month)",
+     "sql": "SELECT api_calls, tokens_used FROM user_usage WHERE user_id = %(user)s AND month = %(month)s"},
+]
+
+
+def seed(conn, users=200, heavy_tasks=HEAVY_TASKS):
+    """Seed tasks, notes and usage; returns {"heavy": params, "typical": params}"""
+    truncate(conn, "auth.users")
+    user_ids = create_users(conn, users)
+    # One heavy user, the rest log-normal around a few dozen tasks
+    counts = [heavy_tasks] + [max(1, int(random.lognormvariate(3.5, 1.0))) for _ in user_ids[1:]]
+    conn.execute("""
+        INSERT INTO tasks (user_id, title, description, status, priority, tags, created_at, updated_at)
+        SELECT u, 'Task ' || g, 'Seeded task for plan checks',
+               (ARRAY['pending', 'completed'])[1 + (random() < 0.4)::int],
+               (ARRAY['low', 'medium', 'high'])[1 + floor(random() * 3)::int],
+               ARRAY['work'], ts, ts
+        FROM unnest(%s::uuid[], %s::int[]) AS t(u, n),
+             generate_series(1, n) AS g,
+             LATERAL (SELECT now() - random() * interval '365 days' AS ts) AS r
+        ORDER BY random()""", (user_ids, counts))
+    conn.execute("""
+        INSERT INTO user_notes (user_id, title, content)
+        SELECT u, 'Tab ' || g, repeat('note text ', 40)
+        FROM unnest(%s::uuid[]) AS u, generate_series(0, %s) AS g
+        ORDER BY random()""", (user_ids, NOTE_TABS - 1))
+    conn.execute("""
+        INSERT INTO user_usage (user_id, month, api_calls, tokens_used)
+        SELECT u, m, floor(random() * 500)::int, floor(random() * 100000)::int
+        FROM unnest(%s::uuid[]) AS u, unnest(%s::text[]) AS m
+        ORDER BY random()""", (user_ids, MONTHS))
+    conn.execute("VACUUM ANALYZE tasks, user_notes, user_usage")
+
+    typical = sorted(range(1, len(user_ids)), key=lambda i: counts[i])[len(user_ids) // 2]
+    return {"heavy": _params(conn, user_ids[0]), "typical": _params(conn, user_ids[typical])}
+
+
+def _params(conn, user_id):
+    task_id = conn.execute("SELECT id FROM tasks WHERE user_id = %s LIMIT 1", (user_id,)).fetchone()[0]
+    return {"user": user_id, "task": task_id, "month": MONTHS[-1]}
+
+
+def check_plan(plan, pattern):
+    """Violations of the pattern's plan rules"""
+    violations = []
+    for node in plan_nodes(plan):
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == pattern["table"]:
+            violations.append(f"Seq Scan on {pattern['table']}")
+        if node["Node Type"] in ("Sort", "Incremental Sort"):
+            where = " on disk" if node.get("Sort Space Type") == "Disk" else ""
+            violations.append(f"{node['Node Type']}{where} on {', '.join(node.get('Sort Key', []))}")
+    buffers = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+    budget = pattern["max_buffers"] + pattern.get("buffers_per_row", 0) * (plan.get("Actual Rows") or 0)
+    if buffers > budget:
+        violations.append(f"{buffers} shared buffers > budget {budget:.0f}")
+    return violations
+
+
+def record_plan(conn, pattern, params):
+    """EXPLAIN (ANALYZE, BUFFERS) one pattern; writes are rolled back"""
+    if pattern.get("write"):
+        with conn.transaction(force_rollback=True):
+            plan = explain(conn, pattern["sql"], params, analyze=True)
+    else:
+        plan = explain(conn, pattern["sql"], params, analyze=True)
+    return {
+        "pattern": pattern["name"],
+        "nodes": [node["Node Type"] + (f" on {node['Index Name']}" if "Index Name" in node else "")
+                  for node in plan_nodes(plan)],
+        "rows": plan.get("Actual Rows"),
+        "ms": plan.get("Actual Total Time"),
+        "buffers": plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0),
+        "violations": check_plan(plan, pattern),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EXPLAIN (ANALYZE, BUFFERS) checks for the app's queries")
+    parser.add_argument("--dsn", default=PG_DSN, help="scratch Postgres (default HARNESS_PG_DSN)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--heavy-tasks", type=int, default=HEAVY_TASKS, help="tasks owned by the heavy user")
+    parser.add_argument("--json", dest="json_path", help="write the recorded plans to this file")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.dsn)
+    apply_schema(conn)
+    users = seed(conn, args.users, args.heavy_tasks)
+    results, failed = [], 0
+    for volume, params in users.items():
+        print(f"\n🔎 {volume} user")
+        for pattern in PATTERNS:
+            result = record_plan(conn, pattern, params)
+            result["user"] = volume
+            results.append(result)
+            known_gap = result["violations"] and pattern.get("missing_index")
+            mark = "⚠️" if known_gap else "❌" if result["violations"] else "✅"
+            print(f"   {mark} {pattern['name']:<14} {result['rows']:>6} rows {result['ms']:>8.2f}ms "
+                  f"{result['buffers']:>6} buffers  {' > '.join(result['nodes'])}")
+            for violation in result["violations"]:
+                print(f"      - {violation}")
+            if known_gap:
+                print(f"      - known gap: no migration creates an index on {pattern['missing_index']}")
+            failed += 1 if result["violations"] and not known_gap else 0
+    conn.close()
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Retries, circuit breaking and hedged reads for the shared API client.
+
+``Resilience`` wraps each request with per-operation state (operations are
+method + path template, as in ``harness.tracing``):
+
+- retries with exponential backoff and full jitter, for idempotent methods
+  only, on connection errors and 429/500/502/503/504
+- a retry budget: every request deposits ``budget_ratio`` tokens and every
+  retry or hedge spends one, so a failing server sees at most ~20% extra
+  load instead of a retry storm
+- a circuit breaker that opens after ``breaker_threshold`` consecutive
+  failures, fails fast with ``CircuitOpenError`` and lets one probe through
+  after ``breaker_reset`` seconds
+- optional hedging: a GET still running after the operation's observed p95
+  gets a duplicate, and whichever answers first wins. The duplicate goes out
+  on the hedge thread's own session, since a requests.Session must not be
+  used from two threads at once
+
+Enable it on the test client with ``HARNESS_RETRIES=<n>`` and
+``HARNESS_HEDGE=1``.
+"""
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import requests
+
+from harness.histogram import LatencyHistogram
+from harness.tracing import operation_name
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending while an endpoint's breaker is open"""
+
+
+def backoff_delay(attempt, base, cap):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class RetryBudget:
+    """Token bucket limiting retries and hedges to a fraction of requests"""
+
+    def __init__(self, ratio, reserve=10.0):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.tokens = reserve
+        self.lock = threading.Lock()
+
+    def deposit(self):
+        with self.lock:
+            self.tokens = min(self.reserve, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """closed -> open after consecutive failures -> half-open probe -> closed"""
+
+    def __init__(self, threshold, reset_after):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_after:
+                self.state = "half-open"  # let exactly one probe through
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half-open" or (self.state == "closed" and self.failures >= self.threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.opens += 1
+
+
+class OperationState:
+    def __init__(self, resilience):
+        self.budget = RetryBudget(resilience.budget_ratio)
+        self.breaker = CircuitBreaker(resilience.breaker_threshold, resilience.breaker_reset)
+        self.latency = LatencyHistogram()
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+
+def _close_quietly(future):
+    if future.exception() is None:
+        future.result().close()
+
+
+class Resilience:
+    """Per-operation retries, retry budget, circuit breaker and hedging"""
+
+    def __init__(self, retries=3, backoff=0.1, max_backoff=2.0, budget_ratio=0.2,
+                 breaker_threshold=5, breaker_reset=30.0, hedge=False, hedge_quantile=95, hedge_min_samples=20):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget_ratio = budget_ratio
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.pool = ThreadPoolExecutor(max_workers=64, thread_name_prefix="hedge") if hedge else None
+        self.operations = defaultdict(lambda: OperationState(self))
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def _state(self, name):
+        with self.lock:
+            return self.operations[name]
+
+    def _hedge_request(self, method, url, **kwargs):
+        """Send on this hedge thread's own session while the primary still holds the caller's"""
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session.request(method, url, **kwargs)
+
+    def send(self, session_request, method, url, **kwargs):
+        """Send through ``session_request`` with retries, breaker and hedging"""
+        state = self._state(operation_name(method, url))
+        state.budget.deposit()
+        attempt = 0
+        while True:
+            if not state.breaker.allow():
+                state.count("short_circuited")
+                raise CircuitOpenError(f"circuit open for {operation_name(method, url)}")
+            response, error = None, None
+            try:
+                response = self._attempt(state, session_request, method, url, kwargs)
+            except requests.RequestException as e:
+                error = e
+            if response is not None and response.status_code < 500:
+                state.breaker.record_success()
+            else:
+                state.breaker.record_failure()
+
+            retryable = method in IDEMPOTENT_METHODS and (response is None or response.status_code in RETRY_STATUSES)
+            if not retryable or attempt >= self.retries:
+                break
+            if not state.budget.withdraw():
+                state.count("budget_exhausted")
+                break
+            state.count("retries")
+            time.sleep(self._delay(attempt, response))
+            if response is not None:
+                response.close()
+            attempt += 1
+
+        if response is None:
+            raise error
+        return response
+
+    def _delay(self, attempt, response):
+        delay = backoff_delay(attempt, self.backoff, self.max_backoff)
+        retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+        if retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.max_backoff))
+        return delay
+
+    def _timed(self, state, session_request, method, url, kwargs):
+        started = time.perf_counter()
+        response = session_request(method, url, **kwargs)
+        if response.status_code < 500:
+            with state.lock:
+                state.latency.record(time.perf_counter() - started)
+        return response
+
+    def _attempt(self, state, session_request, method, url, kwargs):
+        delay = None
+        if self.pool is not None and method == "GET" and not kwargs.get("stream"):
+            with state.lock:
+                if state.latency.count >= self.hedge_min_samples:
+                    delay = state.latency.percentile(self.hedge_quantile)
+        if delay is None:
+            return self._timed(state, session_request, method, url, kwargs)
+
+        primary = self.pool.submit(self._timed, state, session_request, method, url, kwargs)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+        if not state.budget.withdraw():
+            state.count("hedges_denied")
+            return primary.result()
+
+        state.count("hedges")
+        hedge = self.pool.submit(self._timed, state, self._hedge_request, method, url, kwargs)
+        done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        winner, loser = (hedge, primary) if primary not in done else (primary, hedge)
+        if winner.exception() is not None:
+            winner, loser = loser, winner
+        if winner is hedge:
+            state.count("hedge_wins")
+        loser.add_done_callback(_close_quietly)
+        return winner.result()
+
+    def report_lines(self):
+        """One row per operation that retried, tripped its breaker or hedged"""
+        lines = []
+        with self.lock:
+            items = sorted(self.operations.items())
+        for name, state in items:
+            stats = dict(state.stats, breaker_opens=state.breaker.opens)
+            if not any(stats.values()):
+                continue
+            line = (f"{name:<50} retries {stats.get('retries', 0)}"
+                    f" (budget exhausted {stats.get('budget_exhausted', 0)})"
+                    f" breaker opens {stats['breaker_opens']} short-circuited {stats.get('short_circuited', 0)}")
+            if self.pool is not None:
+                hedges, wins = stats.get("hedges", 0), stats.get("hedge_wins", 0)
+                won = f" ({wins / hedges:.0%})" if hedges else ""
+                line += f" | hedges {hedges} won {wins}{won} denied {stats.get('hedges_denied', 0)}"
+            lines.append(line)
+        return lines
@@ -0,0 +1,182 @@
+"""
+Compact JSONL test results and the paging index behind the results viewer.
+
+Enable the pytest plugin with ``-p harness.results --results-jsonl results.jsonl``
+(run_tests.py does this). The file holds one header line with run metadata
+followed by one short-keyed row per test:
+
+    {"i": 0, "id": "tests/test_leads.py::TestLeads::test_list_leads",
+     "o": "passed", "d": 0.012, "s": 1723456789.1}
+
+Failure/skip detail (``r``) and captured output (``log``) are only stored for
+tests that did not pass, and are truncated, so large parametrized or load
+runs stay small. A ``.gz`` suffix writes gzip-compressed output. ``merge()``
+joins the per-worker files of a sharded run (``run_tests.py --workers``).
+"""
+import gzip
+import json
+import os
+import time
+
+MAX_DETAIL_CHARS = 8000
+SORT_KEYS = {"id": "id", "outcome": "o", "duration": "d", "start": "s", "index": "i"}
+
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+def _truncate(text):
+    if text and len(text) > MAX_DETAIL_CHARS:
+        return text[:MAX_DETAIL_CHARS] + f"\n... [{len(text) - MAX_DETAIL_CHARS} chars truncated]"
+    return text
+
+
+class ResultsWriter:
+    """Pytest plugin object that streams one row per finished test"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.index = 0
+        self.pending = {}
+
+    def pytest_sessionstart(self, session):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = _open(self.path, "wt")
+        header = {"run": {"started": time.time(), "args": list(session.config.invocation_params.args)}}
+        self.file.write(json.dumps(header) + "\n")
+
+    def pytest_runtest_logreport(self, report):
+        # One test produces setup/call/teardown reports; fold them into one row
+        row = self.pending.setdefault(report.nodeid, {"id": report.nodeid, "o": "passed", "d": 0.0,
+                                                     "s": getattr(report, "start", None)})
+        row["d"] = round(row["d"] + report.duration, 6)
+        if report.failed:
+            row["o"] = "error" if report.when != "call" else "failed"
+        elif report.skipped and row["o"] == "passed":
+            row["o"] = "skipped"
+        if not report.passed:
+            row["r"] = _truncate(report.longreprtext)
+            sections = "\n".join(f"--- {name} ---\n{content}" for name, content in report.sections)
+            if sections:
+                row["log"] = _truncate(sections)
+        if report.when == "teardown":
+            self._write(self.pending.pop(report.nodeid))
+
+    def _write(self, row):
+        row["i"] = self.index
+        self.index += 1
+        self.file.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        for row in self.pending.values():
+            self._write(row)
+        self.pending.clear()
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def pytest_addoption(parser):
+    parser.addoption("--results-jsonl", default=None, help="write compact JSONL test results to this path")
+
+
+def pytest_configure(config):
+    path = config.getoption("--results-jsonl")
+    if path:
+        config.pluginmanager.register(ResultsWriter(path), "harness-results-writer")
+
+
+def merge(paths, path):
+    """Combine per-worker result files into one run, renumbering the rows; returns the row count"""
+    headers, rows = [], []
+    for part in paths:
+        if not os.path.exists(part):
+            continue
+        with _open(part, "rt") as f:
+            for line in f:
+                data = json.loads(line)
+                if "run" in data:
+                    headers.append(data["run"])
+                else:
+                    rows.append(data)
+    run = {"started": min((h["started"] for h in headers), default=time.time()),
+           "args": headers[0]["args"] if headers else [], "workers": len(paths)}
+    with _open(path, "wt") as f:
+        f.write(json.dumps({"run": run}) + "\n")
+        for index, row in enumerate(rows):
+            row["i"] = index
+            f.write(json.dumps(row, separators=(",", ":")) + "\n")
+    return len(rows)
+
+
+class ResultsIndex:
+    """
+    Lightweight in-memory index over a results file.
+
+    Only the summary columns are kept in memory; full rows (with failure
+    detail and logs) are read back on demand from their byte offset.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.run = {}
+        self.rows = []
+        self.offsets = []
+
+    def refresh(self):
+        """Reload if the file changed since the last query"""
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return
+        rows, offsets, run = [], [], {}
+        with _open(self.path, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                data = json.loads(line)
+                if "run" in data:
+                    run = data["run"]
+                    continue
+                rows.append({"i": data["i"], "id": data["id"], "o": data["o"], "d": data["d"], "s": data.get("s")})
+                offsets.append(offset)
+        self.rows, self.offsets, self.run, self.mtime = rows, offsets, run, mtime
+
+    def query(self, offset=0, limit=100, outcome=None, search=None, sort="index", descending=False):
+        """One page of summary rows plus totals for the filters"""
+        self.refresh()
+        rows = self.rows
+        if outcome:
+            wanted = set(outcome.split(","))
+            rows = [r for r in rows if r["o"] in wanted]
+        if search:
+            needle = search.lower()
+            rows = [r for r in rows if needle in r["id"].lower()]
+        key = SORT_KEYS.get(sort, "i")
+        rows = sorted(rows, key=lambda r: (r[key] is None, r[key]), reverse=descending)
+
+        counts = {}
+        for row in self.rows:
+            counts[row["o"]] = counts.get(row["o"], 0) + 1
+        return {
+            "run": self.run,
+            "total": len(self.rows),
+            "matched": len(rows),
+            "counts": counts,
+            "rows": rows[offset:offset + limit],
+        }
+
+    def detail(self, index):
+        """Full stored row for test ``index`` (with failure text and logs)"""
+        self.refresh()
+        with _open(self.path, "rb") as f:
+            f.seek(self.offsets[index])
+            return json.loads(f.readline())
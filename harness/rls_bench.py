@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Row-level-security cost of per-user policies at production size.
+
+user_notes is protected by ``USING (auth.uid() = user_id)`` policies, and
+tasks will be too. With a few hundred dev rows RLS costs nothing; with
+millions of rows a policy the planner cannot fold into an index condition
+is evaluated once per row. On a local Postgres this tool seeds
+``--users`` users with log-normal task counts (harness.plans' seeding,
+about 55 tasks per user) and, for each supporting index set and each
+policy formulation on tasks and user_notes:
+
+- ``off``: RLS disabled, the app's explicit ``user_id`` filter only
+- ``per-row``: ``auth.uid() = user_id``, as the migration writes it
+- ``function``: ``rls_bench_owns(user_id)``, a PL/pgSQL helper the planner
+  cannot inline - the shape of a policy that looks up membership
+- ``subselect``: ``(SELECT auth.uid()) = user_id``, evaluated once per
+  statement as an InitPlan
+
+times the app's queries as the ``authenticated`` role with
+``request.jwt.claim.sub`` set, the way PostgREST runs them, plus
+RLS-only queries that leave the filtering to the policy. Each cell is
+p50 latency and its ratio to the same query with RLS off; ``--json``
+also records buffers and plan nodes. Writes are rolled back.
+
+Usage:
+    python -m harness.rls_bench --users 20000 --samples 30
+    python -m harness.rls_bench --skip-seed --indexes none,user --policy per-row --policy subselect
+"""
+import argparse
+import json
+import random
+import sys
+
+import psycopg
+
+from harness import plans
+from harness.config import PG_DSN
+from harness.histogram import LatencyHistogram, format_ms
+from harness.pg import apply_schema, connect, explain, plan_nodes, timed_query
+
+RLS_TABLES = ("tasks", "user_notes")
+POLICY_NAME = "rls_bench_owner"
+
+OWNS_FUNCTION = """
+CREATE OR REPLACE FUNCTION public.rls_bench_owns(owner UUID) RETURNS BOOLEAN
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+  RETURN owner = auth.uid();
+END
+$$;
+GRANT EXECUTE ON FUNCTION public.rls_bench_owns(UUID) TO authenticated;
+"""
+
+POLICIES = {
+    "off": None,
+    "per-row": "auth.uid() = user_id",
+    "function": "rls_bench_owns(user_id)",
+    "subselect": "(SELECT auth.uid()) = user_id",
+}
+
+CANDIDATE_INDEXES = {
+    "user": ("idx_tasks_user_created", "(user_id, created_at DESC)"),
+    "user-status": ("idx_tasks_user_status", "(user_id, status)"),
+}
+
+# name: (sql, write?, needs RLS to be scoped to the user?)
+QUERIES = {
+    "getTasks": ("SELECT * FROM tasks WHERE user_id = %(user)s ORDER BY created_at DESC", False, False),
+    "updateTask": ("UPDATE tasks SET status = 'completed', updated_at = now() "
+                   "WHERE id = %(task)s AND user_id = %(user)s RETURNING *", True, False),
+    "getUserNotes": ("SELECT * FROM user_notes WHERE user_id = %(user)s", False, False),
+    "tasks (RLS only)": ("SELECT * FROM tasks ORDER BY created_at DESC LIMIT 100", False, True),
+    "count pending (RLS only)": ("SELECT count(*) FROM tasks WHERE status = 'pending'", False, True),
+}
+
+
+def set_policy(conn, variant):
+    """Replace every policy on the RLS tables with ``variant`` (or disable RLS for ``off``)"""
+    for table in RLS_TABLES:
+        for (name,) in conn.execute("SELECT policyname FROM pg_policies WHERE tablename = %s", (table,)).fetchall():
+            conn.execute(f'DROP POLICY "{name}" ON {table}')
+        if POLICIES[variant] is None:
+            conn.execute(f"ALTER TABLE {table} DISABLE ROW LEVEL SECURITY")
+        else:
+            conn.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+            conn.execute(f"CREATE POLICY {POLICY_NAME} ON {table} FOR ALL TO authenticated "
+                         f"USING ({POLICIES[variant]}) WITH CHECK ({POLICIES[variant]})")
+
+
+def set_indexes(conn, names):
+    """Drop every candidate index on tasks, then build ``names``"""
+    for index_name, _ in CANDIDATE_INDEXES.values():
+        conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+    for name in names:
+        index_name, definition = CANDIDATE_INDEXES[name]
+        conn.execute(f"CREATE INDEX {index_name} ON tasks {definition}")
+    conn.execute("ANALYZE tasks")
+
+
+def sample_users(conn, count):
+    """[{"user", "task"}] for ``count`` random users that own tasks"""
+    rows = conn.execute("SELECT DISTINCT ON (user_id) user_id, id FROM tasks "
+                        "WHERE user_id IN (SELECT id FROM auth.users ORDER BY random() LIMIT %s)",
+                        (count * 2,)).fetchall()
+    random.shuffle(rows)
+    return [{"user": user_id, "task": task_id} for user_id, task_id in rows[:count]]
+
+
+def as_user(conn, user_id):
+    """Make ``conn`` look like a PostgREST request from ``user_id``"""
+    conn.execute("SELECT set_config('request.jwt.claim.sub', %s, false)", (str(user_id),))
+
+
+def run_query(conn, sql, params, write):
+    if write:
+        with conn.transaction(force_rollback=True):
+            return timed_query(conn, sql, params)
+    return timed_query(conn, sql, params)
+
+
+def measure(conn, users, samples):
+    """{query: {"latency", "rows", "buffers", "nodes"}} as the authenticated role"""
+    if not users:
+        raise SystemExit("❌ No sampled user owns any tasks - seed first (drop --skip-seed) or check --users")
+    if samples < 1:
+        raise SystemExit("❌ --samples must be at least 1")
+    results = {}
+    for name, (sql, write, _) in QUERIES.items():
+        latency, rows = LatencyHistogram(), 0
+        as_user(conn, users[0]["user"])
+        run_query(conn, sql, users[0], write)  # warm the cache so the first variant is not penalised
+        for params in (users * (samples // len(users) + 1))[:samples]:
+            as_user(conn, params["user"])
+            elapsed, fetched = run_query(conn, sql, params, write)
+            latency.record(elapsed)
+            rows += len(fetched)
+        as_user(conn, users[0]["user"])
+        if write:
+            with conn.transaction(force_rollback=True):
+                plan = explain(conn, sql, users[0], analyze=True)
+        else:
+            plan = explain(conn, sql, users[0], analyze=True)
+        results[name] = {
+            "latency": latency,
+            "rows": rows / samples,
+            "buffers": plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0),
+            "nodes": [node["Node Type"] + (f" ({node['Parent Relationship']})"
+                                           if node.get("Parent Relationship") in ("InitPlan", "SubPlan") else "")
+                      for node in plan_nodes(plan)],
+        }
+    return results
+
+
+def print_table(label, results, variants):
+    print(f"\n🗂️ Indexes: {label}")
+    print(f"   {'query':<26}" + "".join(f"{v:>20}" for v in variants))
+    for name, (_, _, rls_only) in QUERIES.items():
+        cells = []
+        base = results.get("off", {}).get(name)
+        for variant in variants:
+            if variant == "off" and rls_only:
+                cells.append("(unscoped)")
+                continue
+            p50 = results[variant][name]["latency"].percentile(50)
+            ratio = f" x{p50 / base['latency'].percentile(50):.1f}" if base and not rls_only else ""
+            cells.append(f"{format_ms(p50)}ms{ratio}")
+        print(f"   {name:<26}" + "".join(f"{cell:>20}" for cell in cells))
+
+
+def parse_index_sets(value):
+    sets = []
+    for spec in value.split(","):
+        names = [] if spec == "none" else spec.split("+")
+        unknown = [n for n in names if n not in CANDIDATE_INDEXES]
+        if unknown:
+            raise SystemExit(f"❌ Unknown index '{unknown[0]}'. Choose from: none, {', '.join(CANDIDATE_INDEXES)}")
+        sets.append((spec, names))
+    return sets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RLS policy cost for the app's per-user queries")
+    parser.add_argument("--dsn", default=PG_DSN, help="scratch Postgres (default HARNESS_PG_DSN)")
+    parser.add_argument("--users", type=int, default=20000, help="users to seed (about 55 tasks each)")
+    parser.add_argument("--heavy-tasks", type=int, default=plans.HEAVY_TASKS, help="tasks owned by the heaviest user")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the rows already in the database")
+    parser.add_argument("--samples", type=int, default=30, help="runs per query, policy and index set")
+    parser.add_argument("--policy", action="append", choices=list(POLICIES), help="default: all")
+    parser.add_argument("--indexes", default="none,user",
+                        help=f"comma-separated index sets on tasks, each none or a +-joined subset of "
+                             f"{', '.join(CANDIDATE_INDEXES)}")
+    parser.add_argument("--statement-timeout", type=float, default=60.0, help="seconds per query")
+    parser.add_argument("--json", dest="json_path", help="write latencies, buffers and plan nodes to this file")
+    args = parser.parse_args(argv)
+
+    variants = args.policy or list(POLICIES)
+    index_sets = parse_index_sets(args.indexes)
+    admin = connect(args.dsn)
+    apply_schema(admin)
+    admin.execute(OWNS_FUNCTION)
+    if not args.skip_seed:
+        print(f"🌱 Seeding {args.users:,} users...")
+        plans.seed(admin, args.users, args.heavy_tasks)
+    tasks = admin.execute("SELECT count(*) FROM tasks").fetchone()[0]
+    users = sample_users(admin, args.samples)
+    print(f"📦 {tasks:,} tasks for {admin.execute('SELECT count(*) FROM auth.users').fetchone()[0]:,} users, "
+          f"{args.samples} samples per cell as role authenticated")
+
+    bench = connect(args.dsn)
+    bench.execute(f"SET statement_timeout = {int(args.statement_timeout * 1000)}")
+    bench.execute("SET ROLE authenticated")
+    report = []
+    try:
+        for label, names in index_sets:
+            set_indexes(admin, names)
+            results = {}
+            for variant in variants:
+                set_policy(admin, variant)
+                try:
+                    results[variant] = measure(bench, users, args.samples)
+                except psycopg.errors.QueryCanceled:
+                    raise SystemExit(f"❌ {variant} with indexes {label} exceeded --statement-timeout")
+            print_table(label, results, variants)
+            for variant, queries in results.items():
+                for name, result in queries.items():
+                    report.append({"indexes": label, "policy": variant, "query": name,
+                                   "p50": result["latency"].percentile(50), "p99": result["latency"].percentile(99),
+                                   "rows": result["rows"], "buffers": result["buffers"], "nodes": result["nodes"]})
+    finally:
+        bench.close()
+        # Back to the schema the migrations define
+        set_policy(admin, "off")
+        set_indexes(admin, [])
+        admin.execute("DROP FUNCTION IF EXISTS public.rls_bench_owns(UUID)")
+        apply_schema(admin)
+        admin.close()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
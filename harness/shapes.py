@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Response envelope map for every operation in the OpenAPI spec.
+
+Endpoints disagree on envelopes: some answer ``{"success": true, "data":
+...}``, others the bare object or list, and the split is per method (POST
+/api/activities is wrapped, GET is direct). Instead of rewriting tests to
+match, this tool probes the whole spec concurrently and writes the shapes
+to ``response_shapes.json`` (``HARNESS_SHAPES``):
+
+    {"version": 1, "spec_sha256": "...", "operations": {
+      "GET /api/activities": {"status": 200, "envelope": "direct", "kind": "list", "keys": [...]},
+      "POST /api/activities": {"status": 201, "envelope": "wrapped", "kind": "object", "keys": [...]}}}
+
+Operations are keyed like harness.tracing (path parameters as ``{id}``).
+Probing runs in phases, each one parallel: parameterless GETs, then - with
+``--writes`` - POSTs with bodies built from the request schemas, then
+parameterized GETs filled with IDs from the first two phases and
+PUT/PATCH filled only with IDs the POSTs created, then DELETE of what was
+created. Writes that would touch any other record are skipped. The file is reused while the spec hash
+and format version match; ``--force`` re-probes, and envelope changes
+against the previous file are listed.
+
+At runtime ``shapes_from_env().unwrap(response)`` (the ``unwrap`` pytest
+fixture) returns the payload for the recorded envelope, and fails if the
+endpoint no longer answers with it.
+
+Usage:
+    python -m harness.shapes
+    python -m harness.shapes --writes --force --concurrency 32
+"""
+import argparse
+import functools
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
+import requests
+
+from harness.client import client_from_env
+from harness.config import BASE_URL, PROVIDER_ID, SHAPES_FILE, api_headers
+from harness.tracing import operation_name
+
+VERSION = 1
+ENVELOPE_KEYS = {"success", "data", "message", "error", "meta", "count", "total", "pagination"}
+PARAM = re.compile(r"\{([^}]+)\}")
+WRITE_METHODS = ("post", "put", "patch")
+
+
+def envelope_of(payload):
+    """"wrapped" for ``{"success", "data"}``-style bodies, else "direct" """
+    if isinstance(payload, dict) and "data" in payload and set(payload) <= ENVELOPE_KEYS:
+        return "wrapped"
+    return "direct"
+
+
+def template_key(method, path):
+    """``GET /api/activities/{id}`` for a spec path with any parameter names"""
+    return f"{method.upper()} {PARAM.sub('{id}', path)}"
+
+
+def describe(response):
+    """Shape of one response: status, envelope, payload kind and keys"""
+    shape = {"status": response.status_code}
+    if response.status_code == 204 or not response.content:
+        return dict(shape, envelope="empty", kind="null", keys=[])
+    try:
+        payload = response.json()
+    except ValueError:
+        return dict(shape, envelope="empty", kind=response.headers.get("Content-Type", "text"), keys=[])
+    shape["envelope"] = "error" if response.status_code >= 400 else envelope_of(payload)
+    data = payload["data"] if shape["envelope"] == "wrapped" else payload
+    if isinstance(data, list):
+        shape["kind"] = "list"
+        first = data[0] if data else None
+        shape["keys"] = sorted(first) if isinstance(first, dict) else []
+    elif isinstance(data, dict):
+        shape["kind"] = "object"
+        shape["keys"] = sorted(data)
+    else:
+        shape["kind"] = type(data).__name__
+        shape["keys"] = []
+    if shape["envelope"] == "wrapped":
+        shape["envelope_keys"] = sorted(payload)
+    return shape
+
+
+def first_id(payload):
+    """``id`` of a created object or of the first list item, whatever the envelope"""
+    if envelope_of(payload) == "wrapped":
+        payload = payload["data"]
+    if isinstance(payload, list):
+        payload = payload[0] if payload else None
+    if isinstance(payload, dict):
+        return payload.get("id")
+    return None
+
+
+class ShapeMap:
+    """Recorded envelopes with lookup by request method and URL"""
+
+    def __init__(self, operations=None, spec_sha256=None):
+        self.operations = operations or {}
+        self.spec_sha256 = spec_sha256
+        # Literal paths before templated ones so /status/{id} does not shadow /status/active
+        self.patterns = sorted(
+            ((key.count("{id}"), key, re.compile("^" + re.escape(key).replace(re.escape("{id}"), "[^/]+") + "$"))
+             for key in self.operations),
+            key=lambda row: (row[0], row[1]))
+
+    @classmethod
+    def load(cls, path):
+        """Map from ``path``; empty when missing or written by another format version"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        if data.get("version") != VERSION:
+            return cls()
+        return cls(data.get("operations"), data.get("spec_sha256"))
+
+    def expected(self, method, url):
+        """Recorded shape for a request, or None"""
+        key = operation_name(method, url)
+        if key in self.operations:
+            return self.operations[key]
+        for _, template, pattern in self.patterns:
+            if pattern.match(key):
+                return self.operations[template]
+        return None
+
+    def unwrap(self, response):
+        """Payload of ``response`` with the recorded envelope removed"""
+        payload = response.json()
+        observed = envelope_of(payload)
+        shape = self.expected(response.request.method, response.request.url)
+        if (shape and response.status_code < 400 and shape["envelope"] in ("wrapped", "direct")
+                and observed != shape["envelope"]):
+            raise AssertionError(f"{operation_name(response.request.method, response.request.url)} answered "
+                                 f"{observed}, {shape['envelope']} was recorded - re-run python -m harness.shapes")
+        return payload["data"] if observed == "wrapped" else payload
+
+
+@functools.lru_cache(maxsize=None)
+def shapes_from_env():
+    """Process-wide ShapeMap from HARNESS_SHAPES (empty when the file does not exist yet)"""
+    return ShapeMap.load(SHAPES_FILE)
+
+
+def spec_hash(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def resolve(schema, spec):
+    """``schema`` with a top-level $ref followed"""
+    while isinstance(schema, dict) and "$ref" in schema:
+        node = spec
+        for part in schema["$ref"].lstrip("#/").split("/"):
+            node = node[part]
+        schema = node
+    return schema or {}
+
+
+class Prober:
+    """Concurrent probe of every spec operation, filling path parameters from earlier phases"""
+
+    def __init__(self, spec, base_url=BASE_URL, concurrency=16, writes=False):
+        self.spec = spec
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.writes = writes
+        self.local = threading.local()
+        self.ids = {}        # collection path -> an existing id
+        self.created = {}    # collection path -> id created by a POST probe
+        self.shapes = {}
+        self.skipped = {}
+
+    def session(self):
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = client_from_env()
+        return session
+
+    def operations(self):
+        for path, methods in sorted(self.spec.get("paths", {}).items()):
+            for method, operation in methods.items():
+                if method in ("get", "post", "put", "patch", "delete"):
+                    yield method, path, operation
+
+    def collection_for(self, path, param):
+        """Collection whose IDs fill ``{param}`` in ``path``"""
+        prefix = path.split("{" + param + "}")[0].rstrip("/")
+        if param == "id" or not param.endswith("_id") or prefix in self.spec.get("paths", {}):
+            return prefix
+        # /api/enrollments/activity/{activity_id} -> /api/activities
+        stem = param[:-3][:-1] or param[:-3]
+        candidates = [c.rstrip("/") for c in self.spec.get("paths", {})
+                      if "{" not in c and c.rstrip("/").rsplit("/", 1)[-1].startswith(stem)]
+        return min(candidates, key=len) if candidates else prefix
+
+    def fill(self, path, operation, write=False):
+        """
+        ``path`` with every parameter substituted, or None when one has no value.
+
+        Writes only ever target records this run's POST probes created.
+        """
+        params = {p.get("name"): p for p in operation.get("parameters", []) if p.get("in") == "path"}
+        for name in PARAM.findall(path):
+            if name == "provider_id":
+                value = PROVIDER_ID
+            else:
+                schema = resolve(params.get(name, {}).get("schema", {}), self.spec)
+                collection = self.collection_for(path, name)
+                value = self.created.get(collection) if write else self.ids.get(collection)
+                if value is None and schema.get("enum"):
+                    value = schema["enum"][0]
+                elif value is None and schema.get("type") == "integer" and not write:
+                    value = 7
+            if value is None:
+                return None
+            path = path.replace("{" + name + "}", str(value))
+        return path
+
+    def example(self, schema, name=""):
+        """A value satisfying ``schema``: its example, else required fields with plausible values"""
+        schema = resolve(schema, self.spec)
+        if "example" in schema:
+            return schema["example"]
+        for key in ("anyOf", "oneOf", "allOf"):
+            options = [s for s in schema.get(key, []) if resolve(s, self.spec).get("type") != "null"]
+            if options:
+                return self.example(options[0], name)
+        if schema.get("enum"):
+            return schema["enum"][0]
+        kind, fmt = schema.get("type"), schema.get("format")
+        if kind == "object" or "properties" in schema:
+            required = schema.get("required", [])
+            return {field: self.example(sub, field) for field, sub in schema.get("properties", {}).items()
+                    if field in required}
+        if kind == "array":
+            return []
+        if kind == "integer":
+            return max(1, schema.get("minimum", 1))
+        if kind == "number":
+            return float(max(1, schema.get("minimum", 1)))
+        if kind == "boolean":
+            return True
+        if name.endswith("_id"):
+            return self.ids.get(self.collection_for(f"/{{{name}}}", name)) or str(uuid.uuid4())
+        if fmt == "email" or name == "email":
+            return f"shape-{uuid.uuid4().hex[:8]}@example.com"
+        if fmt == "date":
+            return date.today().isoformat()
+        if fmt == "date-time":
+            return datetime.now(timezone.utc).isoformat()
+        if fmt == "uuid":
+            return str(uuid.uuid4())
+        return f"Shape probe {uuid.uuid4().hex[:6]}"
+
+    def body(self, operation):
+        content = (operation.get("requestBody") or {}).get("content", {})
+        schema = (content.get("application/json") or {}).get("schema")
+        return None if schema is None else self.example(schema)
+
+    def probe(self, method, path, operation):
+        write = method in ("put", "patch", "delete")
+        url_path = self.fill(path, operation, write)
+        key = template_key(method, path)
+        if url_path is None:
+            self.skipped[key] = "no record created by this run" if write else "no value for a path parameter"
+            return
+        try:
+            response = self.session().request(method.upper(), f"{self.base_url}{url_path}", headers=api_headers(),
+                                              json=self.body(operation) if method in WRITE_METHODS else None,
+                                              timeout=30)
+        except requests.RequestException as e:
+            # One timeout or reset must not abort the whole map
+            self.skipped[key] = f"request failed: {type(e).__name__}"
+            return
+        self.shapes[key] = describe(response)
+        if response.status_code < 400 and response.content and method in ("get", "post"):
+            try:
+                found = first_id(response.json())
+            except ValueError:
+                found = None
+            if found is not None and "{" not in path:
+                (self.created if method == "post" else self.ids).setdefault(path.rstrip("/"), found)
+
+    def run_phase(self, operations):
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(lambda op: self.probe(*op), operations))
+
+    def run(self):
+        operations = list(self.operations())
+        plain_gets = [op for op in operations if op[0] == "get" and "{" not in op[1]]
+        posts = [op for op in operations if op[0] == "post" and "{" not in op[1]]
+        templated = [op for op in operations if op[0] in ("get", "put", "patch") and "{" in op[1]]
+        deletes = [op for op in operations if op[0] == "delete"]
+
+        self.run_phase(plain_gets)
+        if self.writes:
+            self.run_phase(posts)
+            self.run_phase(templated)
+            # Only delete what this run created
+            self.run_phase([op for op in deletes if self.collection_for(op[1], (PARAM.findall(op[1]) or [""])[-1])
+                            in self.created])
+        else:
+            self.run_phase([op for op in templated if op[0] == "get"])
+        for method, path, _ in operations:
+            key = template_key(method, path)
+            if key not in self.shapes and key not in self.skipped:
+                if method == "get":
+                    self.skipped[key] = "not probed"
+                elif not self.writes:
+                    self.skipped[key] = "write (use --writes)"
+                else:
+                    # PUT/PATCH without an id updates a record this run did not create
+                    self.skipped[key] = "no record created by this run"
+        return self.shapes
+
+
+def diff(previous, current):
+    """Lines describing envelope, kind and key changes between two operation maps"""
+    lines = []
+    for key in sorted(set(previous) | set(current)):
+        before, after = previous.get(key), current.get(key)
+        if before is None or after is None:
+            continue
+        for field in ("envelope", "kind"):
+            if before.get(field) != after.get(field):
+                lines.append(f"{key}: {field} {before.get(field)} -> {after.get(field)}")
+        gone, added = set(before.get("keys", [])) - set(after.get("keys", [])), \
+            set(after.get("keys", [])) - set(before.get("keys", []))
+        if gone or added:
+            lines.append(f"{key}: keys -{sorted(gone)} +{sorted(added)}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Probe every spec operation and record its response envelope")
+    parser.add_argument("--out", default=SHAPES_FILE, help="shape map (default HARNESS_SHAPES)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--writes", action="store_true",
+                        help="also probe POST/PUT/PATCH/DELETE (creates, then deletes, probe records)")
+    parser.add_argument("--force", action="store_true", help="re-probe even if the spec is unchanged")
+    args = parser.parse_args(argv)
+
+    spec = client_from_env().get(f"{BASE_URL}/openapi.json", timeout=30).json()
+    digest = spec_hash(spec)
+    previous = ShapeMap.load(args.out)
+    if previous.spec_sha256 == digest and not args.force:
+        print(f"✅ {args.out} matches the current spec ({len(previous.operations)} operations); --force re-probes")
+        return 0
+
+    started = time.perf_counter()
+    prober = Prober(spec, concurrency=args.concurrency, writes=args.writes)
+    shapes = prober.run()
+    elapsed = time.perf_counter() - started
+    with open(args.out, "w") as f:
+        json.dump({"version": VERSION, "spec_sha256": digest, "base_url": BASE_URL,
+                   "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                   "operations": dict(sorted(shapes.items()))}, f, indent=2)
+
+    counts = {}
+    for shape in shapes.values():
+        counts[shape["envelope"]] = counts.get(shape["envelope"], 0) + 1
+    print(f"🧭 {len(shapes)} operations probed in {elapsed:.1f}s with {args.concurrency} workers: "
+          + ", ".join(f"{n} {envelope}" for envelope, n in sorted(counts.items())))
+    for key, reason in sorted(prober.skipped.items()):
+        print(f"   ⏭️ {key}: {reason}")
+    changes = diff(previous.operations, shapes)
+    if changes:
+        print(f"⚠️ {len(changes)} change(s) since the previous map:")
+        for line in changes:
+            print(f"   - {line}")
+    print(f"💾 {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Chunked streaming upload vs whole-blob upload for /api/transcribe.
+
+The app records the whole clip, then uploads it as one multipart blob, so
+nothing happens server-side until the user has stopped talking *and* the
+upload has finished. This tool compares that with a client that streams
+the multipart body with ``Transfer-Encoding: chunked`` while the audio is
+still being "spoken" (chunks are paced in real time).
+
+The metric is end of speech -> transcript received. For streaming we also
+report how long the route took after the last byte arrived: if that is no
+better than the blob upload, the route is buffering the whole body
+(``request.formData()``) and needs a streaming ingestion path to benefit.
+
+Usage:
+    python -m harness.streaming_upload --lengths 1,3,5,10,20 --repeats 5
+"""
+import argparse
+import sys
+import time
+
+import requests
+
+from harness.audio import SAMPLE_RATE, synth_pcm, transcribe_body, transcribe_form, wav_header
+from harness.config import NEXT_BASE_URL, next_headers
+from harness.histogram import LatencyHistogram, format_ms
+
+DEFAULT_CHUNK_MS = 250  # MediaRecorder timeslice the browser would use
+
+
+def upload_blob(session, url, pcm, timeout):
+    """Whole-clip upload: speech has ended when the upload starts"""
+    body, content_type = transcribe_body(wav_header(len(pcm)) + pcm)
+    headers = {"Content-Type": content_type, "Origin": next_headers()["Origin"]}
+    end_of_speech = time.perf_counter()
+    response = session.post(url, data=body, headers=headers, timeout=timeout)
+    done = time.perf_counter()
+    return {
+        "status": response.status_code,
+        "eos_to_transcript": done - end_of_speech,
+        "after_last_byte": None,
+        "bytes": len(body),
+    }
+
+
+def upload_streaming(session, url, pcm, chunk_ms, speed, timeout):
+    """Chunked upload that sends audio as it is produced"""
+    head, tail, content_type = transcribe_form()
+    headers = {"Content-Type": content_type, "Origin": next_headers()["Origin"]}
+    chunk_size = int(SAMPLE_RATE * 2 * chunk_ms / 1000)
+    marks = {}
+
+    def body():
+        started = time.perf_counter()
+        yield head + wav_header(len(pcm))
+        for offset in range(0, len(pcm), chunk_size):
+            chunk = pcm[offset:offset + chunk_size]
+            # A chunk is only available once that much audio has been spoken
+            due = started + (offset + len(chunk)) / (SAMPLE_RATE * 2) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield chunk
+        marks["end_of_speech"] = time.perf_counter()
+        yield tail
+        marks["last_byte"] = time.perf_counter()
+
+    response = session.post(url, data=body(), headers=headers, timeout=timeout)
+    done = time.perf_counter()
+    if "last_byte" not in marks:
+        # The route answered (e.g. 413 or 401) before the body was sent, so there is no end of speech to time
+        return {"status": response.status_code, "failed": True, "eos_to_transcript": None, "after_last_byte": None,
+                "bytes": len(head) + 44 + len(pcm) + len(tail)}
+    return {
+        "status": response.status_code,
+        "failed": False,
+        "eos_to_transcript": done - marks["end_of_speech"],
+        "after_last_byte": done - marks["last_byte"],
+        "bytes": len(head) + 44 + len(pcm) + len(tail),
+    }
+
+
+def run(url, lengths, repeats, chunk_ms, speed, timeout):
+    session = requests.Session()
+    results = []
+    for seconds in lengths:
+        pcm = synth_pcm(seconds)
+        row = {
+            "seconds": seconds,
+            "blob": LatencyHistogram(),
+            "streaming": LatencyHistogram(),
+            "server_after_last_byte": LatencyHistogram(),
+            "statuses": {"blob": set(), "streaming": set()},
+            "failed": set(),
+        }
+        for _ in range(repeats):
+            blob = upload_blob(session, url, pcm, timeout)
+            row["blob"].record(blob["eos_to_transcript"])
+            row["statuses"]["blob"].add(blob["status"])
+            row["bytes"] = blob["bytes"]
+
+            streamed = upload_streaming(session, url, pcm, chunk_ms, speed, timeout)
+            row["statuses"]["streaming"].add(streamed["status"])
+            if streamed["failed"]:
+                row["failed"].add(streamed["status"])
+                continue
+            row["streaming"].record(streamed["eos_to_transcript"])
+            row["server_after_last_byte"].record(streamed["after_last_byte"])
+        print(f"   {seconds:g}s clip done")
+        results.append(row)
+    return results
+
+
+def print_report(results):
+    print("\n📊 End of speech -> transcript (ms, p50 / p90)")
+    print(f"   {'clip':>6}{'bytes':>10}{'blob p50':>11}{'blob p90':>11}{'stream p50':>12}{'stream p90':>12}"
+          f"{'saved p50':>11}{'route after EOF':>17}")
+    for row in results:
+        blob_p50, stream_p50 = row["blob"].percentile(50), row["streaming"].percentile(50)
+        saved = blob_p50 - stream_p50 if blob_p50 is not None and stream_p50 is not None else None
+        print(f"   {row['seconds']:>5g}s{row['bytes']:>10}{format_ms(blob_p50):>11}"
+              f"{format_ms(row['blob'].percentile(90)):>11}{format_ms(stream_p50):>12}"
+              f"{format_ms(row['streaming'].percentile(90)):>12}{format_ms(saved):>11}"
+              f"{format_ms(row['server_after_last_byte'].percentile(50)):>17}")
+        if row["failed"]:
+            print(f"   ❌ streaming upload answered {sorted(row['failed'])} before the whole clip was sent")
+        if row["statuses"]["blob"] != row["statuses"]["streaming"]:
+            print(f"   ⚠️ status mismatch: blob {sorted(row['statuses']['blob'])}, "
+                  f"streaming {sorted(row['statuses']['streaming'])}")
+    print("\n   'route after EOF' close to 'blob p50' means the route waits for the full body before working;")
+    print("   only a streaming ingestion path in the route can bring it down.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming vs whole-blob upload for /api/transcribe")
+    parser.add_argument("--url", default=f"{NEXT_BASE_URL}/api/transcribe")
+    parser.add_argument("--lengths", default="1,3,5,10,20", help="clip lengths in seconds, comma-separated")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--chunk-ms", type=int, default=DEFAULT_CHUNK_MS)
+    parser.add_argument("--speed", type=float, default=1.0, help="speech speed-up factor (1.0 = real time)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args(argv)
+
+    lengths = [float(x) for x in args.lengths.split(",") if x.strip()]
+    print(f"🎙️ {args.url}: clips {lengths}s, {args.repeats} repeats, {args.chunk_ms}ms chunks")
+    results = run(args.url, lengths, args.repeats, args.chunk_ms, args.speed, args.timeout)
+    print_report(results)
+    return 1 if any(row["failed"] for row in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+Local stand-ins for Supabase and OpenAI, for benchmarking the Next.js app.
+
+``StubServer`` answers on one port for:
+
+- ``/auth/v1``: ``GET /user`` for a Bearer access token, ``POST /token``
+  (``refresh_token`` and ``password`` grants) and ``POST /logout``
+- ``/rest/v1``: a tiny in-memory PostgREST - ``eq.`` filters, ``select``,
+  ``Prefer: return=representation`` and ``.single()`` (406 PGRST116 when no
+  row matches) - enough for user_usage metering and task inserts
+- ``/v1/chat/completions``: an OpenAI chat completion that returns one
+  task per request, so /api/tasks/parse runs end to end
+- ``/v1/audio/transcriptions``: Whisper, answering every upload with
+  ``transcript`` (plain text for ``response_format=text``, as
+  /api/transcribe asks for)
+
+Each family (``auth``, ``rest``, ``openai``, ``whisper``) has its own
+artificial latency, changeable while the server runs, and every call is
+counted per endpoint. Whisper also takes ``whisper_rtf`` seconds per second
+of 16 kHz 16-bit mono audio uploaded, since real transcription time grows
+with the clip.
+Point the app at it with ``NEXT_PUBLIC_SUPABASE_URL=<url>`` and
+``OPENAI_BASE_URL=<url>/v1`` (see ``app_env()``).
+
+Access tokens are unsigned JWTs carrying ``sub`` and ``exp``; the server
+only checks that it issued them. ``session_cookie()`` encodes a session the
+way @supabase/ssr stores it, so requests arrive already logged in.
+"""
+import base64
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_PORT = 54321
+ANON_KEY = "stub-anon-key"
+DEFAULT_TRANSCRIPT = "call john tomorrow and email sarah about the report"
+PCM_BYTES_PER_SECOND = 16000 * 2
+
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def access_token(user_id, expires_at):
+    """Unsigned JWT in the shape GoTrue issues"""
+    header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    claims = {"sub": user_id, "exp": expires_at, "aud": "authenticated", "role": "authenticated"}
+    return f"{header}.{_b64url(json.dumps(claims).encode())}.{_b64url(b'stub')}"
+
+
+def cookie_name(supabase_url):
+    """Auth cookie @supabase/ssr uses for a project URL (first label of the hostname)"""
+    return f"sb-{urlsplit(supabase_url).hostname.split('.')[0]}-auth-token"
+
+
+def session_cookie(supabase_url, session):
+    """``Cookie`` header value carrying ``session``, base64url-encoded like @supabase/ssr"""
+    value = "base64-" + _b64url(json.dumps(session, separators=(",", ":")).encode())
+    return f"{cookie_name(supabase_url)}={value}"
+
+
+class StubServer:
+    """Supabase auth, PostgREST and OpenAI stand-ins on one local port"""
+
+    def __init__(self, port=DEFAULT_PORT, auth_latency=0.0, rest_latency=0.0, openai_latency=0.0,
+                 whisper_latency=0.0, whisper_rtf=0.0, transcript=DEFAULT_TRANSCRIPT):
+        self.port = port
+        self.latency = {"auth": auth_latency, "rest": rest_latency, "openai": openai_latency,
+                        "whisper": whisper_latency}
+        self.whisper_rtf = whisper_rtf
+        self.transcript = transcript
+        self.calls = Counter()
+        self.users = {}
+        self.tokens = {}
+        self.refresh_tokens = {}
+        self.tables = {}
+        self.lock = threading.Lock()
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def app_env(self):
+        """Environment that points the Next.js app at this server"""
+        return {
+            "NEXT_PUBLIC_SUPABASE_URL": self.url,
+            "NEXT_PUBLIC_SUPABASE_ANON_KEY": ANON_KEY,
+            "OPENAI_API_KEY": "stub-openai-key",
+            "OPENAI_BASE_URL": f"{self.url}/v1",
+        }
+
+    def start(self):
+        stub = self
+
+        class Handler(StubHandler):
+            server_stub = stub
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.thread.join()
+        self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def snapshot(self):
+        """Copy of the per-endpoint call counts"""
+        with self.lock:
+            return Counter(self.calls)
+
+    def sign_in(self, email=None, expires_in=3600):
+        """A session for a new user; a negative ``expires_in`` gives an already expired one"""
+        user_id = str(uuid.uuid4())
+        user = {"id": user_id, "aud": "authenticated", "role": "authenticated",
+                "email": email or f"bench-{user_id[:8]}@example.com",
+                "app_metadata": {"provider": "email"}, "user_metadata": {},
+                "created_at": "2025-01-01T00:00:00Z"}
+        with self.lock:
+            self.users[user_id] = user
+            return self._session(user_id, expires_in)
+
+    def _session(self, user_id, expires_in=3600):
+        """New access and refresh token for ``user_id``; call with the lock held"""
+        expires_at = int(time.time()) + expires_in
+        token = access_token(user_id, expires_at)
+        refresh = uuid.uuid4().hex
+        self.tokens[token] = (user_id, expires_at)
+        self.refresh_tokens[refresh] = user_id
+        return {"access_token": token, "token_type": "bearer", "expires_in": expires_in,
+                "expires_at": expires_at, "refresh_token": refresh, "user": self.users[user_id]}
+
+    def rows(self, table):
+        """Rows currently stored for a /rest/v1 table"""
+        with self.lock:
+            return list(self.tables.get(table, []))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Routes one request to the auth, rest or openai stand-in"""
+
+    server_stub = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch()
+
+    def do_POST(self):
+        self.dispatch()
+
+    def do_PATCH(self):
+        self.dispatch()
+
+    def do_DELETE(self):
+        self.dispatch()
+
+    def dispatch(self):
+        stub = self.server_stub
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if parts.path.startswith("/auth/v1/"):
+            family, route = "auth", self.auth
+        elif parts.path.startswith("/rest/v1/"):
+            family, route = "rest", self.rest
+        elif parts.path.startswith("/v1/audio/"):
+            family, route = "whisper", self.whisper
+        elif parts.path.startswith("/v1/"):
+            family, route = "openai", self.openai
+        else:
+            return self.reply(404, {"error": "not found"})
+
+        endpoint = parts.path.split("/", 3)[-1] if family in ("auth", "rest") else parts.path[len("/v1/"):]
+        with stub.lock:
+            stub.calls[f"{family} {self.command} {endpoint}"] += 1
+        delay = stub.latency[family]
+        if delay:
+            time.sleep(delay)
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = raw
+        route(endpoint, dict(parse_qsl(parts.query)), body)
+
+    def reply(self, status, payload=None, content_type="application/json"):
+        if isinstance(payload, str):
+            data = payload.encode()
+        else:
+            data = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def auth(self, endpoint, query, body):
+        stub = self.server_stub
+        if endpoint == "user" and self.command == "GET":
+            token = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            with stub.lock:
+                user_id, expires_at = stub.tokens.get(token, (None, 0))
+                user = stub.users.get(user_id)
+            if not user or expires_at < time.time():
+                return self.reply(403, {"code": 403, "error_code": "bad_jwt",
+                                        "msg": "invalid JWT: unable to parse or verify signature"})
+            return self.reply(200, user)
+        if endpoint == "token" and self.command == "POST":
+            body = body or {}
+            with stub.lock:
+                if query.get("grant_type") == "refresh_token":
+                    user_id = stub.refresh_tokens.pop(body.get("refresh_token"), None)
+                else:
+                    user_id = next((u["id"] for u in stub.users.values() if u["email"] == body.get("email")), None)
+                session = stub._session(user_id) if user_id else None
+            if not session:
+                return self.reply(400, {"code": 400, "error_code": "invalid_grant",
+                                        "msg": "Invalid Refresh Token: Refresh Token Not Found"})
+            return self.reply(200, session)
+        if endpoint == "logout":
+            return self.reply(204)
+        return self.reply(404, {"code": 404, "msg": f"unsupported auth endpoint {endpoint}"})
+
+    def rest(self, table, query, body):
+        stub = self.server_stub
+        filters = {k: v[3:] for k, v in query.items() if v.startswith("eq.")}
+        single = "vnd.pgrst.object" in self.headers.get("Accept", "")
+        represent = "return=representation" in self.headers.get("Prefer", "")
+
+        def matches(row):
+            return all(str(row.get(k)) == v for k, v in filters.items())
+
+        with stub.lock:
+            rows = stub.tables.setdefault(table, [])
+            if self.command == "GET":
+                result = [dict(row) for row in rows if matches(row)]
+            elif self.command == "POST":
+                result = []
+                for item in body if isinstance(body, list) else [body or {}]:
+                    row = {"id": str(uuid.uuid4()), "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ"), **item}
+                    rows.append(row)
+                    result.append(dict(row))
+            elif self.command == "PATCH":
+                result = []
+                for row in rows:
+                    if matches(row):
+                        row.update(body or {})
+                        result.append(dict(row))
+            else:
+                result = [row for row in rows if matches(row)]
+                stub.tables[table] = [row for row in rows if not matches(row)]
+
+        if query.get("select", "*") != "*":
+            columns = query["select"].split(",")
+            result = [{c: row.get(c) for c in columns} for row in result]
+        if self.command != "GET" and not represent:
+            return self.reply(201 if self.command == "POST" else 204)
+        if single:
+            if len(result) != 1:
+                return self.reply(406, {"code": "PGRST116", "details": f"The result contains {len(result)} rows",
+                                        "hint": None, "message": "JSON object requested, multiple (or no) rows returned"})
+            return self.reply(201 if self.command == "POST" else 200, result[0])
+        return self.reply(201 if self.command == "POST" else 200, result)
+
+    def openai(self, endpoint, query, body):
+        if endpoint != "chat/completions":
+            return self.reply(404, {"error": {"message": f"unsupported OpenAI endpoint {endpoint}"}})
+        text = next((m["content"] for m in reversed(body.get("messages", [])) if m.get("role") == "user"), "")
+        content = json.dumps([{"title": text[:80] or "Task", "dueDate": None, "assignee": None,
+                               "tags": [], "priority": "medium"}])
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        completion_tokens = len(content) // 4
+        self.reply(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    def whisper(self, endpoint, query, body):
+        stub = self.server_stub
+        if endpoint != "audio/transcriptions" or self.command != "POST":
+            return self.reply(404, {"error": {"message": f"unsupported OpenAI endpoint {endpoint}"}})
+        upload = body if isinstance(body, bytes) else b""
+        if stub.whisper_rtf:
+            time.sleep(stub.whisper_rtf * len(upload) / PCM_BYTES_PER_SECOND)
+        if b'name="response_format"\r\n\r\ntext' in upload:
+            return self.reply(200, stub.transcript + "\n", content_type="text/plain; charset=utf-8")
+        self.reply(200, {"text": stub.transcript})
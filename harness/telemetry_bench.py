@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Bulk ingest and query benchmark for the monitoring_data time-series table.
+
+monitoring_data (guardian link migration) receives one row per device
+reading and has no secondary indexes. Against a local Postgres this tool:
+
+1. applies the migrations and creates ``--orgs`` organizations with
+   ``--devices`` monitored people spread across them
+2. backfills ``--history-hours`` of readings as fast as possible - the
+   unthrottled ingest ceiling
+3. for each index set in ``--indexes``, streams live readings at ``--rate``
+   rows/s from ``--writers`` connections using multi-row INSERT or COPY
+   batches, then times the dashboard queries:
+
+   - latest reading per person in an organization (DISTINCT ON and LATERAL)
+   - the last 24 hours of readings for an organization
+
+Usage:
+    python -m harness.telemetry_bench --orgs 200 --devices 5000 --rate 5000 --duration 30
+    python -m harness.telemetry_bench --method values --batch 500 --indexes none,person,person+org
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from harness.histogram import LatencyHistogram, format_ms
+from harness.pg import apply_schema, connect, explain, plan_nodes, table_size, timed_query, truncate
+
+COLUMNS = ("monitored_person_id", "organization_id", "device_id", "timestamp", "battery_level",
+           "battery_is_charging", "location_latitude", "location_longitude", "movement_step_count",
+           "fall_event_detected")
+
+CANDIDATE_INDEXES = {
+    "person": ("idx_monitoring_data_person_ts", "(monitored_person_id, timestamp DESC)"),
+    "org": ("idx_monitoring_data_org_ts", "(organization_id, timestamp DESC)"),
+    "brin": ("idx_monitoring_data_ts_brin", "USING brin (timestamp)"),
+}
+
+QUERIES = {
+    "latest per person (DISTINCT ON)": """
+        SELECT DISTINCT ON (monitored_person_id) monitored_person_id, timestamp, battery_level,
+               location_latitude, location_longitude
+        FROM monitoring_data
+        WHERE organization_id = %s
+        ORDER BY monitored_person_id, timestamp DESC""",
+    "latest per person (LATERAL)": """
+        SELECT p.id, d.timestamp, d.battery_level, d.location_latitude, d.location_longitude
+        FROM monitored_person p
+        CROSS JOIN LATERAL (
+            SELECT timestamp, battery_level, location_latitude, location_longitude
+            FROM monitoring_data m
+            WHERE m.monitored_person_id = p.id
+            ORDER BY m.timestamp DESC
+            LIMIT 1
+        ) d
+        WHERE p.organization_id = %s""",
+    "last 24h per organization": """
+        SELECT monitored_person_id, timestamp, battery_level, location_latitude, location_longitude,
+               movement_step_count, fall_event_detected
+        FROM monitoring_data
+        WHERE organization_id = %s AND timestamp >= now() - interval '24 hours'
+        ORDER BY timestamp DESC""",
+}
+
+
+def seed_devices(conn, orgs, devices):
+    """[(person_id, org_id, device_id)] for freshly created organizations and people"""
+    truncate(conn, "organizations")
+    org_ids = [uuid.uuid4() for _ in range(orgs)]
+    with conn.cursor() as cur:
+        with cur.copy("COPY organizations (id, name, organization_type) FROM STDIN") as copy:
+            for n, org_id in enumerate(org_ids):
+                copy.write_row((org_id, f"Bench Org {n}", "care_company" if n % 4 == 0 else "private_family"))
+        people = [(uuid.uuid4(), random.choice(org_ids), f"bench-device-{n}") for n in range(devices)]
+        with cur.copy("COPY monitored_person (id, organization_id, device_id, name, status) FROM STDIN") as copy:
+            for person_id, org_id, device_id in people:
+                copy.write_row((person_id, org_id, device_id, f"Person {device_id}", "active"))
+    return people
+
+
+def reading(device, timestamp):
+    person_id, org_id, device_id = device
+    return (person_id, org_id, device_id, timestamp, random.randint(5, 100), random.random() < 0.2,
+            32.0 + random.random(), 34.7 + random.random(), random.randint(0, 20000), random.random() < 0.0005)
+
+
+def insert_sql(rows):
+    """One multi-row INSERT for ``rows`` readings"""
+    placeholders = "(" + ", ".join(["%s"] * len(COLUMNS)) + ")"
+    return f"INSERT INTO monitoring_data ({', '.join(COLUMNS)}) VALUES " + ", ".join([placeholders] * rows)
+
+
+class Writer:
+    """One connection writing batches with multi-row INSERT or COPY"""
+
+    def __init__(self, dsn, method, batch):
+        self.conn = connect(dsn)
+        self.method = method
+        self.batch = batch
+        self.latency = LatencyHistogram()
+        self.rows = 0
+        self.insert_sql = insert_sql(batch)
+
+    def write(self, rows):
+        started = time.perf_counter()
+        with self.conn.cursor() as cur:
+            if self.method == "copy":
+                with cur.copy(f"COPY monitoring_data ({', '.join(COLUMNS)}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+            else:
+                sql = self.insert_sql if len(rows) == self.batch else insert_sql(len(rows))
+                cur.execute(sql, [value for row in rows for value in row])
+        self.latency.record(time.perf_counter() - started)
+        self.rows += len(rows)
+
+    def close(self):
+        self.conn.close()
+
+
+def backfill(dsn, people, hours, interval, method, batch):
+    """Historic readings every ``interval`` seconds per device; returns (rows, seconds)"""
+    writer = Writer(dsn, method, batch)
+    now = datetime.now(timezone.utc)
+    steps = int(hours * 3600 / interval)
+    started = time.perf_counter()
+    rows = []
+    for step in range(steps, 0, -1):
+        timestamp = now - timedelta(seconds=step * interval)
+        for device in people:
+            rows.append(reading(device, timestamp + timedelta(seconds=random.uniform(0, interval))))
+            if len(rows) == batch:
+                writer.write(rows)
+                rows = []
+    if rows:
+        writer.write(rows)
+    elapsed = time.perf_counter() - started
+    writer.close()
+    return writer.rows, elapsed
+
+
+def live_ingest(dsn, people, rate, duration, writers, method, batch):
+    """Stream current readings at ``rate`` rows/s (0 = flat out); returns the writers and elapsed time"""
+    pool = [Writer(dsn, method, batch) for _ in range(writers)]
+    per_writer = rate / writers if rate else 0
+
+    def run(index, writer):
+        devices = people[index::writers] or people
+        start = time.perf_counter()
+        deadline = start + duration
+        sent = 0
+        while True:
+            # A batch is due once its rows have accrued at the target rate; falling behind is the ceiling
+            due = start + (sent + batch) / per_writer if per_writer else time.perf_counter()
+            if due > deadline:
+                break
+            time.sleep(max(0.0, due - time.perf_counter()))
+            now = datetime.now(timezone.utc)
+            writer.write([reading(devices[(sent + i) % len(devices)], now) for i in range(batch)])
+            sent += batch
+
+    threads = [threading.Thread(target=run, args=(i, w)) for i, w in enumerate(pool)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    for writer in pool:
+        writer.close()
+    return pool, elapsed
+
+
+def set_indexes(conn, names):
+    """Drop every candidate index, then build ``names``; returns build seconds"""
+    for index_name, _ in CANDIDATE_INDEXES.values():
+        conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+    started = time.perf_counter()
+    for name in names:
+        index_name, definition = CANDIDATE_INDEXES[name]
+        conn.execute(f"CREATE INDEX {index_name} ON monitoring_data {definition}")
+    elapsed = time.perf_counter() - started
+    conn.execute("ANALYZE monitoring_data")
+    return elapsed
+
+
+def measure_queries(conn, org_ids, samples):
+    """{query name: (LatencyHistogram, rows per call, plan node types)}"""
+    results = {}
+    for name, sql in QUERIES.items():
+        histogram, rows = LatencyHistogram(), 0
+        for _ in range(samples):
+            elapsed, fetched = timed_query(conn, sql, (random.choice(org_ids),))
+            histogram.record(elapsed)
+            rows += len(fetched)
+        nodes = sorted({node["Node Type"] for node in plan_nodes(explain(conn, sql, (org_ids[0],)))})
+        results[name] = (histogram, rows / samples, nodes)
+    return results
+
+
+def parse_index_sets(value):
+    sets = []
+    for spec in value.split(","):
+        names = [] if spec == "none" else spec.split("+")
+        unknown = [n for n in names if n not in CANDIDATE_INDEXES]
+        if unknown:
+            raise SystemExit(f"❌ Unknown index '{unknown[0]}'. Choose from: none, {', '.join(CANDIDATE_INDEXES)}")
+        sets.append((spec, names))
+    return sets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="monitoring_data ingest and query benchmark")
+    parser.add_argument("--dsn", help="scratch Postgres (default HARNESS_PG_DSN)")
+    parser.add_argument("--orgs", type=int, default=100)
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--history-hours", type=float, default=24.0, help="backfilled readings per device")
+    parser.add_argument("--interval", type=float, default=300.0, help="seconds between backfilled readings")
+    parser.add_argument("--rate", type=float, default=2000.0, help="live rows/s across all writers (0 = flat out)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of live ingest per index set")
+    parser.add_argument("--writers", type=int, default=4, help="concurrent writer connections")
+    parser.add_argument("--method", choices=("copy", "values"), default="copy")
+    parser.add_argument("--batch", type=int, default=500, help="rows per INSERT/COPY batch")
+    parser.add_argument("--indexes", default="none,person+org",
+                        help=f"comma-separated index sets to compare, each none or a +-joined subset of "
+                             f"{', '.join(CANDIDATE_INDEXES)}")
+    parser.add_argument("--samples", type=int, default=20, help="runs per query")
+    args = parser.parse_args(argv)
+
+    if args.method == "values" and args.batch * len(COLUMNS) > 65535:
+        raise SystemExit(f"❌ --batch {args.batch} exceeds the 65535 bind parameters of one INSERT")
+    index_sets = parse_index_sets(args.indexes)
+    conn = connect(args.dsn)
+    apply_schema(conn)
+    set_indexes(conn, [])
+    people = seed_devices(conn, args.orgs, args.devices)
+    org_ids = sorted({org_id for _, org_id, _ in people})
+    print(f"🌱 {len(org_ids)} organizations, {len(people)} devices")
+
+    rows, elapsed = backfill(args.dsn, people, args.history_hours, args.interval, args.method, args.batch)
+    conn.execute("VACUUM ANALYZE monitoring_data")
+    print(f"📥 Backfilled {rows:,} rows in {elapsed:.1f}s: {rows / elapsed:,.0f} rows/s "
+          f"({args.method}, batch {args.batch}, 1 writer)")
+
+    for label, names in index_sets:
+        build = set_indexes(conn, names)
+        pool, elapsed = live_ingest(args.dsn, people, args.rate, args.duration, args.writers, args.method, args.batch)
+        written = sum(w.rows for w in pool)
+        batches = LatencyHistogram()
+        for writer in pool:
+            batches.merge(writer.latency)
+        conn.execute("ANALYZE monitoring_data")
+        total = conn.execute("SELECT count(*) FROM monitoring_data").fetchone()[0]
+
+        print(f"\n🗂️ Indexes: {label}" + (f" (built in {build:.1f}s)" if names else ""))
+        target = f"target {args.rate:,.0f}" if args.rate else "unthrottled"
+        print(f"   ingest {written / elapsed:,.0f} rows/s ({target}) from {args.writers} writers, "
+              f"batch p50 {format_ms(batches.percentile(50))}ms p99 {format_ms(batches.percentile(99))}ms")
+        if args.rate and written / elapsed < args.rate * 0.95:
+            print(f"   ⚠️ could not sustain {args.rate:,.0f} rows/s - this is the ingest ceiling")
+        print(f"   table {total:,} rows, {table_size(conn, 'monitoring_data') / 1024 / 1024:.1f} MB with indexes")
+        for name, (histogram, rows_per_call, nodes) in measure_queries(conn, org_ids, args.samples).items():
+            print(f"   {name:<34} p50 {format_ms(histogram.percentile(50)):>8}ms p99 "
+                  f"{format_ms(histogram.percentile(99)):>8}ms  {rows_per_call:,.0f} rows  [{', '.join(nodes)}]")
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
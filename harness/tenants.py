@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Multi-tenant scale benchmark sweeping X-Provider-ID.
+
+The test suite runs as a single provider, but production serves many from
+the same tables. This tool:
+
+1. creates N providers through POST /api/providers/create
+2. seeds a Zipf-skewed number of participants, activities and leads per
+   provider (a few whales, a long tail of small tenants)
+3. measures list, search and public-provider latency for every tenant
+4. re-measures the small tenants while the whales are under load, to show
+   whether a large tenant's data slows everyone else down
+
+Created provider IDs and their sizes are saved to ``--state`` so later runs
+can skip seeding with ``--reuse``.
+
+Usage:
+    python -m harness.tenants --providers 50 --rows 20000 --skew 1.2
+    python -m harness.tenants --reuse --samples 30
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from harness.client import client_from_env, resilience_from_env
+from harness.config import API_BASE, api_headers
+from harness.histogram import LatencyHistogram, format_ms
+from harness.loadgen import run_open_loop, send
+
+DEFAULT_STATE = "tenants.json"
+
+
+def extract_id(payload):
+    """ID from either the wrapped ``{"success", "data"}`` or the direct envelope"""
+    if isinstance(payload, dict) and isinstance(payload.get("data"), dict):
+        payload = payload["data"]
+    return payload["id"]
+
+
+def zipf_sizes(providers, total_rows, skew, minimum=5):
+    """Rows per tenant following a Zipf law: tenant 0 is the biggest whale"""
+    weights = [1.0 / (rank + 1) ** skew for rank in range(providers)]
+    scale = total_rows / sum(weights)
+    return [max(minimum, int(w * scale)) for w in weights]
+
+
+def create_provider(session, index):
+    suffix = uuid.uuid4().hex[:8]
+    data = {
+        "name": f"Bench Provider {index} {suffix}",
+        "email": f"bench-{index}-{suffix}@example.com",
+        "description": "Multi-tenant scale benchmark provider",
+    }
+    response = session.post(f"{API_BASE}/providers/create", headers=api_headers(), json=data, timeout=30)
+    response.raise_for_status()
+    return extract_id(response.json())
+
+
+def _records(kind, n):
+    """Request bodies for the i-th seeded record, same shapes as the CRUD tests"""
+    if kind == "participants":
+        return {"first_name": f"Seed{n}", "last_name": "Participant", "email": f"seed{n}.{uuid.uuid4().hex[:6]}@test.com",
+                "phone": "+1234567890", "is_active": True}
+    if kind == "activities":
+        return {"name": f"Seed Activity {n}", "description": "Seeded activity", "activity_type": "course",
+                "status": "draft", "start_date": (date.today() + timedelta(days=30)).isoformat(),
+                "end_date": (date.today() + timedelta(days=60)).isoformat(), "capacity": 25}
+    return {"first_name": f"Seed{n}", "last_name": "Lead", "email": f"lead{n}.{uuid.uuid4().hex[:6]}@test.com",
+            "source": "website", "status": "new"}
+
+
+SEED_PATHS = {"participants": "/participants", "activities": "/activities", "leads": "/marketing/leads"}
+
+
+def seed_tenant(provider_id, rows, concurrency):
+    """Spread ``rows`` across participants/activities/leads for one provider"""
+    local = threading.local()
+    headers = api_headers(provider_id)
+    kinds = list(SEED_PATHS)
+    jobs = [(kinds[n % len(kinds)], n) for n in range(rows)]
+
+    def post(job):
+        kind, n = job
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = client_from_env()
+        response = session.post(f"{API_BASE}{SEED_PATHS[kind]}", headers=headers, json=_records(kind, n), timeout=30)
+        return response.status_code < 400
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return sum(pool.map(post, jobs))
+
+
+def tenant_operations(provider_id):
+    """The read operations measured for each tenant"""
+    headers = api_headers(provider_id)
+
+    def op(name, path):
+        return {"name": name, "method": "GET", "url": f"{API_BASE}{path}", "headers": headers}
+
+    return [
+        op("list participants", "/participants"),
+        op("list activities", "/activities"),
+        op("list leads", "/marketing/leads"),
+        op("search participants", "/search/participants?q=Seed"),
+        op("search activities", "/search/activities?q=Seed"),
+        op("public provider", f"/public/providers/{provider_id}"),
+        op("public activities", f"/public/providers/{provider_id}/activities"),
+    ]
+
+
+def measure_tenant(session, provider_id, samples):
+    """{operation name: LatencyHistogram} for one tenant"""
+    results = {}
+    for operation in tenant_operations(provider_id):
+        histogram = results[operation["name"]] = LatencyHistogram()
+        for _ in range(samples):
+            started = time.perf_counter()
+            status = send(session, operation)
+            if isinstance(status, int) and status < 400:
+                histogram.record(time.perf_counter() - started)
+    return results
+
+
+def whale_load(whales, rate, duration):
+    """Background open-loop list traffic against the whale tenants"""
+    threads = []
+    for provider_id in whales:
+        operation = tenant_operations(provider_id)[0]
+        thread = threading.Thread(target=run_open_loop, args=(operation, rate, duration), daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+def print_tenant_table(tenants, measurements):
+    names = [op["name"] for op in tenant_operations("x")]
+    print(f"\n📊 Per-tenant p50 / p99 latency (ms)")
+    print(f"   {'rank':<6}{'rows':>8}  " + "".join(f"{name[:18]:>20}" for name in names))
+    for rank, tenant in enumerate(tenants):
+        cells = []
+        for name in names:
+            histogram = measurements[tenant["id"]][name]
+            cells.append(f"{format_ms(histogram.percentile(50))}/{format_ms(histogram.percentile(99))}")
+        print(f"   {rank:<6}{tenant['rows']:>8}  " + "".join(f"{cell:>20}" for cell in cells))
+
+
+def size_correlation(tenants, measurements, name):
+    """Pearson correlation between tenant size and p50 latency of ``name``"""
+    points = [(t["rows"], measurements[t["id"]][name].percentile(50)) for t in tenants]
+    points = [(x, y) for x, y in points if y is not None]
+    if len(points) < 3:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    var_y = sum((y - mean_y) ** 2 for _, y in points)
+    return cov / (var_x * var_y) ** 0.5 if var_x and var_y else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-tenant scale benchmark")
+    parser.add_argument("--providers", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=5000, help="total seeded rows across all tenants")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent (higher = bigger whales)")
+    parser.add_argument("--whales", type=int, default=3, help="largest tenants used as noisy neighbours")
+    parser.add_argument("--samples", type=int, default=20, help="requests per operation per tenant")
+    parser.add_argument("--whale-rate", type=float, default=20.0, help="req/s per whale during the neighbour phase")
+    parser.add_argument("--concurrency", type=int, default=16, help="parallel seeding requests")
+    parser.add_argument("--state", default=DEFAULT_STATE, help="file recording created tenants")
+    parser.add_argument("--reuse", action="store_true", help="skip creation/seeding and reuse --state")
+    args = parser.parse_args(argv)
+
+    session = client_from_env()
+    if args.reuse:
+        with open(args.state) as f:
+            tenants = json.load(f)["tenants"]
+        print(f"♻️ Reusing {len(tenants)} tenants from {args.state}")
+    else:
+        tenants = []
+        for index, rows in enumerate(zipf_sizes(args.providers, args.rows, args.skew)):
+            provider_id = create_provider(session, index)
+            seeded = seed_tenant(provider_id, rows, args.concurrency)
+            tenants.append({"id": provider_id, "rows": seeded})
+            print(f"   🌱 tenant {index}: {seeded}/{rows} rows seeded ({provider_id})")
+        with open(args.state, "w") as f:
+            json.dump({"tenants": tenants}, f, indent=2)
+        print(f"💾 Saved tenants to {os.path.abspath(args.state)}")
+
+    tenants.sort(key=lambda t: t["rows"], reverse=True)
+    measurements = {t["id"]: measure_tenant(session, t["id"], args.samples) for t in tenants}
+    print_tenant_table(tenants, measurements)
+
+    for name in ("list participants", "search participants"):
+        r = size_correlation(tenants, measurements, name)
+        if r is not None:
+            print(f"   size vs p50 correlation for {name}: {r:+.2f}")
+
+    # Noisy-neighbour phase: small tenants again while the whales are busy
+    whales = [t["id"] for t in tenants[:args.whales]]
+    small = tenants[args.whales:]
+    if whales and small:
+        duration = max(10.0, args.samples * len(small) * 0.1)
+        threads = whale_load(whales, args.whale_rate, duration)
+        loaded = {t["id"]: measure_tenant(session, t["id"], args.samples) for t in small}
+        for thread in threads:
+            thread.join()
+
+        print(f"\n🐋 Small tenants with {len(whales)} whales under {args.whale_rate:g} req/s each")
+        print(f"   {'operation':<22}{'alone p99':>12}{'loaded p99':>12}{'slowdown':>10}")
+        for op in tenant_operations("x"):
+            alone, busy = LatencyHistogram(), LatencyHistogram()
+            for t in small:
+                alone.merge(measurements[t["id"]][op["name"]])
+                busy.merge(loaded[t["id"]][op["name"]])
+            a, b = alone.percentile(99), busy.percentile(99)
+            slowdown = f"{b / a:.2f}x" if a and b else "-"
+            print(f"   {op['name']:<22}{format_ms(a):>12}{format_ms(b):>12}{slowdown:>10}")
+
+    resilience = resilience_from_env()
+    if resilience is not None:
+        for line in resilience.report_lines():
+            print(f"   🔁 {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Low-level request timing (connect / TTFB / total) and Server-Timing parsing"""
+import http.client
+import time
+from urllib.parse import urlsplit
+
+
+def parse_server_timing(header):
+    """
+    Parse a ``Server-Timing`` header into ``{name: duration_ms}``.
+
+    ``db;dur=53.2, app;desc="render";dur=47, cache`` ->
+    ``{"db": 53.2, "app": 47.0, "cache": 0.0}``. Several headers joined
+    with commas (as requests does) parse the same way.
+    """
+    metrics = {}
+    if not header:
+        return metrics
+    for entry in header.split(","):
+        parts = [p.strip() for p in entry.split(";")]
+        name = parts[0]
+        if not name:
+            continue
+        duration = 0.0
+        for param in parts[1:]:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "dur":
+                try:
+                    duration = float(value.strip().strip('"'))
+                except ValueError:
+                    pass
+        metrics[name] = metrics.get(name, 0.0) + duration
+    return metrics
+
+
+def measure_ttfb(url, method="GET", body=None, headers=None, timeout=120):
+    """
+    Send one request on a fresh connection and time its phases.
+
+    Returns a dict with ``connect``, ``ttfb`` (request sent -> status line
+    received) and ``total`` in seconds, plus ``status``, ``bytes`` and the
+    parsed ``server_timing``.
+    """
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    try:
+        start = time.perf_counter()
+        connection.connect()
+        connected = time.perf_counter()
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        first_byte = time.perf_counter()
+        payload = response.read()
+        done = time.perf_counter()
+    finally:
+        connection.close()
+
+    return {
+        "status": response.status,
+        "connect": connected - start,
+        "ttfb": first_byte - connected,
+        "total": done - start,
+        "bytes": len(payload),
+        "server_timing": parse_server_timing(response.getheader("Server-Timing")),
+    }
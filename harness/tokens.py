@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Token lifecycle cache for authenticated runs against the :8082 API.
+
+``TokenManager`` logs each identity in once (POST /api/auth/login) and hands
+the access token to every virtual user that asks for it:
+
+- in process, concurrent callers share one login per identity; the fast
+  path is a dict lookup, so thousands of virtual users cost nothing extra
+- across processes, tokens live in a JSON file (``HARNESS_TOKEN_CACHE``)
+  guarded by an ``fcntl`` lock, so pytest, loadgen and distributed workers
+  reuse each other's logins and refreshes instead of repeating them
+- a background thread refreshes (POST /api/auth/refresh) ahead of expiry,
+  falling back to a fresh login when the refresh token is rejected
+- ``invalidate()`` after a 401 drops a token so the next caller renews it
+
+``report_lines()`` counts token handouts against the logins and refreshes
+actually sent; every handout without a login is one the run did not have
+to make, and every token adopted from the shared file is a login or
+refresh another process already paid for.
+
+Identities come from a JSON file (``HARNESS_IDENTITIES``): a list of
+``{"email": ..., "password": ...}`` objects, sent as the login body.
+
+Usage:
+    python -m harness.tokens --identities identities.json --warm
+    python -m harness.tokens --identities identities.json --virtual-users 2000 --duration 30
+    python -m harness.tokens --status
+    python -m harness.tokens --identities identities.json --clear
+"""
+import argparse
+import base64
+import fcntl
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from harness.config import BASE_URL, TOKEN_CACHE, api_headers
+
+DEFAULT_TTL = 900
+REFRESH_AHEAD = 60
+EXPIRY_SKEW = 5
+
+
+def load_identities(path):
+    """Identity dicts from a JSON list of login bodies"""
+    with open(path) as f:
+        identities = json.load(f)
+    if not isinstance(identities, list) or not all(isinstance(i, dict) for i in identities):
+        raise SystemExit(f"❌ {path} must hold a JSON list of login objects")
+    return identities
+
+
+def identity_name(identity):
+    return identity.get("email") or identity.get("username") or json.dumps(identity, sort_keys=True)
+
+
+def _field(payload, *names):
+    """First of ``names`` in a token response, looking inside a ``data`` envelope too"""
+    for source in (payload, payload.get("data") if isinstance(payload.get("data"), dict) else {}):
+        for name in names:
+            if source.get(name) is not None:
+                return source[name]
+    return None
+
+
+def jwt_expiry(token):
+    """``exp`` claim of a JWT access token, or None"""
+    try:
+        claims = token.split(".")[1]
+        return float(json.loads(base64.urlsafe_b64decode(claims + "=" * (-len(claims) % 4)))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def token_entry(payload, now=None, previous=None):
+    """Cache entry for a login or refresh response"""
+    now = now or time.time()
+    access = _field(payload, "access_token", "accessToken", "token")
+    if not access:
+        raise ValueError("auth response has no access token")
+    expires_at = _field(payload, "expires_at", "expiresAt")
+    expires_in = _field(payload, "expires_in", "expiresIn")
+    if expires_at is None:
+        expires_at = now + float(expires_in) if expires_in is not None else jwt_expiry(access) or now + DEFAULT_TTL
+    refresh = _field(payload, "refresh_token", "refreshToken") or (previous or {}).get("refresh_token")
+    return {"access_token": access, "refresh_token": refresh, "issued_at": now, "expires_at": float(expires_at)}
+
+
+class FileLock:
+    """Exclusive ``fcntl.flock`` on a sidecar .lock file"""
+
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self.fd = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+
+
+class TokenStore:
+    """The cross-process token file; call ``load``/``save`` while holding ``lock()``"""
+
+    def __init__(self, path=TOKEN_CACHE):
+        self.path = path
+
+    def lock(self):
+        return FileLock(self.path)
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save(self, entries):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class TokenManager:
+    """Logs each identity in once and shares its tokens with every caller and process"""
+
+    def __init__(self, base_url=BASE_URL, store=None, refresh_ahead=REFRESH_AHEAD, background=True,
+                 headers=None, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.store = store or TokenStore()
+        self.refresh_ahead = refresh_ahead
+        self.headers = headers if headers is not None else api_headers()
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.identities = {}
+        self.entries = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.stopped = threading.Event()
+        self.thread = None
+        if background:
+            self.thread = threading.Thread(target=self._refresh_loop, daemon=True)
+            self.thread.start()
+
+    def key(self, identity):
+        return f"{self.base_url}|{identity_name(identity)}"
+
+    def token(self, identity):
+        """A valid access token for ``identity``, logging in or refreshing only when needed"""
+        key = self.key(identity)
+        entry = self.entries.get(key)
+        if not self._due(entry, time.time()):
+            with self.lock:
+                self.stats["handouts"] += 1
+            return entry["access_token"]
+        entry = self._renew(identity, key)
+        with self.lock:
+            self.stats["handouts"] += 1
+        return entry["access_token"]
+
+    def auth_headers(self, identity):
+        return {"Authorization": f"Bearer {self.token(identity)}"}
+
+    def invalidate(self, identity, token):
+        """Forget ``token`` after the API rejected it (401); the next caller renews"""
+        key = self.key(identity)
+        with self.lock:
+            if self.entries.get(key, {}).get("access_token") == token:
+                self.entries[key] = dict(self.entries[key], expires_at=self.entries[key]["issued_at"])
+                self.stats["invalidated"] += 1
+
+    def _key_lock(self, key):
+        with self.lock:
+            return self.locks.setdefault(key, threading.Lock())
+
+    def _due(self, entry, now, ahead=False):
+        """True when ``entry`` is missing, expired or (with ``ahead``) inside its refresh window"""
+        if not entry:
+            return True
+        lifetime = entry["expires_at"] - entry["issued_at"]
+        window = min(self.refresh_ahead, lifetime / 3) if ahead else min(EXPIRY_SKEW, lifetime / 10)
+        return now >= entry["expires_at"] - window
+
+    def _renew(self, identity, key, background=False):
+        with self._key_lock(key):
+            # Another virtual user may have renewed while we waited
+            entry = self.entries.get(key)
+            if not self._due(entry, time.time(), ahead=background):
+                if not background:
+                    with self.lock:
+                        self.stats["coalesced"] += 1
+                return entry
+            with self.store.lock():
+                shared = self.store.load()
+                stored = shared.get(key)
+                if stored and not self._due(stored, time.time(), ahead=background) and \
+                        (not entry or stored["access_token"] != entry["access_token"]):
+                    with self.lock:
+                        self.stats["shared_refreshes" if entry else "shared_logins"] += 1
+                    fresh = stored
+                else:
+                    fresh = self._refresh(entry or stored) or self._login(identity)
+                    fresh["identity"] = identity_name(identity)
+                    shared[key] = fresh
+                    self.store.save(shared)
+            with self.lock:
+                self.identities[key] = identity
+                self.entries[key] = fresh
+                if background:
+                    self.stats["background_refreshes"] += 1
+            return fresh
+
+    def _post(self, path, payload, token=None):
+        headers = dict(self.headers)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        return self.session.post(f"{self.base_url}/api/auth/{path}", json=payload, headers=headers,
+                                 timeout=self.timeout)
+
+    def _login(self, identity):
+        response = self._post("login", identity)
+        with self.lock:
+            self.stats["logins"] += 1
+        if response.status_code >= 400:
+            with self.lock:
+                self.stats["login_failures"] += 1
+            raise requests.HTTPError(f"login for {identity_name(identity)} failed: {response.status_code}",
+                                     response=response)
+        return token_entry(response.json())
+
+    def _refresh(self, entry):
+        if not entry or not entry.get("refresh_token"):
+            return None
+        response = self._post("refresh", {"refresh_token": entry["refresh_token"]}, entry["access_token"])
+        with self.lock:
+            self.stats["refreshes"] += 1
+        if response.status_code >= 400:
+            with self.lock:
+                self.stats["refresh_failures"] += 1
+            return None
+        return token_entry(response.json(), previous=entry)
+
+    def _refresh_loop(self):
+        while not self.stopped.wait(1.0):
+            now = time.time()
+            with self.lock:
+                due = [(key, self.identities[key]) for key, entry in self.entries.items()
+                       if key in self.identities and self._due(entry, now, ahead=True)]
+            for key, identity in due:
+                try:
+                    self._renew(identity, key, background=True)
+                except (requests.RequestException, ValueError):
+                    with self.lock:
+                        self.stats["background_failures"] += 1
+
+    def logout(self, identity):
+        """POST /api/auth/logout and drop the identity from memory and the shared file"""
+        key = self.key(identity)
+        with self._key_lock(key), self.store.lock():
+            shared = self.store.load()
+            entry = shared.pop(key, None) or self.entries.get(key)
+            self.store.save(shared)
+            with self.lock:
+                self.entries.pop(key, None)
+                self.identities.pop(key, None)
+        if entry:
+            self._post("logout", {"refresh_token": entry.get("refresh_token")}, entry["access_token"])
+
+    def close(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def report_lines(self):
+        s = self.stats
+        if not s["handouts"]:
+            return []
+        sent = s["logins"] + s["refreshes"]
+        lines = [
+            f"{s['handouts']:,} tokens handed out for {len(self.entries)} identities: "
+            f"{s['logins']} logins and {s['refreshes']} refreshes sent "
+            f"({s['background_refreshes']} refreshed ahead of expiry in the background)",
+            f"saved {s['handouts'] - s['logins']:,} logins vs one per handout, "
+            f"{s['shared_logins']} logins and {s['shared_refreshes']} refreshes reused from other processes, "
+            f"{s['coalesced']} concurrent renewals coalesced",
+        ]
+        failures = s["login_failures"] + s["refresh_failures"] + s["background_failures"]
+        if failures or s["invalidated"]:
+            lines.append(f"{s['invalidated']} tokens invalidated after 401, {failures} auth failures "
+                         f"({s['refresh_failures']} rejected refreshes fell back to login)")
+        if sent and s["handouts"] / sent < 10:
+            lines.append("⚠️ fewer than 10 handouts per auth call - tokens expire faster than the run reuses them")
+        return lines
+
+
+@functools.lru_cache(maxsize=None)
+def tokens_from_env():
+    """Process-wide (TokenManager, identities) from HARNESS_IDENTITIES, or None when unset"""
+    path = os.environ.get("HARNESS_IDENTITIES")
+    if not path:
+        return None
+    return TokenManager(), load_identities(path)
+
+
+def simulate(manager, identities, virtual_users, duration, think_time):
+    """Virtual users asking for a token before every request for ``duration`` seconds"""
+    deadline = time.monotonic() + duration
+
+    def user(index):
+        identity = identities[index % len(identities)]
+        while time.monotonic() < deadline:
+            manager.token(identity)
+            time.sleep(think_time)
+
+    with ThreadPoolExecutor(max_workers=virtual_users) as pool:
+        list(pool.map(user, range(virtual_users)))
+
+
+def print_status(store):
+    with store.lock():
+        entries = store.load()
+    if not entries:
+        print(f"📭 No cached tokens in {store.path}")
+    now = time.time()
+    for key, entry in sorted(entries.items()):
+        left = entry["expires_at"] - now
+        mark = "✅" if left > EXPIRY_SKEW else "⌛"
+        print(f"{mark} {key}: expires in {left:,.0f}s, refresh token {'yes' if entry.get('refresh_token') else 'no'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared login/refresh cache for authenticated harness runs")
+    parser.add_argument("--identities", default=os.environ.get("HARNESS_IDENTITIES"),
+                        help="JSON list of login bodies (default HARNESS_IDENTITIES)")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--cache", default=TOKEN_CACHE, help="shared token file (default HARNESS_TOKEN_CACHE)")
+    parser.add_argument("--status", action="store_true", help="list cached tokens and exit")
+    parser.add_argument("--warm", action="store_true", help="log every identity in (or reuse its token)")
+    parser.add_argument("--clear", action="store_true", help="log every identity out and drop its tokens")
+    parser.add_argument("--virtual-users", type=int, default=0, help="simulate this many concurrent token users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of simulation")
+    parser.add_argument("--think-time", type=float, default=0.05, help="seconds between a virtual user's requests")
+    args = parser.parse_args(argv)
+
+    store = TokenStore(args.cache)
+    if args.status:
+        print_status(store)
+        return 0
+    if not args.identities:
+        raise SystemExit("❌ Pass --identities or set HARNESS_IDENTITIES")
+    identities = load_identities(args.identities)
+
+    with TokenManager(args.base_url, store) as manager:
+        if args.clear:
+            for identity in identities:
+                manager.logout(identity)
+            print(f"🧹 Logged out {len(identities)} identities")
+            return 0
+        if args.warm:
+            for identity in identities:
+                manager.token(identity)
+            print(f"🔑 {len(identities)} identities ready in {store.path}")
+        if args.virtual_users:
+            print(f"👥 {args.virtual_users} virtual users over {len(identities)} identities for {args.duration:g}s")
+            simulate(manager, identities, args.virtual_users, args.duration, args.think_time)
+        for line in manager.report_lines():
+            print(f"   🔑 {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+W3C trace context for harness requests and Server-Timing breakdowns.
+
+Every request sent through ``ApiClient`` or the load tools carries a fresh
+``traceparent`` header, so a slow request can be found in server logs.
+Any ``Server-Timing`` header that comes back is aggregated per operation
+(method + path template) and split into:
+
+- network: client-observed time minus the server's total
+- server total: the ``total`` metric if present, else the sum of phases
+- named phases: e.g. ``auth``, ``usage`` and ``model`` from /api/tasks/parse
+"""
+import re
+import secrets
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from harness.histogram import LatencyHistogram, format_ms
+from harness.timing import parse_server_timing
+
+ID_SEGMENT = re.compile(r"^([0-9a-fA-F-]{32,36}|\d+)$")
+
+
+def new_traceparent(sampled=True):
+    """``00-<trace-id>-<parent-id>-<flags>`` with random non-zero IDs"""
+    return f"00-{secrets.token_hex(16)}-{secrets.token_hex(8)}-{'01' if sampled else '00'}"
+
+
+def operation_name(method, url):
+    """``GET /api/participants/{id}`` - IDs collapsed so requests group per operation"""
+    segments = urlsplit(url).path.split("/")
+    path = "/".join("{id}" if ID_SEGMENT.match(s) else s for s in segments)
+    return f"{method.upper()} {path or '/'}"
+
+
+class OperationTimings:
+    def __init__(self):
+        self.client = LatencyHistogram()
+        self.network = LatencyHistogram()
+        self.server = LatencyHistogram()
+        self.phases = defaultdict(LatencyHistogram)
+        self.with_server_timing = 0
+
+
+class TimingRecorder:
+    """Thread-safe per-operation latency breakdown"""
+
+    def __init__(self):
+        self.operations = defaultdict(OperationTimings)
+        self.lock = threading.Lock()
+
+    def record(self, method, url, elapsed, server_timing_header):
+        phases = parse_server_timing(server_timing_header)
+        with self.lock:
+            timings = self.operations[operation_name(method, url)]
+            timings.client.record(elapsed)
+            if not phases:
+                return
+            timings.with_server_timing += 1
+            named = {k: v for k, v in phases.items() if k != "total"}
+            server_total = phases.get("total", sum(named.values())) / 1000.0
+            timings.server.record(server_total)
+            timings.network.record(max(0.0, elapsed - server_total))
+            for name, duration in named.items():
+                timings.phases[name].record(duration / 1000.0)
+
+    def report_lines(self):
+        """Per-operation table rows: client / network / server p50 and phase p50s"""
+        lines = []
+        with self.lock:
+            items = sorted(self.operations.items())
+        for name, timings in items:
+            line = (f"{name:<50} n={timings.client.count:<5} client p50 {format_ms(timings.client.percentile(50))}ms"
+                    f" p99 {format_ms(timings.client.percentile(99))}ms")
+            if timings.with_server_timing:
+                line += (f" | network {format_ms(timings.network.percentile(50))}ms"
+                         f" server {format_ms(timings.server.percentile(50))}ms")
+                phases = ", ".join(f"{phase} {format_ms(h.percentile(50))}ms"
+                                   for phase, h in sorted(timings.phases.items()))
+                if phases:
+                    line += f" ({phases})"
+            lines.append(line)
+        return lines
+
+    def reset(self):
+        with self.lock:
+            self.operations.clear()
+
+
+# Process-wide recorder shared by ApiClient instances and the load tools
+TIMINGS = TimingRecorder()
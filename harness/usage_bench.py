@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Usage-metering benchmark for user_usage on a local Postgres.
+
+trackAPIUsage() in src/lib/supabase/client.ts and /api/tasks/parse meter
+every call with a select by (user_id, month) followed by a separate update
+or insert. This tool replays concurrent parse traffic per user through:
+
+- ``select-then-write``: the current two-round-trip read-modify-write
+- ``atomic-upsert``: one ``INSERT ... ON CONFLICT (user_id, month) DO UPDATE
+  SET api_calls = api_calls + 1`` that returns the new totals (needs a
+  unique index on (user_id, month), created for this path only)
+
+and reports, per path, round trips and latency per metered request, the
+share of time sessions spent waiting on row locks (sampled from
+pg_stat_activity), errors, lost increments and duplicate usage rows.
+``--rtt-ms`` adds a simulated network round trip per statement, since a
+local socket hides what each extra round trip costs against Supabase.
+
+Usage:
+    python -m harness.usage_bench --users 20 --requests 200 --concurrency 16
+    python -m harness.usage_bench --users 1 --requests 500 --concurrency 32 --rtt-ms 20
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg
+
+from harness.config import PG_DSN
+from harness.histogram import LatencyHistogram, format_ms
+from harness.pg import apply_schema, connect, create_users, truncate
+
+MONTH = "2025-01"
+APPLICATION_NAME = "usage_bench"
+UNIQUE_INDEX = "user_usage_user_id_month_key"
+
+
+def select_then_write(conn, user_id, tokens, rtt):
+    """The app today: read the row, then update it with computed totals or insert it"""
+    time.sleep(rtt)
+    row = conn.execute("SELECT api_calls, tokens_used FROM user_usage WHERE user_id = %s AND month = %s",
+                       (user_id, MONTH)).fetchone()
+    time.sleep(rtt)
+    if row:
+        conn.execute("UPDATE user_usage SET api_calls = %s, tokens_used = %s WHERE user_id = %s AND month = %s",
+                     (row[0] + 1, row[1] + tokens, user_id, MONTH))
+    else:
+        conn.execute("INSERT INTO user_usage (user_id, month, api_calls, tokens_used) VALUES (%s, %s, 1, %s)",
+                     (user_id, MONTH, tokens))
+    return 2
+
+
+def atomic_upsert(conn, user_id, tokens, rtt):
+    """One statement: insert the month's row or increment it in place"""
+    time.sleep(rtt)
+    conn.execute("""
+        INSERT INTO user_usage (user_id, month, api_calls, tokens_used) VALUES (%s, %s, 1, %s)
+        ON CONFLICT (user_id, month) DO UPDATE
+        SET api_calls = user_usage.api_calls + 1, tokens_used = user_usage.tokens_used + EXCLUDED.tokens_used
+        RETURNING api_calls, tokens_used""", (user_id, MONTH, tokens)).fetchone()
+    return 1
+
+
+PATHS = {"select-then-write": select_then_write, "atomic-upsert": atomic_upsert}
+
+
+class LockSampler:
+    """Samples pg_stat_activity for bench sessions waiting on a lock"""
+
+    def __init__(self, dsn, interval=0.005):
+        self.conn = connect(dsn)
+        self.interval = interval
+        self.samples = 0
+        self.waiting = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.is_set():
+            active, waiting = self.conn.execute(
+                "SELECT count(*) FILTER (WHERE state = 'active'), count(*) FILTER (WHERE wait_event_type = 'Lock') "
+                "FROM pg_stat_activity WHERE application_name = %s", (APPLICATION_NAME,)).fetchone()
+            if active:
+                self.samples += active
+                self.waiting += waiting
+            self.stopped.wait(self.interval)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        self.conn.close()
+
+    def wait_share(self):
+        """Share of active-session samples that were blocked on a lock"""
+        return self.waiting / self.samples if self.samples else 0.0
+
+
+def replay(dsn, path, users, requests_per_user, concurrency, rtt):
+    """Run every metered request through ``path``; returns a result dict"""
+    jobs = [(user_id, random.randint(50, 800)) for user_id in users for _ in range(requests_per_user)]
+    random.shuffle(jobs)
+    local = threading.local()
+    latency, errors, round_trips = LatencyHistogram(), Counter(), Counter()
+    lock = threading.Lock()
+    connections = []
+
+    def meter(job):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = connect(dsn)
+            conn.execute("SELECT set_config('application_name', %s, false)", (APPLICATION_NAME,))
+            with lock:
+                connections.append(conn)
+        user_id, tokens = job
+        started = time.perf_counter()
+        try:
+            trips = PATHS[path](conn, user_id, tokens, rtt)
+        except psycopg.Error as e:
+            with lock:
+                errors[type(e).__name__] += 1
+            return 0
+        with lock:
+            latency.record(time.perf_counter() - started)
+            round_trips[trips] += 1
+        return tokens
+
+    started = time.perf_counter()
+    with LockSampler(dsn) as sampler, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        expected_tokens = sum(pool.map(meter, jobs))
+    elapsed = time.perf_counter() - started
+    for conn in connections:
+        conn.close()
+
+    return {
+        "requests": len(jobs),
+        "elapsed": elapsed,
+        "latency": latency,
+        "round_trips": sum(k * v for k, v in round_trips.items()) / max(1, sum(round_trips.values())),
+        "errors": errors,
+        "lock_wait_share": sampler.wait_share(),
+        "expected_calls": len(jobs) - sum(errors.values()),
+        "expected_tokens": expected_tokens,
+    }
+
+
+def tally(conn, users):
+    """(api_calls, tokens_used, rows) recorded for ``users`` this month"""
+    return conn.execute("SELECT coalesce(sum(api_calls), 0), coalesce(sum(tokens_used), 0), count(*) "
+                        "FROM user_usage WHERE user_id = ANY(%s) AND month = %s", (users, MONTH)).fetchone()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="user_usage metering: select-then-write vs atomic upsert")
+    parser.add_argument("--dsn", default=PG_DSN, help="scratch Postgres (default HARNESS_PG_DSN)")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="metered requests per user")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent connections")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated network round trip per statement")
+    parser.add_argument("--path", action="append", choices=sorted(PATHS), help="default: both")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.dsn)
+    apply_schema(conn)
+    users = create_users(conn, args.users)
+    print(f"👥 {args.users} users x {args.requests} requests, {args.concurrency} connections, "
+          f"{args.rtt_ms:g}ms simulated RTT")
+
+    for path in args.path or list(PATHS):
+        truncate(conn, "user_usage")
+        if path == "atomic-upsert":
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_INDEX} ON user_usage (user_id, month)")
+        else:
+            conn.execute(f"DROP INDEX IF EXISTS {UNIQUE_INDEX}")
+
+        result = replay(args.dsn, path, users, args.requests, args.concurrency, args.rtt_ms / 1000.0)
+        calls, tokens, rows = tally(conn, users)
+        lost_calls = result["expected_calls"] - calls
+        latency = result["latency"]
+
+        mark = "✅" if not lost_calls and rows == len(users) and not result["errors"] else "❌"
+        print(f"\n{mark} {path}")
+        print(f"   {result['requests'] / result['elapsed']:,.0f} req/s, {result['round_trips']:.1f} round trips/request, "
+              f"p50 {format_ms(latency.percentile(50))}ms p99 {format_ms(latency.percentile(99))}ms")
+        print(f"   lock wait {result['lock_wait_share']:.0%} of active session time")
+        print(f"   api_calls {calls}/{result['expected_calls']} ({lost_calls} lost), "
+              f"tokens {tokens}/{result['expected_tokens']} ({result['expected_tokens'] - tokens} lost), "
+              f"{rows} rows for {len(users)} users")
+        if result["errors"]:
+            print(f"   errors: {', '.join(f'{name} x{count}' for name, count in result['errors'].items())}")
+
+    truncate(conn, "user_usage")
+    conn.execute(f"DROP INDEX IF EXISTS {UNIQUE_INDEX}")
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+End of speech -> task saved, replayed hop by hop against local stand-ins.
+
+The voice path in the browser is: FloatingMicButton stops recording, the
+whole clip goes to POST /api/transcribe, the transcript goes to POST
+/api/tasks/parse, and createTask() saves each parsed task straight to
+Supabase (``getUser()`` then an insert into ``tasks``). This tool replays
+that chain from Python, in the same order and with the same requests, with
+synthetic audio from harness/audio.py and harness/stubs.py standing in for
+Whisper, the chat model and Supabase, and reports per hop and in total:
+
+- percentiles for ``transcribe``, ``parse``, ``save`` and ``total`` (the
+  product's latency SLO: end of speech to the last task saved)
+- each hop's share of the mean total, and the /api/tasks/parse
+  ``Server-Timing`` phases (``auth``, ``usage``, ``model``, ``usage-write``)
+- stand-in calls per flow, i.e. the round trips the chain makes
+
+Stand-in latencies model the external services, so what is left over is
+the app's own time. Each flow signs in a fresh stand-in user and sends its
+own ``X-Forwarded-For``, so the per-user and per-IP rate limits never
+trigger. Like harness.auth_bench this needs a production build pointing at
+the stand-in (``--build`` once); ``--app-url`` uses an app that is already
+running against it instead of starting ``next start``.
+
+Usage:
+    python -m harness.voice_flow --build
+    python -m harness.voice_flow --flows 50 --audio-seconds 3 --whisper-latency-ms 300 --whisper-rtf 0.05
+    python -m harness.voice_flow --openai-latency-ms 600 --rest-latency-ms 20 --slo-ms 2500 --concurrency 4
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from harness.audio import synth_wav, transcribe_body
+from harness.auth_bench import build, build_points_at, client_ip
+from harness.config import next_headers
+from harness.histogram import LatencyHistogram, format_ms
+from harness.nextserver import DEFAULT_PORT, NextServer
+from harness.stubs import ANON_KEY, StubServer, session_cookie
+from harness.stubs import DEFAULT_PORT as STUB_PORT
+from harness.timing import parse_server_timing
+
+HOPS = ("transcribe", "parse", "save")
+PARSE_PHASES = ("auth", "usage", "model", "usage-write")
+
+
+class FlowFailed(Exception):
+    """A hop answered with an error status or a body the next hop cannot use"""
+
+    def __init__(self, hop, status):
+        super().__init__(f"{hop} answered {status}")
+        self.hop = hop
+        self.status = status
+
+
+def body_field(response, hop, field):
+    """``response.json()[field]``, or FlowFailed for ``hop`` when the body is not JSON or lacks it"""
+    try:
+        return response.json()[field]
+    except (ValueError, KeyError, TypeError) as e:
+        raise FlowFailed(hop, f"{response.status_code} with a bad body ({type(e).__name__})") from e
+
+
+def task_row(task, user_id):
+    """Insert body createTask() builds for one parsed task"""
+    now = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+    row = {"title": task["title"], "user_id": user_id, "created_at": now, "updated_at": now, "status": "pending"}
+    if task.get("dueDate"):
+        row["due_date"] = task["dueDate"]
+    if task.get("assignee"):
+        row["assigned_to"] = task["assignee"]
+    if task.get("tags"):
+        row["tags"] = task["tags"]
+    row["priority"] = task.get("priority") or "medium"
+    return row
+
+
+def run_flow(session, app_url, stub, audio, n, timeout=60):
+    """One end-of-speech -> saved flow as a fresh user; returns seconds per hop and parse phases"""
+    auth = stub.sign_in()
+    cookie = session_cookie(stub.url, auth)
+    origin = {"Origin": next_headers()["Origin"], "Cookie": cookie, "X-Forwarded-For": client_ip(n)}
+    times = {}
+
+    start = time.perf_counter()
+    body, content_type = audio
+    response = session.post(f"{app_url}/api/transcribe", data=body,
+                            headers=dict(origin, **{"Content-Type": content_type}), timeout=timeout)
+    if response.status_code != 200:
+        raise FlowFailed("transcribe", response.status_code)
+    text = str(body_field(response, "transcribe", "text")).strip()
+    times["transcribe"] = time.perf_counter() - start
+
+    hop = time.perf_counter()
+    response = session.post(f"{app_url}/api/tasks/parse", json={"taskText": text, "apiKey": ""},
+                            headers=dict(origin, **{"Content-Type": "application/json"}), timeout=timeout)
+    if response.status_code != 200:
+        raise FlowFailed("parse", response.status_code)
+    tasks = body_field(response, "parse", "tasks")
+    times["parse"] = time.perf_counter() - hop
+    phases = parse_server_timing(response.headers.get("Server-Timing"))
+
+    # createTask() per parsed task, one after another, each with its own getUser()
+    hop = time.perf_counter()
+    bearer = {"apikey": ANON_KEY, "Authorization": f"Bearer {auth['access_token']}"}
+    for task in tasks:
+        response = session.get(f"{stub.url}/auth/v1/user", headers=bearer, timeout=timeout)
+        if response.status_code != 200:
+            raise FlowFailed("save", response.status_code)
+        user_id = body_field(response, "save", "id")
+        response = session.post(f"{stub.url}/rest/v1/tasks?select=*", json=task_row(task, user_id),
+                                headers=dict(bearer, Prefer="return=representation",
+                                             Accept="application/vnd.pgrst.object+json"), timeout=timeout)
+        if response.status_code != 201:
+            raise FlowFailed("save", response.status_code)
+    done = time.perf_counter()
+    times["save"] = done - hop
+    times["total"] = done - start
+    return times, phases
+
+
+class FlowStats:
+    """Per-hop histograms, parse phases and failures across flows"""
+
+    def __init__(self):
+        self.hops = {hop: LatencyHistogram() for hop in HOPS + ("total",)}
+        self.phases = {}
+        self.failures = Counter()
+        self.flows = 0
+        self.calls = Counter()
+
+    def add(self, times, phases):
+        self.flows += 1
+        for hop, seconds in times.items():
+            self.hops[hop].record(seconds)
+        for name, ms in phases.items():
+            self.phases.setdefault(name, LatencyHistogram()).record(ms / 1000.0)
+
+
+def run(app_url, stub, flows, audio_seconds=3.0, concurrency=1, warmup=2, timeout=60):
+    """Replay ``flows`` flows (after ``warmup`` unmeasured ones) and return their FlowStats"""
+    audio = transcribe_body(synth_wav(audio_seconds))
+    stats = FlowStats()
+    session = requests.Session()
+    for n in range(warmup):
+        try:
+            run_flow(session, app_url, stub, audio, n, timeout)
+        except (FlowFailed, requests.RequestException):
+            pass
+
+    def one(n):
+        try:
+            return run_flow(requests.Session() if concurrency > 1 else session, app_url, stub, audio, n, timeout)
+        except (FlowFailed, requests.RequestException) as exc:
+            return exc
+
+    before = stub.snapshot()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for result in pool.map(one, range(warmup, warmup + flows)):
+            if isinstance(result, FlowFailed):
+                stats.failures[f"{result.hop} {result.status}"] += 1
+            elif isinstance(result, Exception):
+                stats.failures[type(result).__name__] += 1
+            else:
+                stats.add(*result)
+    stats.calls = stub.snapshot() - before
+    return stats
+
+
+def print_report(stats, percentile, slo):
+    total = stats.hops["total"]
+    print(f"\n🎙️ End of speech -> task saved: {stats.flows} flows"
+          + (f", {sum(stats.failures.values())} failed" if stats.failures else ""))
+    for failure, count in stats.failures.most_common():
+        print(f"   ❌ {failure} x{count}")
+    if not total.count:
+        return
+    print(f"   {'hop':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'share':>8}")
+    for hop in HOPS + ("total",):
+        h = stats.hops[hop]
+        share = h.mean() / total.mean() * 100 if total.mean() else 0.0
+        print(f"   {hop:<14}{format_ms(h.percentile(50)):>10}{format_ms(h.percentile(95)):>10}"
+              f"{format_ms(h.percentile(99)):>10}{format_ms(h.max):>10}{share:>7.0f}%")
+    if stats.phases:
+        print("   /api/tasks/parse Server-Timing:")
+        for name in PARSE_PHASES + tuple(sorted(set(stats.phases) - set(PARSE_PHASES))):
+            if name in stats.phases:
+                h = stats.phases[name]
+                print(f"     {name:<12}{format_ms(h.percentile(50)):>10}{format_ms(h.percentile(95)):>10}"
+                      f"{format_ms(h.percentile(99)):>10}")
+    if stats.flows:
+        calls = ", ".join(f"{endpoint} {count / stats.flows:.1f}" for endpoint, count in sorted(stats.calls.items()))
+        print(f"   stand-in calls per flow: {calls}")
+    if slo:
+        observed = total.percentile(percentile)
+        mark = "✅" if observed <= slo else "❌"
+        print(f"\n{mark} total p{percentile:g} {format_ms(observed)}ms vs SLO {slo * 1000:g}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Voice-to-task latency per hop against local stand-ins")
+    parser.add_argument("--flows", type=int, default=30, help="measured flows")
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured flows first")
+    parser.add_argument("--concurrency", type=int, default=1, help="flows in flight at once")
+    parser.add_argument("--audio-seconds", type=float, default=3.0, help="length of the synthetic recording")
+    parser.add_argument("--transcript", help="text the Whisper stand-in returns")
+    parser.add_argument("--whisper-latency-ms", type=float, default=0.0, help="latency for the Whisper stand-in")
+    parser.add_argument("--whisper-rtf", type=float, default=0.0,
+                        help="extra Whisper seconds per second of audio (real-time factor)")
+    parser.add_argument("--openai-latency-ms", type=float, default=0.0, help="latency for the chat model stand-in")
+    parser.add_argument("--auth-latency-ms", type=float, default=0.0, help="latency for /auth/v1 calls")
+    parser.add_argument("--rest-latency-ms", type=float, default=0.0, help="latency for /rest/v1 calls")
+    parser.add_argument("--slo-ms", type=float, default=0.0, help="fail when the total percentile is above this")
+    parser.add_argument("--slo-percentile", type=float, default=95.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port for next start")
+    parser.add_argument("--stub-port", type=int, default=STUB_PORT, help="port for the stand-in")
+    parser.add_argument("--app-url", help="app already running against the stand-in (skips next start)")
+    parser.add_argument("--build", action="store_true", help="run npm run build against the stand-in first")
+    parser.add_argument("--log", help="append next start output to this file")
+    parser.add_argument("--json", dest="json_path", help="write per-hop percentiles to this file")
+    args = parser.parse_args(argv)
+
+    stub = StubServer(port=args.stub_port, auth_latency=args.auth_latency_ms / 1000.0,
+                      rest_latency=args.rest_latency_ms / 1000.0, openai_latency=args.openai_latency_ms / 1000.0,
+                      whisper_latency=args.whisper_latency_ms / 1000.0, whisper_rtf=args.whisper_rtf)
+    if args.transcript:
+        stub.transcript = args.transcript
+    if args.build:
+        build(stub.app_env())
+    elif not args.app_url and not build_points_at(stub.url):
+        raise SystemExit(f"❌ The production build does not point at {stub.url} - rerun with --build "
+                         f"(NEXT_PUBLIC_* is inlined at build time)")
+
+    with stub:
+        if args.app_url:
+            app_url, server = args.app_url, None
+        else:
+            server = NextServer(port=args.port, env=stub.app_env(), log_path=args.log).start()
+            app_url = server.url
+        try:
+            print(f"🧪 {app_url} against the stand-in at {stub.url}: {args.flows} flows of "
+                  f"{args.audio_seconds:g}s audio, concurrency {args.concurrency}")
+            stats = run(app_url, stub, args.flows, args.audio_seconds, args.concurrency, args.warmup, args.timeout)
+        finally:
+            if server:
+                server.stop()
+
+    slo = args.slo_ms / 1000.0
+    print_report(stats, args.slo_percentile, slo)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"flows": stats.flows, "failures": dict(stats.failures),
+                       "hops": {hop: h.summary() for hop, h in stats.hops.items()},
+                       "parse_phases": {name: h.summary() for name, h in stats.phases.items()},
+                       "calls_per_flow": {k: v / max(stats.flows, 1) for k, v in stats.calls.items()}}, f, indent=2)
+    if stats.failures or (slo and stats.hops["total"].percentile(args.slo_percentile) > slo):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,16 +10,43 @@ import threading
 import time
 import os
 import sys
+import json
+from urllib.parse import urlparse, parse_qs
 
-def run_tests():
+from harness.config import TEST_HISTORY
+from harness.results import ResultsIndex, merge
+
+RESULTS_FILE = "results.jsonl"
+VIEWER_PAGE = "results_viewer.html"
+HTML_REPORT_PAGE = "report.html"
+
+def run_tests(html_report=False, workers=1, failed_first=False):
     """Run the comprehensive test suite"""
     print("🧪 Running comprehensive API test suite...")
     print("=" * 60)
     
+    # Durations and outcomes go to the history file; it schedules shards and failed-first ordering
+    history_args = f"-p harness.history --history-db {TEST_HISTORY} --history-as-of {time.time()}"
+    if failed_first:
+        history_args += " --history-order failed-first"
+    
+    if workers > 1 and html_report:
+        print("⚠️ --html-report writes one report per process; running with a single worker")
+        workers = 1
+    if workers > 1:
+        return run_sharded(history_args, workers)
+    
+    # Compact JSONL results by default; the pytest-html report inlines everything
+    # and gets slow to open for large runs, so it is opt-in
+    if html_report:
+        report_args = "--html=report.html --self-contained-html --css=custom_report.css"
+    else:
+        report_args = f"-p harness.results --results-jsonl {RESULTS_FILE}"
+
     # Activate virtual environment and run tests
     cmd = [
         "source test_env/bin/activate && "
-        "pytest --html=report.html --self-contained-html --css=custom_report.css tests/ -v"
+        f"pytest {report_args} {history_args} tests/ -v"
     ]
     
     result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
@@ -32,10 +59,76 @@ def run_tests():
     
     return result.returncode == 0
 
-def start_web_server(port=8080):
-    """Start a simple HTTP server to serve the HTML report"""
+def run_sharded(history_args, workers):
+    """Split the suite longest-first across ``workers`` pytest processes and merge their results"""
+    parts = [f"results.{k}.jsonl" for k in range(1, workers + 1)]
+    # One log file per worker: a shared PIPE drained worker by worker would block the later
+    # workers as soon as their -v output filled the pipe, serializing the run
+    logs = [f"results.{k}.log" for k in range(1, workers + 1)]
+    processes = []
+    for k, (part, log) in enumerate(zip(parts, logs), 1):
+        cmd = ("source test_env/bin/activate && "
+               f"pytest -p harness.results --results-jsonl {part} {history_args} "
+               f"--history-shard {k}/{workers} tests/ -v")
+        with open(log, "w") as output:
+            processes.append(subprocess.Popen(cmd, shell=True, stdout=output, stderr=subprocess.STDOUT))
+    
+    success = True
+    for process in processes:
+        process.wait()
+        # 5: nothing collected, e.g. more workers than tests
+        success = success and process.returncode in (0, 5)
+    for k, log in enumerate(logs, 1):
+        print(f"📊 Test Results (worker {k}/{workers}):")
+        with open(log) as output:
+            print(output.read())
+        os.remove(log)
+    
+    rows = merge(parts, RESULTS_FILE)
+    for part in parts:
+        if os.path.exists(part):
+            os.remove(part)
+    print(f"🧾 {rows} results from {workers} workers merged into {RESULTS_FILE}")
+    return success
+
+def start_web_server(port=8080, page=VIEWER_PAGE):
+    """Start a simple HTTP server to serve the results viewer and HTML report"""
+    results_index = ResultsIndex(RESULTS_FILE)
     
     class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+        def do_GET(self):
+            # Paged/filtered/sorted rows for the results viewer
+            parsed = urlparse(self.path)
+            if parsed.path == "/api/results":
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                self.send_results(lambda: results_index.query(
+                    offset=int(query.get("offset", 0)),
+                    limit=min(int(query.get("limit", 100)), 1000),
+                    outcome=query.get("outcome") or None,
+                    search=query.get("q") or None,
+                    sort=query.get("sort", "index"),
+                    descending=query.get("desc") == "1",
+                ))
+            elif parsed.path.startswith("/api/results/"):
+                index = parsed.path.rsplit("/", 1)[1]
+                self.send_results(lambda: results_index.detail(int(index)))
+            else:
+                super().do_GET()
+        
+        def send_results(self, produce):
+            try:
+                status, data = 200, produce()
+            except FileNotFoundError:
+                status, data = 404, {"error": f"{RESULTS_FILE} not found - run the tests first"}
+            except (ValueError, IndexError):
+                status, data = 400, {"error": "invalid results query"}
+            body = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
         def end_headers(self):
             # Add CORS headers for better accessibility
             self.send_header('Access-Control-Allow-Origin', '*')
@@ -50,17 +143,17 @@ def start_web_server(port=8080):
     try:
         with socketserver.TCPServer(("", port), CustomHTTPRequestHandler) as httpd:
             print(f"🌐 Starting web server at http://localhost:{port}")
-            print(f"📋 Test report available at: http://localhost:{port}/report.html")
-            print(f"🔗 Direct link: http://localhost:{port}/report.html")
+            print(f"📋 Test report available at: http://localhost:{port}/{page}")
+            print(f"🔗 Direct link: http://localhost:{port}/{page}")
             print("=" * 60)
             print("🎯 INSTRUCTIONS:")
-            print(f"   1. Open browser and go to: http://localhost:{port}/report.html")
-            print(f"   2. Or access from network: http://{get_local_ip()}:{port}/report.html")
+            print(f"   1. Open browser and go to: http://localhost:{port}/{page}")
+            print(f"   2. Or access from network: http://{get_local_ip()}:{port}/{page}")
             print("   3. Press Ctrl+C to stop the server")
             print("=" * 60)
             
             # Auto-open browser
-            threading.Timer(2, lambda: webbrowser.open(f"http://localhost:{port}/report.html")).start()
+            threading.Timer(2, lambda: webbrowser.open(f"http://localhost:{port}/{page}")).start()
             
             httpd.serve_forever()
     except KeyboardInterrupt:
@@ -68,7 +161,7 @@ def start_web_server(port=8080):
     except OSError as e:
         if "Address already in use" in str(e):
             print(f"❌ Port {port} is already in use. Trying port {port + 1}...")
-            start_web_server(port + 1)
+            start_web_server(port + 1, page)
         else:
             print(f"❌ Error starting server: {e}")
 
@@ -88,22 +181,27 @@ def main():
     print("🔬 API Test Suite & Web Server")
     print("=" * 60)
     
-    if len(sys.argv) > 1 and sys.argv[1] == "--server-only":
+    html_report = "--html-report" in sys.argv
+    failed_first = "--failed-first" in sys.argv
+    workers = int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else 1
+    page = HTML_REPORT_PAGE if html_report else VIEWER_PAGE
+    
+    if "--server-only" in sys.argv:
         print("🌐 Starting web server only (skipping tests)...")
-        start_web_server()
+        start_web_server(page=page)
         return
     
     # Run tests first
-    success = run_tests()
+    success = run_tests(html_report, workers, failed_first)
     
     if success:
         print("✅ Tests completed successfully!")
     else:
         print("⚠️ Some tests failed, but report is still generated")
     
-    print("\n🌐 Starting web server to serve the HTML report...")
+    print("\n🌐 Starting web server to serve the test report...")
     time.sleep(2)
-    start_web_server()
+    start_web_server(page=page)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -10,7 +10,15 @@ const DEMO_MODE = !process.env.NEXT_PUBLIC_SUPABASE_URL ||
                   !process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY ||
                   process.env.NEXT_PUBLIC_SUPABASE_URL.includes('demo.supabase.co')
 
+// Server-Timing header value from named phase durations (ms) plus the request total
+function serverTiming(phases: Record<string, number>, start: number): string {
+  const entries = Object.entries({ ...phases, total: performance.now() - start })
+  return entries.map(([name, dur]) => `${name};dur=${dur.toFixed(1)}`).join(', ')
+}
+
 export async function POST(request: NextRequest) {
+  const requestStart = performance.now()
+  const phases: Record<string, number> = {}
   try {
     // Rate limiting by IP first
     const clientIP = getClientIP(request)
@@ -56,8 +64,10 @@ export async function POST(request: NextRequest) {
 
     // Skip authentication check in demo mode
     if (!DEMO_MODE) {
+      const authStart = performance.now()
       supabase = await createClient()
       const { data: { user: authUser }, error: authError } = await supabase.auth.getUser()
+      phases.auth = performance.now() - authStart
       if (authError || !authUser) {
         return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
       }
@@ -88,12 +98,14 @@ export async function POST(request: NextRequest) {
     const currentMonth = new Date().toISOString().substring(0, 7)
 
     if (!DEMO_MODE && supabase && user) {
+      const usageStart = performance.now()
       const { data: usageData } = await supabase
         .from('user_usage')
         .select('api_calls, tokens_used')
         .eq('user_id', user.id)
         .eq('month', currentMonth)
         .single()
+      phases.usage = performance.now() - usageStart
 
       usage = usageData
       currentCalls = usage?.api_calls || 0
@@ -114,6 +126,7 @@ export async function POST(request: NextRequest) {
     // Shorter prompt for faster response
     const tomorrowStr = new Date(Date.now() + 86400000).toISOString().split('T')[0];
 
+    const modelStart = performance.now()
     const completion = await openai.chat.completions.create({
       model: "gpt-4o-mini",
       messages: [
@@ -150,6 +163,8 @@ Return ONLY valid JSON array.`
       temperature: 0
     })
 
+    phases.model = performance.now() - modelStart
+
     const result = completion.choices[0].message.content
     const tokensUsed = completion.usage?.total_tokens || 0
 
@@ -157,6 +172,7 @@ Return ONLY valid JSON array.`
 
     // Track usage (skip in demo mode)
     if (!DEMO_MODE && supabase && user) {
+      const usageWriteStart = performance.now()
       if (usage) {
         await supabase
           .from('user_usage')
@@ -176,6 +192,7 @@ Return ONLY valid JSON array.`
             tokens_used: tokensUsed
           })
       }
+      phases['usage-write'] = performance.now() - usageWriteStart
     }
 
     // Parse the JSON response
@@ -204,6 +221,8 @@ Return ONLY valid JSON array.`
         remaining: ipRateLimit.remaining,
         resetTime: ipRateLimit.resetTime
       }
+    }, {
+      headers: { 'Server-Timing': serverTiming(phases, requestStart) }
     })
 
   } catch (error) {
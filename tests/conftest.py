@@ -1,7 +1,19 @@
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
 import pytest
 import requests
 import json
 
+# Make the harness package importable however pytest is invoked
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness.client import client_from_env, http_cache_from_env, resilience_from_env
+from harness.shapes import shapes_from_env
+from harness.tokens import tokens_from_env
+from harness.tracing import TIMINGS
+
 # API Configuration
 BASE_URL = "http://localhost:8082"
 API_BASE = f"{BASE_URL}/api"
@@ -18,14 +30,77 @@ def api_headers():
         "X-Provider-ID": PROVIDER_ID
     }
 
+@pytest.fixture
+def auth_headers(api_headers):
+    """api_headers plus a cached bearer token for the first HARNESS_IDENTITIES identity"""
+    tokens = tokens_from_env()
+    if tokens is None:
+        pytest.skip("Set HARNESS_IDENTITIES to run authenticated tests")
+    manager, identities = tokens
+    return dict(api_headers, **manager.auth_headers(identities[0]))
+
 @pytest.fixture
 def client():
-    """HTTP client session"""
-    session = requests.Session()
+    """HTTP client session (shared harness client, see harness/client.py)"""
+    session = client_from_env()
     return session
 
+@pytest.fixture
+def fake_server():
+    """
+    Start a local HTTP server for a request handler class: ``fake_server(Handler, **attrs)``.
+
+    ``attrs`` are set on the server before it starts (handlers read them as
+    ``self.server.<name>``), ``server.url`` is its base URL, request logging
+    is silenced, and every server is shut down after the test.
+    """
+    servers = []
+
+    def start(handler, **attrs):
+        quiet = type(handler.__name__, (handler,), {"log_message": lambda self, *args: None})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), quiet)
+        server.daemon_threads = True
+        server.url = f"http://127.0.0.1:{server.server_address[1]}"
+        for name, value in attrs.items():
+            setattr(server, name, value)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def unwrap():
+    """Response payload with the envelope recorded for its endpoint removed (see harness/shapes.py)"""
+    return shapes_from_env().unwrap
+
 @pytest.fixture
 def swagger_spec():
     """Fetch OpenAPI specification"""
     response = requests.get(f"{BASE_URL}/openapi.json")
-    return response.json()
\ No newline at end of file
+    return response.json()
+
+def pytest_terminal_summary(terminalreporter):
+    """Per-operation latency split into network, server total and Server-Timing phases"""
+    lines = TIMINGS.report_lines()
+    if lines:
+        terminalreporter.section("latency breakdown")
+        for line in lines:
+            terminalreporter.write_line(line)
+    tokens = tokens_from_env()
+    if tokens is not None and tokens[0].report_lines():
+        terminalreporter.section("auth tokens")
+        for line in tokens[0].report_lines():
+            terminalreporter.write_line(line)
+    resilience = resilience_from_env()
+    if resilience is not None and resilience.report_lines():
+        terminalreporter.section("retries and hedging")
+        for line in resilience.report_lines():
+            terminalreporter.write_line(line)
+    cache = http_cache_from_env()
+    if cache is not None and any(cache.stats.values()):
+        terminalreporter.section("http cache")
+        terminalreporter.write_line(", ".join(f"{name} {value}" for name, value in cache.stats.items()))
\ No newline at end of file
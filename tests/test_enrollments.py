@@ -2,11 +2,12 @@ import pytest
 import json
 from datetime import datetime
 from conftest import API_BASE
+from harness.jsonstream import iter_items
 
 class TestEnrollments:
     """Test suite for /api/enrollments endpoints"""
     
-    def test_create_enrollment(self, client, api_headers):
+    def test_create_enrollment(self, client, api_headers, unwrap):
         """POST /api/enrollments - Create new enrollment"""
         import pytest
         pytest.skip("Enrollment creation has server errors - skipping enrollment tests")
@@ -52,27 +53,21 @@ class TestEnrollments:
                              json=enrollment_data)
         
         assert response.status_code in [200, 201]
-        response_data = response.json()
-        
-        # Handle both wrapped and direct response formats
-        if "success" in response_data:
-            assert response_data["success"] == True
-            data = response_data["data"]
-        else:
-            data = response_data
+        # Envelope recorded in response_shapes.json (python -m harness.shapes)
+        data = unwrap(response)
         assert data["participant_id"] == participant_id
         assert data["activity_id"] == activity_id
         assert "id" in data
     
     def test_list_enrollments(self, client, api_headers):
         """GET /api/enrollments - List all enrollments"""
-        response = client.get(f"{API_BASE}/enrollments", headers=api_headers)
+        response = client.get(f"{API_BASE}/enrollments", headers=api_headers, stream=True)
         
         assert response.status_code == 200
-        data = response.json()
-        assert isinstance(data, list)
+        for item in iter_items(response):
+            assert "id" in item
     
-    def test_get_enrollment_by_id(self, client, api_headers):
+    def test_get_enrollment_by_id(self, client, api_headers, unwrap):
         """GET /api/enrollments/{id} - Get specific enrollment"""
         import pytest
         pytest.skip("Enrollment creation has server errors - skipping enrollment tests")
@@ -112,23 +107,18 @@ class TestEnrollments:
         create_response = client.post(f"{API_BASE}/enrollments", 
                                     headers=api_headers, 
                                     json=enrollment_data)
-        create_data = create_response.json()
-        enrollment_id = create_data["data"]["id"] if "data" in create_data else create_data["id"]
+        enrollment_id = unwrap(create_response)["id"]
         
         # Get the enrollment
         response = client.get(f"{API_BASE}/enrollments/{enrollment_id}", headers=api_headers)
         
         assert response.status_code == 200
-        response_data = response.json()
-
-        assert response_data["success"] == True
-
-        data = response_data["data"]
+        data = unwrap(response)
         assert data["id"] == enrollment_id
         assert data["participant_id"] == participant_id
         assert data["activity_id"] == activity_id
     
-    def test_update_enrollment(self, client, api_headers):
+    def test_update_enrollment(self, client, api_headers, unwrap):
         """PUT /api/enrollments/{id} - Update enrollment"""
         import pytest
         pytest.skip("Enrollment creation has server errors - skipping enrollment tests")
@@ -169,8 +159,7 @@ class TestEnrollments:
         create_response = client.post(f"{API_BASE}/enrollments", 
                                     headers=api_headers, 
                                     json=enrollment_data)
-        create_data = create_response.json()
-        enrollment_id = create_data["data"]["id"] if "data" in create_data else create_data["id"]
+        enrollment_id = unwrap(create_response)["id"]
         
         # Update the enrollment
         update_data = enrollment_data.copy()
@@ -190,7 +179,7 @@ class TestEnrollments:
         assert data["status"] == "completed"
         assert data["completion_percentage"] == 100
     
-    def test_delete_enrollment(self, client, api_headers):
+    def test_delete_enrollment(self, client, api_headers, unwrap):
         """DELETE /api/enrollments/{id} - Delete enrollment"""
         import pytest
         pytest.skip("Enrollment creation has server errors - skipping enrollment tests")
@@ -230,8 +219,7 @@ class TestEnrollments:
         create_response = client.post(f"{API_BASE}/enrollments", 
                                     headers=api_headers, 
                                     json=enrollment_data)
-        create_data = create_response.json()
-        enrollment_id = create_data["data"]["id"] if "data" in create_data else create_data["id"]
+        enrollment_id = unwrap(create_response)["id"]
         
         # Delete the enrollment
         response = client.delete(f"{API_BASE}/enrollments/{enrollment_id}", headers=api_headers)
@@ -0,0 +1,99 @@
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from harness.cache import HttpCache
+from harness.client import ApiClient
+
+class CachingHandler(BaseHTTPRequestHandler):
+    """GET answers with ``server.headers`` and honours If-None-Match; POST just succeeds"""
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if "ETag" in self.server.headers and self.headers.get("If-None-Match") == self.server.headers["ETag"]:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = f'{{"n": {len(self.server.requests)}}}'.encode()
+        self.send_response(200)
+        for name, value in self.server.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+@pytest.fixture
+def cached(fake_server):
+    """``cached(**response_headers)`` -> (server, ApiClient with a fresh HttpCache)"""
+    def start(**headers):
+        server = fake_server(CachingHandler, requests=[], headers={k.replace("_", "-"): v for k, v in headers.items()})
+        return server, ApiClient(cache=HttpCache(), timings=None)
+    return start
+
+class TestHttpCache:
+    """Test suite for the opt-in HTTP cache on the shared client"""
+
+    def test_fresh_entries_are_served_locally(self, cached):
+        """Within max-age the second GET never reaches the server"""
+        server, client = cached(Cache_Control="max-age=60")
+        first = client.get(f"{server.url}/api/public/activities")
+        second = client.get(f"{server.url}/api/public/activities")
+        assert len(server.requests) == 1
+        assert second.json() == first.json()
+        assert getattr(second, "from_cache", False)
+        assert client.cache.stats["hits"] == 1
+
+    def test_stale_entries_revalidate_with_304(self, cached):
+        """Without max-age an ETag entry is revalidated and the stored body reused"""
+        server, client = cached(ETag='"v1"')
+        first = client.get(f"{server.url}/api/public/activities")
+        second = client.get(f"{server.url}/api/public/activities")
+        assert len(server.requests) == 2
+        assert server.requests[1]["If-None-Match"] == '"v1"'
+        assert second.json() == first.json()
+        assert client.cache.stats["revalidated"] == 1
+
+    def test_vary_mismatch_is_a_miss(self, cached):
+        """A different value for a Vary header fetches a new response"""
+        server, client = cached(Cache_Control="max-age=60", Vary="Accept-Language")
+        client.get(f"{server.url}/api/public/activities", headers={"Accept-Language": "en"})
+        client.get(f"{server.url}/api/public/activities", headers={"Accept-Language": "he"})
+        client.get(f"{server.url}/api/public/activities", headers={"Accept-Language": "he"})
+        assert len(server.requests) == 2
+
+    def test_unsafe_request_invalidates(self, cached):
+        """A successful POST drops the cached GET for that URL for every caller"""
+        server, client = cached(Cache_Control="max-age=60")
+        url = f"{server.url}/api/public/activities"
+        client.get(url, headers={"X-Provider-ID": "a"})
+        client.get(url, headers={"X-Provider-ID": "b"})
+        client.post(url, json={})
+        client.get(url, headers={"X-Provider-ID": "a"})
+        client.get(url, headers={"X-Provider-ID": "b"})
+        assert len(server.requests) == 4
+
+    def test_callers_do_not_share_entries(self, cached):
+        """Entries are keyed by X-Provider-ID, so one provider never sees another's response"""
+        server, client = cached(Cache_Control="max-age=60")
+        a = client.get(f"{server.url}/api/activities", headers={"X-Provider-ID": "a"})
+        b = client.get(f"{server.url}/api/activities", headers={"X-Provider-ID": "b"})
+        assert len(server.requests) == 2
+        assert a.json() != b.json()
+
+    @pytest.mark.parametrize("cache_control, headers, stored", [
+        ("max-age=60", {"Authorization": "Bearer t"}, False),
+        ("public, max-age=60", {"Authorization": "Bearer t"}, True),
+        ("private, max-age=60", {}, False),
+        ("no-store", {}, False),
+    ])
+    def test_what_is_stored(self, cached, cache_control, headers, stored):
+        """Authorization responses need public; private and no-store are never kept"""
+        server, client = cached(Cache_Control=cache_control)
+        client.get(f"{server.url}/api/activities", headers=headers)
+        client.get(f"{server.url}/api/activities", headers=headers)
+        assert len(server.requests) == (1 if stored else 2)
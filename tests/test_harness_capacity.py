@@ -0,0 +1,67 @@
+import math
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from harness.capacity import fit_usl, model, peak_concurrency, run_point, slo_concurrency, usl
+
+LEVELS = (1, 2, 4, 8, 16, 32, 64)
+
+def sweep(lam, sigma, kappa, noise=0.0):
+    return [(n, usl(n, lam, sigma, kappa) * (1 + noise * (-1) ** n)) for n in LEVELS]
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Answers every GET after ``server.delay`` seconds"""
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+class TestCapacity:
+    """Test suite for the Universal Scalability Law fit behind the capacity table"""
+
+    def test_fit_recovers_coefficients(self):
+        """Exact USL points give back lambda, sigma and kappa"""
+        lam, sigma, kappa, r2 = fit_usl(sweep(50.0, 0.05, 0.002))
+        assert lam == pytest.approx(50.0, rel=1e-4)
+        assert sigma == pytest.approx(0.05, rel=1e-3)
+        assert kappa == pytest.approx(0.002, rel=1e-3)
+        assert r2 == pytest.approx(1.0)
+
+    def test_noisy_linear_scaling_clamps_to_zero(self):
+        """Coefficients never go negative, even when noise makes the curve look superlinear"""
+        lam, sigma, kappa, r2 = fit_usl(sweep(20.0, 0.0, 0.0, noise=0.02))
+        assert sigma >= 0 and kappa >= 0
+        assert lam == pytest.approx(20.0, rel=0.05)
+        assert peak_concurrency(sigma, 0.0) == math.inf
+
+    def test_limit_is_lower_of_peak_and_slo(self):
+        """The SLO concurrency follows Little's law and caps the suggested limit"""
+        lam, sigma, kappa = 50.0, 0.05, 0.002
+        n_peak = peak_concurrency(sigma, kappa)
+        assert n_peak == pytest.approx(math.sqrt(0.95 / 0.002))
+        n_slo = slo_concurrency(lam, sigma, kappa, slo=0.2)
+        assert n_slo / usl(n_slo, lam, sigma, kappa) == pytest.approx(0.2)
+        points = [{"concurrency": n, "throughput": x, "mean": n / x, "tail": 2 * n / x}
+                  for n, x in sweep(lam, sigma, kappa)]
+        fit = model(points, slo=0.1, percentile=95)
+        assert fit["tail_ratio"] == pytest.approx(2.0)
+        assert fit["limit"] == math.floor(slo_concurrency(lam, sigma, kappa, 0.1, tail_ratio=2.0))
+        assert fit["limit"] < n_peak
+
+    def test_point_counts_completions_in_the_window(self, fake_server):
+        """Requests sent during warmup that finish inside the window count; latency is still per request"""
+        server = fake_server(SlowHandler, delay=0.2)
+        operation = {"name": "slow", "method": "GET", "url": f"{server.url}/slow", "headers": {}}
+        point = run_point(operation, concurrency=2, duration=1.0, warmup=0.1, timeout=5)
+        # 2 clients x 1s / 0.2s each; counting by send time would miss the first in-flight pair
+        assert point.latency.count >= 9
+        assert point.latency.percentile(50) == pytest.approx(0.2, abs=0.1)
+        assert point.errors == 0
+
+    def test_crashed_client_raises(self):
+        """A client that dies on a non-HTTP error fails the point instead of thinning it"""
+        with pytest.raises(KeyError):
+            run_point({"name": "broken"}, concurrency=2, duration=0.2, warmup=0.0)
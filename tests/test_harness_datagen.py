@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from harness.datagen import ENTITIES, Plan, main
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+class TestDatagen:
+    """Test suite for the vectorized fixture generator used to seed scale tests"""
+
+    def test_same_seed_writes_identical_files(self, tmp_path):
+        """Output depends only on --seed and --chunk, not on the worker count"""
+        main(["--rows", "20000", "--chunk", "3000", "--workers", "1", "--out", str(tmp_path / "a")])
+        main(["--rows", "20000", "--chunk", "3000", "--workers", "2", "--out", str(tmp_path / "b")])
+        main(["--rows", "20000", "--chunk", "3000", "--workers", "1", "--seed", "1", "--out", str(tmp_path / "c")])
+        for entity in ENTITIES:
+            for fmt in ("copy", "jsonl"):
+                name = f"{entity}.{fmt}"
+                assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+        assert (tmp_path / "a" / "tasks.jsonl").read_bytes() != (tmp_path / "c" / "tasks.jsonl").read_bytes()
+
+    def test_references_point_at_generated_parents(self, tmp_path):
+        """Every foreign key exists, and enrollments stay inside one provider"""
+        main(["--rows", "30000", "--chunk", "4000", "--workers", "1", "--format", "jsonl", "--out", str(tmp_path)])
+        rows = {entity: read_jsonl(tmp_path / f"{entity}.jsonl") for entity in ENTITIES}
+        by_id = {entity: {row["id"]: row for row in rows[entity]} for entity in ENTITIES if entity != "monitoring_data"}
+
+        for entity in ("activities", "participants", "leads"):
+            assert {row["provider_id"] for row in rows[entity]} <= by_id["providers"].keys()
+        for row in rows["enrollments"]:
+            participant, activity = by_id["participants"][row["participant_id"]], by_id["activities"][row["activity_id"]]
+            assert participant["provider_id"] == activity["provider_id"]
+        activity_names = {row["name"] for row in rows["activities"]}
+        assert {row["activity_of_interest"] for row in rows["leads"]} <= activity_names
+        assert {row["user_id"] for row in rows["tasks"]} <= by_id["users"].keys()
+        for row in rows["monitoring_data"]:
+            person = by_id["monitored_person"][row["monitored_person_id"]]
+            assert (person["organization_id"], person["device_id"]) == (row["organization_id"], row["device_id"])
+        # telemetry_bench imports psycopg; only this column check needs it
+        telemetry_bench = pytest.importorskip("harness.telemetry_bench")
+        assert tuple(rows["monitoring_data"][0]) == telemetry_bench.COLUMNS
+
+    def test_tenant_sizes_are_skewed(self):
+        """The biggest provider dwarfs the median one, and every provider has rows"""
+        plan = Plan(1_000_000, providers=100, skew=1.1)
+        sizes = np.diff(np.append(plan.starts["participants"], plan.counts["participants"]))
+        assert sizes.min() >= 1
+        assert sizes[0] > 20 * np.median(sizes)
@@ -0,0 +1,44 @@
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from harness.distributed import AgentServer, RemoteAgent, coordinate
+
+class OkHandler(BaseHTTPRequestHandler):
+    """Answers every GET with an empty JSON list"""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"[]")
+
+@pytest.fixture
+def agent():
+    """Load agent on a free loopback port with token "s3cret"; yields its host:port"""
+    server = AgentServer(("127.0.0.1", 0), "s3cret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+class TestDistributed:
+    """Test suite for the coordinator <-> agent protocol of the distributed load generator"""
+
+    def test_round_trip_on_loopback(self, agent, fake_server):
+        """A coordinator with the right token gets the agent's slot back and merges it"""
+        target = fake_server(OkHandler)
+        operation = {"name": "health", "method": "GET", "url": f"{target.url}/api/health", "headers": {}}
+        job, merged, workers = coordinate(operation, rate=20, duration=1, processes=1, hosts=[agent],
+                                          concurrency=2, timeout=5, token="s3cret")
+        assert sorted(w["slot"] for w in workers) == [0, 1]
+        assert [w.get("agent") for w in workers if w["slot"] == 1] == [agent]
+        assert merged.errors == 0
+        assert merged.completed == pytest.approx(20, abs=2)
+
+    @pytest.mark.parametrize("token", ["wrong", ""])
+    def test_wrong_token_is_rejected(self, agent, token):
+        """Every message is checked, so not even the clock handshake succeeds without the token"""
+        with pytest.raises(ConnectionError, match="HARNESS_AGENT_TOKEN"):
+            RemoteAgent(agent, token)
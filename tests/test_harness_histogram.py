@@ -0,0 +1,49 @@
+import pytest
+from harness.histogram import LatencyHistogram
+
+class TestLatencyHistogram:
+    """Test suite for the mergeable latency histogram used by the load tools"""
+
+    def test_percentiles_within_precision(self):
+        """Percentiles stay within the configured relative error"""
+        histogram = LatencyHistogram(precision=0.01)
+        for i in range(1, 1001):
+            histogram.record(i / 1000.0)
+
+        assert histogram.count == 1000
+        assert histogram.percentile(50) == pytest.approx(0.5, rel=0.01)
+        assert histogram.percentile(99) == pytest.approx(0.99, rel=0.01)
+        assert histogram.percentile(100) == 1.0
+
+    def test_merge_matches_single_histogram(self):
+        """Merging per-worker histograms equals recording everything in one"""
+        combined = LatencyHistogram()
+        parts = [LatencyHistogram() for _ in range(3)]
+        for i in range(300):
+            value = (i % 97 + 1) / 100.0
+            combined.record(value)
+            parts[i % 3].record(value)
+
+        merged = LatencyHistogram()
+        for part in parts:
+            merged.merge(part)
+
+        assert merged.count == combined.count
+        assert merged.max == combined.max
+        for q in (50, 90, 99):
+            assert merged.percentile(q) == combined.percentile(q)
+
+    def test_round_trip_serialisation(self):
+        """Histograms survive the JSON form shipped between workers"""
+        histogram = LatencyHistogram()
+        for value in (0.002, 0.015, 0.3):
+            histogram.record(value)
+
+        restored = LatencyHistogram.from_dict(histogram.to_dict())
+
+        assert restored.counts == histogram.counts
+        assert restored.percentile(50) == histogram.percentile(50)
+
+    def test_empty_histogram(self):
+        """An empty histogram reports no percentiles"""
+        assert LatencyHistogram().percentile(99) is None
@@ -0,0 +1,61 @@
+import pytest
+from harness.history import TestHistory, failed_first, lpt_schedule, parse_shard
+
+class Item:
+    def __init__(self, nodeid):
+        self.nodeid = nodeid
+
+@pytest.fixture
+def history(tmp_path):
+    history = TestHistory(str(tmp_path / "history.sqlite"), as_of=float("inf"))
+    yield history
+    history.close()
+
+class TestDurationHistory:
+    """Test suite for the per-test duration history behind sharded and failed-first runs"""
+
+    def test_longest_first_beats_collection_order(self):
+        """One slow test placed last still lands on an otherwise idle worker"""
+        estimates = {f"t{n}": 1.0 for n in range(8)}
+        estimates["t8"] = 4.0
+        bins = lpt_schedule(estimates, 3)
+        assert sorted(test for _, tests in bins for test in tests) == sorted(estimates)
+        assert max(load for load, _ in bins) == 4.0
+        assert parse_shard("2/3") == (2, 3)
+        with pytest.raises(ValueError):
+            parse_shard("4/3")
+
+    def test_estimates_use_recent_passes_and_fall_back_to_median(self, history):
+        """Failed runs do not count towards durations; unknown tests get the median"""
+        for seconds in (1.0, 1.2, 1.1):
+            history.record([("a", "passed", seconds), ("b", "passed", 3.0), ("c", "passed", 0.1)], started=0)
+        history.record([("a", "failed", 60.0)], started=0)
+        estimates = history.estimates(["a", "b", "c", "new"])
+        assert estimates == {"a": 1.1, "b": 3.0, "c": 0.1, "new": 1.1}
+
+    def test_failed_first_orders_by_latest_outcome(self, history):
+        """Tests whose latest run failed move to the front, quickest first"""
+        history.record([("a", "failed", 0.5), ("b", "passed", 0.1), ("c", "error", 0.2)], started=0)
+        history.record([("a", "failed", 0.5), ("b", "failed", 0.1), ("c", "passed", 0.2)], started=0)
+        history.record([("a", "skipped", 0.0)], started=0)
+        items = [Item(n) for n in ("c", "d", "a", "b")]
+        assert [item.nodeid for item in failed_first(items, history.last_failed())] == ["b", "a", "c", "d"]
+
+    def test_flags_upward_drift_only(self, history):
+        """A test that got consistently slower is flagged; noise and speed-ups are not"""
+        for run in range(20):
+            slow = run >= 15
+            history.record([("drifting", "passed", 0.5 if slow else 0.2),
+                            ("noisy", "passed", 0.2 + 0.01 * (run % 3)),
+                            ("faster", "passed", 0.1 if slow else 0.5)], started=0)
+        assert [row[0] for row in history.drifting()] == ["drifting"]
+
+    def test_as_of_hides_runs_finished_later(self, tmp_path):
+        """Shards of one run schedule from the same snapshot even if another shard already recorded"""
+        path = str(tmp_path / "history.sqlite")
+        writer = TestHistory(path)
+        writer.record([("a", "passed", 5.0)], started=0)
+        reader = TestHistory(path, as_of=0.0)
+        assert reader.durations() == {}
+        writer.close()
+        reader.close()
@@ -0,0 +1,53 @@
+import json
+import pytest
+from harness.jsonstream import ArrayParser
+
+def parse_in_chunks(text, size, key=None):
+    parser = ArrayParser(key)
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    items.extend(parser.close())
+    return items, parser
+
+class TestArrayParser:
+    """Test suite for the incremental JSON array parser used on large list responses"""
+
+    ITEMS = [{"id": i, "name": f"Item \"{i}\" ü", "tags": ["a", {"b": [1, 2]}]} for i in range(50)] + [7, 3.5, None, "x"]
+
+    @pytest.mark.parametrize("size", [1, 3, 64, 100000])
+    def test_matches_json_loads_at_any_chunk_size(self, size):
+        """Items come out identical to json.loads however the body is split"""
+        items, _ = parse_in_chunks(json.dumps(self.ITEMS, indent=1), size)
+        assert items == self.ITEMS
+
+    def test_items_available_before_end(self):
+        """Complete items are returned before the closing bracket arrives"""
+        parser = ArrayParser()
+        assert parser.feed('[{"id": 1}, {"id": 2}, {"id"') == [{"id": 1}, {"id": 2}]
+        assert parser.feed(': 3}]') == [{"id": 3}]
+        assert parser.close() == []
+
+    def test_buffer_stays_bounded(self):
+        """Memory is one chunk plus one item, not the whole document"""
+        text = json.dumps([{"id": i, "padding": "x" * 100} for i in range(2000)])
+        items, parser = parse_in_chunks(text, 256)
+        assert len(items) == 2000
+        assert parser.peak_buffer < 1024
+
+    def test_envelope_key(self):
+        """The array can sit inside a {"success", "data"} envelope"""
+        text = json.dumps({"success": True, "meta": {"n": [1]}, "data": self.ITEMS, "total": 54})
+        items, _ = parse_in_chunks(text, 7, key="data")
+        assert items == self.ITEMS
+
+    @pytest.mark.parametrize("text", ['[{"id": 1}', '[{"id": 1} {"id": 2}]', '{"id": 1}', '[1] 2'])
+    def test_malformed_documents(self, text):
+        """Truncated or malformed bodies raise instead of returning a partial list"""
+        with pytest.raises(ValueError):
+            parse_in_chunks(text, 4)
+
+    def test_missing_envelope_key(self):
+        """An envelope without the array is an error"""
+        with pytest.raises(ValueError):
+            parse_in_chunks('{"success": false}', 4, key="data")
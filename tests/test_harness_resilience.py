@@ -0,0 +1,96 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+from harness.resilience import CircuitOpenError, Resilience
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers ``server.status`` after ``server.delays[n]`` seconds for the n-th request (0 once they run out)"""
+
+    def answer(self):
+        with self.server.lock:
+            n = self.server.hits
+            self.server.hits += 1
+        time.sleep(self.server.delays[n] if n < len(self.server.delays) else 0)
+        self.send_response(self.server.status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_POST = answer
+
+@pytest.fixture
+def scripted(fake_server):
+    """``scripted(status, delays=())`` -> a server answering ``status``; ``server.hits`` counts requests"""
+    def start(status, delays=()):
+        return fake_server(ScriptedHandler, status=status, delays=list(delays), hits=0, lock=threading.Lock())
+    return start
+
+class CountingSession(requests.Session):
+    """Session that counts the requests sent through it"""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = 0
+
+    def request(self, method, url, **kwargs):
+        self.sent += 1
+        return super().request(method, url, **kwargs)
+
+class TestResilience:
+    """Test suite for retries, the retry budget, the circuit breaker and hedging"""
+
+    def test_only_idempotent_methods_are_retried(self, scripted):
+        """A 503 GET is retried up to ``retries`` times, a 503 POST is sent once"""
+        server = scripted(503)
+        resilience = Resilience(retries=2, backoff=0, breaker_threshold=100)
+        session = requests.Session()
+        assert resilience.send(session.request, "POST", f"{server.url}/api/activities").status_code == 503
+        assert server.hits == 1
+        assert resilience.send(session.request, "GET", f"{server.url}/api/activities").status_code == 503
+        assert server.hits == 1 + 3
+
+    def test_retry_budget_runs_out(self, scripted):
+        """With no deposits the reserve of 10 retries is spent once, then the request gives up"""
+        server = scripted(503)
+        resilience = Resilience(retries=100, backoff=0, budget_ratio=0, breaker_threshold=1000)
+        resilience.send(requests.Session().request, "GET", f"{server.url}/api/activities")
+        assert server.hits == 1 + 10
+        stats = resilience._state("GET /api/activities").stats
+        assert stats["retries"] == 10 and stats["budget_exhausted"] == 1
+
+    def test_breaker_opens_then_half_opens(self, scripted):
+        """Consecutive failures open the breaker; after the reset one probe goes through and closes it"""
+        server = scripted(500)
+        resilience = Resilience(retries=0, breaker_threshold=2, breaker_reset=0.2)
+        session = requests.Session()
+        url = f"{server.url}/api/activities"
+        for _ in range(2):
+            resilience.send(session.request, "GET", url)
+        with pytest.raises(CircuitOpenError):
+            resilience.send(session.request, "GET", url)
+        assert server.hits == 2
+
+        time.sleep(0.25)
+        server.status = 200
+        assert resilience.send(session.request, "GET", url).status_code == 200
+        breaker = resilience._state("GET /api/activities").breaker
+        assert (breaker.state, breaker.opens, server.hits) == ("closed", 1, 3)
+
+    def test_hedge_fires_after_observed_quantile(self, scripted):
+        """A GET slower than the operation's p95 gets a duplicate on the hedge thread's own session"""
+        server = scripted(200, delays=[0.01] * 5 + [1.0])
+        resilience = Resilience(retries=0, hedge=True, hedge_min_samples=5)
+        session = CountingSession()
+        url = f"{server.url}/api/activities"
+        for _ in range(5):
+            resilience.send(session.request, "GET", url)
+
+        started = time.perf_counter()
+        assert resilience.send(session.request, "GET", url).status_code == 200
+        assert time.perf_counter() - started < 0.5
+        stats = resilience._state("GET /api/activities").stats
+        assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+        # The primary used the caller's session, the hedge did not
+        assert (session.sent, server.hits) == (6, 7)
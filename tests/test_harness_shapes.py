@@ -0,0 +1,113 @@
+import json
+import re
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+from harness.shapes import Prober, ShapeMap
+
+ACTIVITY = {"id": "a1", "name": "Pottery", "capacity": 10}
+PARTICIPANT = {"id": "p1", "first_name": "Noa"}
+
+SPEC = {
+    "paths": {
+        "/api/activities": {"get": {}, "post": {"requestBody": {"content": {"application/json": {"schema": {
+            "$ref": "#/components/schemas/ActivityCreate"}}}}}},
+        "/api/activities/{activity_id}": {"get": {}, "delete": {}},
+        "/api/participants": {"get": {}},
+        "/api/participants/{participant_id}": {"put": {}},
+        "/api/enrollments/activity/{activity_id}": {"get": {}},
+        "/api/enrollments/status/{status}": {"get": {"parameters": [
+            {"name": "status", "in": "path", "schema": {"type": "string", "enum": ["enrolled", "completed"]}}]}},
+    },
+    "components": {"schemas": {"ActivityCreate": {"type": "object", "required": ["name", "capacity"], "properties": {
+        "name": {"type": "string"}, "capacity": {"type": "integer", "minimum": 1}, "notes": {"type": "string"}}}}},
+}
+
+# (method, path regex) -> (status, body); mixes direct and {"success", "data"} envelopes like the real API
+ROUTES = {
+    ("GET", r"/api/activities"): (200, [ACTIVITY]),
+    ("POST", r"/api/activities"): (201, {"success": True, "data": ACTIVITY}),
+    ("GET", r"/api/activities/a1"): (200, ACTIVITY),
+    ("DELETE", r"/api/activities/a1"): (204, None),
+    ("GET", r"/api/participants"): (200, {"success": True, "data": [PARTICIPANT]}),
+    ("GET", r"/api/enrollments/activity/a1"): (200, {"success": True, "data": []}),
+    ("GET", r"/api/enrollments/status/enrolled"): (200, []),
+}
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    """Answers ROUTES and records what was requested"""
+
+    def handle_any(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        self.server.requests.append((self.command, self.path, body))
+        if self.path == "/api/broken":
+            return  # close the connection without answering
+        for (method, pattern), (status, payload) in ROUTES.items():
+            if method == self.command and re.fullmatch(pattern, self.path):
+                break
+        else:
+            status, payload = 404, {"detail": "Not Found"}
+        data = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = handle_any
+
+@pytest.fixture
+def api(fake_server):
+    return fake_server(FakeApiHandler, requests=[])
+
+class TestShapes:
+    """Test suite for the whole-spec envelope probe and its runtime unwrap"""
+
+    def test_read_only_probe_records_envelopes_per_operation(self, api):
+        """GETs are probed, path parameters filled from list results, writes left alone"""
+        prober = Prober(SPEC, base_url=api.url, concurrency=4)
+        shapes = prober.run()
+        assert shapes["GET /api/activities"]["envelope"] == "direct"
+        assert shapes["GET /api/participants"]["envelope"] == "wrapped"
+        assert shapes["GET /api/participants"]["keys"] == ["first_name", "id"]
+        assert shapes["GET /api/activities/{id}"] == {"status": 200, "envelope": "direct", "kind": "object",
+                                                      "keys": ["capacity", "id", "name"]}
+        assert shapes["GET /api/enrollments/activity/{id}"]["kind"] == "list"
+        assert shapes["GET /api/enrollments/status/{id}"]["envelope"] == "direct"
+        assert "POST /api/activities" in prober.skipped
+        assert all(method == "GET" for method, _, _ in api.requests)
+
+    def test_failed_request_is_skipped(self, api):
+        """A connection error on one operation is recorded as skipped and the rest are still probed"""
+        spec = {"paths": dict(SPEC["paths"], **{"/api/broken": {"get": {}}})}
+        prober = Prober(spec, base_url=api.url, concurrency=4)
+        shapes = prober.run()
+        assert prober.skipped["GET /api/broken"] == "request failed: ConnectionError"
+        assert shapes["GET /api/activities"]["envelope"] == "direct"
+
+    def test_write_probe_builds_bodies_and_cleans_up(self, api):
+        """POST bodies come from the request schema, only created records are written to, then deleted"""
+        prober = Prober(SPEC, base_url=api.url, concurrency=4, writes=True)
+        shapes = prober.run()
+        assert shapes["POST /api/activities"]["envelope"] == "wrapped"
+        assert shapes["DELETE /api/activities/{id}"]["envelope"] == "empty"
+        post = next(body for method, _, body in api.requests if method == "POST")
+        assert set(post) == {"name", "capacity"}
+        assert ("DELETE", "/api/activities/a1", None) in api.requests
+        # participants has no POST, so the participant the GET found is never written to
+        assert prober.skipped["PUT /api/participants/{id}"] == "no record created by this run"
+        assert not any(method == "PUT" for method, _, _ in api.requests)
+
+    def test_unwrap_follows_map_and_flags_changed_envelopes(self, api):
+        """unwrap() strips the recorded envelope and fails when an endpoint changed it"""
+        url = api.url
+        shapes = ShapeMap(Prober(SPEC, base_url=url, concurrency=4, writes=True).run())
+        assert shapes.unwrap(requests.get(f"{url}/api/activities/a1")) == ACTIVITY
+        assert shapes.unwrap(requests.get(f"{url}/api/participants")) == [PARTICIPANT]
+        assert shapes.unwrap(requests.post(f"{url}/api/activities", json={})) == ACTIVITY
+
+        shapes.operations["GET /api/participants"]["envelope"] = "direct"
+        with pytest.raises(AssertionError, match="re-run python -m harness.shapes"):
+            shapes.unwrap(requests.get(f"{url}/api/participants"))
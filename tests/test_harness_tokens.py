@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from harness.tokens import TokenManager, TokenStore
+
+IDENTITY = {"email": "bench@example.com", "password": "secret"}
+
+class FakeAuthHandler(BaseHTTPRequestHandler):
+    """/api/auth/login and /refresh issuing numbered tokens with a short lifetime"""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.calls[self.path] += 1
+            server.issued += 1
+            issued = server.issued
+        time.sleep(0.05)  # slow enough for concurrent callers to pile up
+        if self.path == "/api/auth/refresh" and body.get("refresh_token") in server.revoked:
+            payload, status = {"error": "invalid refresh token"}, 401
+        else:
+            payload, status = {"data": {"access_token": f"access-{issued}", "refresh_token": f"refresh-{issued}",
+                                        "expires_in": server.ttl}}, 200
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+@pytest.fixture
+def auth_server(fake_server):
+    return fake_server(FakeAuthHandler, lock=threading.Lock(), issued=0, ttl=3600, revoked=set(),
+                       calls={"/api/auth/login": 0, "/api/auth/refresh": 0, "/api/auth/logout": 0})
+
+@pytest.fixture
+def store(tmp_path):
+    return TokenStore(str(tmp_path / "tokens.json"))
+
+def manager_for(server, store, **kwargs):
+    return TokenManager(server.url, store, headers={}, **kwargs)
+
+class TestTokenManager:
+    """Test suite for the shared login/refresh cache used by authenticated load runs"""
+
+    def test_concurrent_virtual_users_share_one_login(self, auth_server, store):
+        """Hundreds of simultaneous callers cause a single login"""
+        with manager_for(auth_server, store, background=False) as manager:
+            with ThreadPoolExecutor(max_workers=200) as pool:
+                tokens = set(pool.map(lambda _: manager.token(IDENTITY), range(1000)))
+        assert tokens == {"access-1"}
+        assert auth_server.calls["/api/auth/login"] == 1
+        assert manager.stats["handouts"] == 1000
+
+    def test_second_process_reuses_token_file(self, auth_server, store):
+        """A manager with an empty memory adopts the token another one saved"""
+        with manager_for(auth_server, store, background=False) as first:
+            first.token(IDENTITY)
+        with manager_for(auth_server, store, background=False) as second:
+            assert second.token(IDENTITY) == "access-1"
+            assert second.stats["shared_logins"] == 1
+        assert auth_server.calls["/api/auth/login"] == 1
+
+    def test_refreshes_ahead_of_expiry_in_background(self, auth_server, store):
+        """A token inside its refresh window is replaced before callers see it expire"""
+        auth_server.ttl = 3
+        with manager_for(auth_server, store, refresh_ahead=60) as manager:
+            assert manager.token(IDENTITY) == "access-1"
+            deadline = time.monotonic() + 5
+            while manager.stats["background_refreshes"] == 0 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert manager.token(IDENTITY) == "access-2"
+        assert auth_server.calls["/api/auth/refresh"] >= 1
+        assert auth_server.calls["/api/auth/login"] == 1
+
+    def test_rejected_token_renews_and_rejected_refresh_logs_in(self, auth_server, store):
+        """invalidate() after a 401 forces a renewal; a revoked refresh token falls back to login"""
+        with manager_for(auth_server, store, background=False) as manager:
+            token = manager.token(IDENTITY)
+            auth_server.revoked.add("refresh-1")
+            manager.invalidate(IDENTITY, token)
+            assert manager.token(IDENTITY) == "access-3"
+        assert auth_server.calls == {"/api/auth/login": 2, "/api/auth/refresh": 1, "/api/auth/logout": 0}
+        assert manager.stats["refresh_failures"] == 1
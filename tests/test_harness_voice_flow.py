@@ -0,0 +1,79 @@
+import json
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+from harness.audio import synth_wav, transcribe_body
+from harness.stubs import StubServer
+from harness.voice_flow import run
+
+class FakeAppHandler(BaseHTTPRequestHandler):
+    """The two Next.js routes, forwarding to the stand-in the way the real ones call OpenAI"""
+
+    def do_POST(self):
+        stub = self.server.stub
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path == "/api/transcribe":
+            upload = raw.replace(b'name="service"', b'name="response_format"').replace(b"whisper", b"text")
+            text = requests.post(f"{stub.url}/v1/audio/transcriptions", data=upload,
+                                 headers={"Content-Type": self.headers["Content-Type"]}).text
+            payload, timing = {"text": text}, None
+        else:
+            completion = requests.post(f"{stub.url}/v1/chat/completions", json={
+                "messages": [{"role": "user", "content": json.loads(raw)["taskText"]}]}).json()
+            payload, timing = {"tasks": json.loads(completion["choices"][0]["message"]["content"])}, "model;dur=5.0"
+            if self.server.broken_parse:
+                payload = {"error": "no tasks key"}
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if timing:
+            self.send_header("Server-Timing", timing)
+        self.end_headers()
+        self.wfile.write(data)
+
+@pytest.fixture
+def stub():
+    with StubServer(port=0) as server:
+        server.port = server.httpd.server_address[1]
+        yield server
+
+@pytest.fixture
+def app(stub, fake_server):
+    return fake_server(FakeAppHandler, stub=stub, broken_parse=False)
+
+class TestVoiceFlow:
+    """Test suite for the end-of-speech -> task-saved replay and its Whisper stand-in"""
+
+    def test_whisper_stand_in_answers_text_and_scales_with_audio(self, stub):
+        """response_format=text gets the plain transcript; whisper_rtf adds time per second of audio"""
+        body, content_type = transcribe_body(synth_wav(0.5), service="text")
+        url = f"{stub.url}/v1/audio/transcriptions"
+        stub.whisper_rtf = 0.2
+        response = requests.post(url, data=body.replace(b'name="service"', b'name="response_format"'),
+                                 headers={"Content-Type": content_type})
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert response.text == stub.transcript + "\n"
+        assert response.elapsed.total_seconds() >= 0.1
+        assert requests.post(url, data=body, headers={"Content-Type": content_type}).json() == {"text": stub.transcript}
+
+    def test_flow_attributes_time_to_each_hop(self, stub, app):
+        """Every flow saves its parsed task, and hop times add up to the total"""
+        stub.latency["openai"] = 0.05
+        stats = run(app.url, stub, flows=4, audio_seconds=0.2, warmup=1)
+        assert stats.flows == 4 and not stats.failures
+        assert [row["title"] for row in stub.rows("tasks")] == [stub.transcript] * 5
+        parse, total = stats.hops["parse"], stats.hops["total"]
+        assert parse.percentile(50) >= 0.05
+        assert sum(stats.hops[hop].mean() for hop in ("transcribe", "parse", "save")) <= total.mean() * 1.01
+        assert stats.phases["model"].count == 4
+        assert stats.calls["whisper POST audio/transcriptions"] == 4
+        assert stats.calls["auth GET user"] == 4 and stats.calls["rest POST tasks"] == 4
+
+    def test_bad_body_is_a_hop_failure(self, stub, app):
+        """A 200 without the field the next hop needs fails that hop instead of crashing the run"""
+        app.broken_parse = True
+        stats = run(app.url, stub, flows=3, audio_seconds=0.2, warmup=1)
+        assert stats.flows == 0
+        assert stats.failures == {"parse 200 with a bad body (KeyError)": 3}
@@ -1,6 +1,7 @@
 import pytest
 import json
 from conftest import API_BASE
+from harness.jsonstream import iter_items
 
 class TestLeads:
     """Test suite for /api/marketing/leads endpoints"""
@@ -35,11 +36,11 @@ class TestLeads:
     
     def test_list_leads(self, client, api_headers):
         """GET /api/marketing/leads - List all leads"""
-        response = client.get(f"{API_BASE}/marketing/leads", headers=api_headers)
+        response = client.get(f"{API_BASE}/marketing/leads", headers=api_headers, stream=True)
         
         assert response.status_code == 200
-        data = response.json()
-        assert isinstance(data, list)
+        for item in iter_items(response):
+            assert "id" in item
     
     def test_get_lead_by_id(self, client, api_headers):
         """GET /api/marketing/leads/{id} - Get specific lead"""
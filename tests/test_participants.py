@@ -1,6 +1,7 @@
 import pytest
 import json
 from conftest import API_BASE
+from harness.jsonstream import iter_items
 
 class TestParticipants:
     """Test suite for /api/participants endpoints"""
@@ -30,11 +31,11 @@ class TestParticipants:
     
     def test_list_participants(self, client, api_headers):
         """GET /api/participants - List all participants"""
-        response = client.get(f"{API_BASE}/participants", headers=api_headers)
+        response = client.get(f"{API_BASE}/participants", headers=api_headers, stream=True)
         
         assert response.status_code == 200
-        data = response.json()
-        assert isinstance(data, list)
+        for item in iter_items(response):
+            assert "id" in item
     
     def test_get_participant_by_id(self, client, api_headers):
         """GET /api/participants/{id} - Get specific participant"""
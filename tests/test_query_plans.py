@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+if not os.environ.get("HARNESS_PG_DSN"):
+    # seed() truncates auth.users, so never fall back to whatever answers on localhost:5432
+    pytest.skip("set HARNESS_PG_DSN to a scratch Postgres to run the plan checks", allow_module_level=True)
+
+psycopg = pytest.importorskip("psycopg")
+
+from harness import plans
+from harness.pg import apply_schema, connect
+
+@pytest.fixture(scope="module")
+def seeded_users():
+    """Scratch Postgres at HARNESS_PG_DSN with the schema applied and users seeded"""
+    try:
+        conn = connect()
+    except psycopg.OperationalError as e:
+        pytest.skip(f"No scratch Postgres available: {e}")
+    apply_schema(conn)
+    users = plans.seed(conn)
+    yield conn, users
+    conn.close()
+
+def pattern_params():
+    """PATTERNS, with the ones waiting on a migration index marked xfail"""
+    params = []
+    for pattern in plans.PATTERNS:
+        marks = []
+        if pattern.get("missing_index"):
+            marks.append(pytest.mark.xfail(strict=True, reason=f"no migration creates an index on {pattern['missing_index']}"))
+        params.append(pytest.param(pattern, id=pattern["name"], marks=marks))
+    return params
+
+class TestQueryPlans:
+    """Plan regression checks for the tasks, user_notes and user_usage queries"""
+
+    @pytest.mark.parametrize("volume", ["heavy", "typical"])
+    @pytest.mark.parametrize("pattern", pattern_params())
+    def test_access_pattern_plan(self, seeded_users, pattern, volume):
+        """No sequential scan, no disallowed sort, buffers within budget"""
+        conn, users = seeded_users
+        result = plans.record_plan(conn, pattern, users[volume])
+
+        assert not result["violations"], f"{' > '.join(result['nodes'])}: {'; '.join(result['violations'])}"